@@ -0,0 +1,225 @@
+"""
+End-to-end benchmark of the hot endpoints against local stub upstreams.
+
+Generates synthetic data at the requested scale, serves it from stub webepg
+and ultimate-backend servers with the given latency and jitter, runs
+ultimate-ui under gunicorn against them and fires concurrent requests at
+each endpoint in turn. Reports throughput and p50/p95/p99 latency, and
+compares them with a stored baseline. Run from the repository root:
+
+    python benchmarks/hot_endpoints.py --save-baseline bench_baseline.json
+    python benchmarks/hot_endpoints.py --baseline bench_baseline.json
+
+With --baseline, the exit status is 1 if any endpoint's p95 latency grew
+or its throughput fell by more than --tolerance.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from stub_upstreams import (
+    SyntheticData,
+    add_data_arguments,
+    data_from_arguments,
+    start_stubs,
+)
+from support import HttpClient, run_app, summarize
+
+
+def _browser_time(value) -> str:
+    """Format like JavaScript's Date.toISOString()."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _epg(rng: random.Random, data: SyntheticData) -> str:
+    return "/epg"
+
+
+def _epg_channels(rng: random.Random, data: SyntheticData) -> str:
+    pages = max(len(data.channels) // 50, 1)
+    return f"/api/epg/channels?page={rng.randrange(pages)}&limit=50"
+
+
+def _channel_programs(rng: random.Random, data: SyntheticData) -> str:
+    channel = rng.choice(data.channels)["id"] if data.channels else 1
+    start = data.guide_start + timedelta(days=rng.randrange(max(data.days, 1)))
+    end = start + timedelta(days=1)
+    return (
+        f"/api/channels/{channel}/programs"
+        f"?start={_browser_time(start)}&end={_browser_time(end)}"
+    )
+
+
+def _monitoring_status(rng: random.Random, data: SyntheticData) -> str:
+    return "/api/monitoring/status"
+
+
+def _aliases(rng: random.Random, data: SyntheticData) -> str:
+    return "/api/aliases"
+
+
+# Endpoint name -> function returning the path of the next request
+ENDPOINTS: Dict[str, Callable[[random.Random, SyntheticData], str]] = {
+    "epg": _epg,
+    "epg_channels": _epg_channels,
+    "channel_programs": _channel_programs,
+    "monitoring_status": _monitoring_status,
+    "aliases": _aliases,
+}
+
+
+def run_endpoint(
+    client: HttpClient, name: str, data: SyntheticData, args
+) -> Dict[str, Any]:
+    """Warm up, then measure one endpoint with args.concurrency callers."""
+    make_path = ENDPOINTS[name]
+    rng = random.Random(f"{args.seed}:{name}")
+    lock = threading.Lock()
+
+    def next_path() -> str:
+        with lock:
+            return make_path(rng, data)
+
+    for _ in range(args.warmup):
+        client.get(next_path())
+
+    errors = 0
+
+    def call(_index) -> float:
+        nonlocal errors
+        status, _, _, elapsed = client.get(next_path())
+        if status != 200:
+            with lock:
+                errors += 1
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Print the change against the baseline; return the regressed endpoints."""
+    regressed = []
+    print()
+    print(f"{'vs baseline':<20}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:<20}{'(not in baseline)':>40}")
+            continue
+        changes = {
+            key: (result[key] - before[key]) / before[key] if before[key] else 0.0
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+        slower = changes["p95_ms"] > tolerance or changes["throughput_rps"] < -tolerance
+        if slower:
+            regressed.append(name)
+        print(
+            f"{name:<20}"
+            + "".join(
+                f"{changes[key]:>+10.0%}"
+                for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            )
+            + ("  REGRESSION" if slower else "")
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_data_arguments(parser)
+    parser.add_argument("--requests", type=int, default=300, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="per endpoint")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument(
+        "--worker-class", default="gthread", choices=("gthread", "gevent")
+    )
+    parser.add_argument(
+        "--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS
+    )
+    parser.add_argument(
+        "--baseline", help="JSON file of an earlier run to compare with"
+    )
+    parser.add_argument("--save-baseline", help="write this run's results as JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="relative p95/throughput change counted as a regression",
+    )
+    args = parser.parse_args()
+
+    data = data_from_arguments(args)
+    webepg, ultimate = start_stubs(data, args.latency, args.jitter)
+    try:
+        with run_app(
+            webepg.url,
+            ultimate.url,
+            workers=args.workers,
+            threads=args.threads,
+            worker_class=args.worker_class,
+        ) as base_url:
+            client = HttpClient(base_url)
+            results = {
+                name: run_endpoint(client, name, data, args) for name in args.endpoints
+            }
+    finally:
+        webepg.shutdown()
+        ultimate.shutdown()
+
+    print(
+        f"{'endpoint':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'errors':>8}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<20}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}"
+        )
+
+    settings = {
+        key: getattr(args, key)
+        for key in (
+            "channels",
+            "days",
+            "aliases",
+            "providers",
+            "provider_channels",
+            "latency",
+            "jitter",
+            "requests",
+            "concurrency",
+            "workers",
+            "threads",
+            "worker_class",
+        )
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != settings:
+            print("\nWarning: the baseline was recorded with different settings")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""
+Load generator that replays the browser's traffic with virtual users.
+
+Each virtual user behaves like one browser tab of the UI:
+
+* A page visit loads the HTML and the static assets it references (once per
+  user; fingerprinted assets are never revalidated) and opens the monitoring
+  status stream, falling back to polling /api/monitoring/status every 60 s
+  when the server rejects the stream (status_stream.js).
+* On the EPG page it loads /api/mapping/providers, the first page of 50
+  channels and their programs for the next 24 hours in one batch request
+  (epg_manager.js, epg_core.js). It then scrolls to further channel pages
+  (cursor paging plus a program batch per page) or opens a channel's daily
+  program list (/api/channels/<id>/programs for the local day), with random
+  think time between actions, and reloads the page every --refresh-interval
+  seconds like the tab's auto-refresh (base.js).
+* On the monitoring page it checks /api/monitoring/status one second after
+  loading (monitoring.js) and otherwise relies on the status stream.
+
+Users start spread over --ramp-up seconds and move to another page after a
+random visit length. At the end, latency percentiles and errors per request
+type are printed, together with the peak number of requests in flight and
+of open streams, which is what gunicorn workers and threads must cover.
+Run against a local instance:
+
+    python benchmarks/loadgen.py --url http://127.0.0.1:7779 --users 50
+
+or let it start stub upstreams and gunicorn itself to size workers and
+threads:
+
+    python benchmarks/loadgen.py --spawn --workers 4 --threads 8 --users 200
+"""
+
+import argparse
+import http.client
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from stub_upstreams import add_data_arguments, data_from_arguments, start_stubs
+from support import BROWSER_HEADERS, HttpClient, decode_body, percentile, run_app
+
+# Requests the browser makes, as labels of the report
+PAGE_EPG = "GET /epg"
+PAGE_MONITORING = "GET /monitoring"
+STATIC = "GET /static/*"
+MAPPING_PROVIDERS = "GET /api/mapping/providers"
+EPG_CHANNELS = "GET /api/epg/channels"
+EPG_PROGRAMS = "GET /api/epg/programs"
+CHANNEL_PROGRAMS = "GET /api/channels/{id}/programs"
+MONITORING_STATUS = "GET /api/monitoring/status"
+STREAM = "SSE /api/monitoring/stream"
+
+CHANNELS_PER_PAGE = 50  # epg_manager.js
+STATUS_POLL_INTERVAL = 60.0  # status_stream.js
+STREAM_RETRY = 3.0  # EventSource default until the server sends "retry:"
+
+_ASSET = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+def _browser_time(value: datetime) -> str:
+    """Format like JavaScript's Date.toISOString()."""
+    value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+class Report:
+    """Latencies and errors per request type, and peak concurrency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.streams = 0
+        self.peak_streams = 0
+        self.streams_rejected = 0
+        self.started = time.monotonic()
+        self.ended: Optional[float] = None
+
+    def finish(self):
+        self.ended = time.monotonic()
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(self, label: str, seconds: float, ok: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.latencies.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def stream_opened(self):
+        with self._lock:
+            self.streams += 1
+            self.peak_streams = max(self.peak_streams, self.streams)
+
+    def stream_closed(self):
+        with self._lock:
+            self.streams -= 1
+
+    def stream_rejected(self):
+        with self._lock:
+            self.streams_rejected += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.ended or time.monotonic()) - self.started
+        with self._lock:
+            requests = {}
+            for label, values in sorted(self.latencies.items()):
+                ordered = sorted(values)
+                requests[label] = {
+                    "requests": len(ordered),
+                    "errors": self.errors.get(label, 0),
+                    "rps": round(len(ordered) / elapsed, 2),
+                    "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+                    "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+                    "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+                }
+            return {
+                "elapsed_s": round(elapsed, 1),
+                "requests": requests,
+                "total_requests": sum(len(v) for v in self.latencies.values()),
+                "total_errors": sum(self.errors.values()),
+                "peak_in_flight": self.peak_in_flight,
+                "peak_streams": self.peak_streams,
+                "streams_rejected": self.streams_rejected,
+            }
+
+
+class StatusStream(threading.Thread):
+    """The tab's monitoring stream, or its polling fallback."""
+
+    def __init__(self, user: "VirtualUser"):
+        super().__init__(daemon=True)
+        self.user = user
+        self.closed = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._last_event_id: Optional[str] = None
+        self._retry = STREAM_RETRY
+
+    def close(self):
+        self.closed.set()
+        conn = self._conn
+        if conn is not None and conn.sock is not None:
+            # Wakes up the blocked readline, unlike close()
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def run(self):
+        while not self.closed.is_set():
+            if not self._listen():
+                self._poll()
+                return
+            if self.user.wait(self._retry, self.closed):
+                return
+
+    def _listen(self) -> bool:
+        """Read the stream until it ends; False if the server rejected it."""
+        user = self.user
+        headers = dict(BROWSER_HEADERS, Accept="text/event-stream")
+        if self._last_event_id:
+            headers["Last-Event-ID"] = self._last_event_id
+        conn = http.client.HTTPConnection(user.host, user.port, timeout=600)
+        self._conn = conn
+        user.report.begin()
+        started = time.perf_counter()
+        try:
+            conn.request("GET", "/api/monitoring/stream", headers=headers)
+            response = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            user.report.end(STREAM, time.perf_counter() - started, self.closed.is_set())
+            conn.close()
+            return True
+        # A 503 means all stream slots are taken; the browser then polls
+        ok = response.status in (200, 503)
+        user.report.end(STREAM, time.perf_counter() - started, ok)
+        if response.status != 200:
+            user.report.stream_rejected()
+            conn.close()
+            return False
+
+        user.report.stream_opened()
+        try:
+            while not self.closed.is_set():
+                line = response.readline()
+                if not line:
+                    break
+                if line.startswith(b"id:"):
+                    self._last_event_id = line[3:].strip().decode("utf-8", "replace")
+                elif line.startswith(b"retry:"):
+                    self._retry = int(line[6:].strip() or 0) / 1000 or STREAM_RETRY
+        except (OSError, ValueError, http.client.HTTPException):
+            pass
+        finally:
+            user.report.stream_closed()
+            conn.close()
+        return True
+
+    def _poll(self):
+        while True:
+            self.user.fetch(MONITORING_STATUS, "/api/monitoring/status")
+            if self.user.wait(STATUS_POLL_INTERVAL, self.closed):
+                return
+
+
+class VirtualUser(threading.Thread):
+    """One browser tab moving between the EPG and monitoring pages."""
+
+    def __init__(
+        self,
+        number: int,
+        base_url: str,
+        args,
+        report: Report,
+        stop: threading.Event,
+    ):
+        super().__init__(name=f"user-{number}", daemon=True)
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.client = HttpClient(base_url)
+        self.args = args
+        self.report = report
+        self.stop = stop
+        self.rng = random.Random(f"{args.seed}:{number}")
+        self.start_delay = args.ramp_up * number / max(args.users, 1)
+        # Asset URL -> ETag, or None for fingerprinted (immutable) assets
+        self.assets: Dict[str, Optional[str]] = {}
+
+    def wait(self, seconds: float, *events: threading.Event) -> bool:
+        """Sleep for seconds of simulated time; True if the run or page ended."""
+        deadline = time.monotonic() + seconds / self.args.speed
+        while True:
+            if self.stop.is_set() or any(event.is_set() for event in events):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.stop.wait(min(remaining, 0.5))
+
+    def get(
+        self, label: str, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes, Dict[str, str]]:
+        """GET path and record it under label."""
+        self.report.begin()
+        status, body, response_headers, seconds = self.client.get(path, headers)
+        self.report.end(label, seconds, 0 < status < 400)
+        return status, body, response_headers
+
+    def fetch(
+        self, label: str, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[Any]:
+        """GET path and record it; return the decoded JSON, if any."""
+        status, body, response_headers = self.get(label, path, headers)
+        if status != 200 or "json" not in response_headers.get("content-type", ""):
+            return None
+        try:
+            return json.loads(decode_body(body, response_headers))
+        except (OSError, ValueError, zlib.error):
+            return None
+
+    def load_page(self, label: str, path: str, reload: bool) -> bool:
+        """Load a page and its assets; return False if the page failed."""
+        status, body, headers = self.get(label, path)
+        if status != 200:
+            return False
+        html = decode_body(body, headers).decode("utf-8", "replace")
+        for asset in dict.fromkeys(_ASSET.findall(html)):
+            known = asset in self.assets
+            etag = self.assets.get(asset)
+            if known and (etag is None or not reload):
+                continue
+            _, _, headers = self.get(
+                STATIC, asset, {"If-None-Match": etag} if etag else None
+            )
+            immutable = "immutable" in headers.get("cache-control", "")
+            self.assets[asset] = None if immutable else headers.get("etag", etag)
+        return True
+
+    def run(self):
+        if self.wait(self.start_delay):
+            return
+        while not self.stop.is_set():
+            visit_end = time.monotonic() + (
+                self.rng.expovariate(1 / self.args.visit) / self.args.speed
+            )
+            if self.rng.random() < self.args.epg_share:
+                self.visit_epg(visit_end)
+            else:
+                self.visit_monitoring(visit_end)
+
+    def _open_page(self, label: str, path: str, reload: bool) -> Optional[StatusStream]:
+        if not self.load_page(label, path, reload):
+            self.wait(5)
+            return None
+        stream = StatusStream(self)
+        stream.start()
+        return stream
+
+    def visit_monitoring(self, visit_end: float):
+        stream = self._open_page(PAGE_MONITORING, "/monitoring", reload=False)
+        if stream is None:
+            return
+        try:
+            if not self.wait(1.0):
+                self.fetch(MONITORING_STATUS, "/api/monitoring/status")
+            self.wait(max(visit_end - time.monotonic(), 0) * self.args.speed)
+        finally:
+            stream.close()
+
+    def visit_epg(self, visit_end: float):
+        reload = False
+        while not self.stop.is_set() and time.monotonic() < visit_end:
+            stream = self._open_page(PAGE_EPG, "/epg", reload)
+            if stream is None:
+                return
+            refresh_at = time.monotonic() + self.args.refresh_interval / self.args.speed
+            try:
+                self.browse_epg(min(visit_end, refresh_at))
+            finally:
+                stream.close()
+            reload = True
+
+    def browse_epg(self, until: float):
+        """The EPG page from initialization until it is left or reloaded."""
+        self.fetch(MAPPING_PROVIDERS, "/api/mapping/providers")
+        channels, cursor = self.load_channels(None)
+        while not self.stop.is_set():
+            think = self.rng.expovariate(1 / self.args.think)
+            if time.monotonic() + think / self.args.speed >= until:
+                self.wait(max(until - time.monotonic(), 0) * self.args.speed)
+                return
+            if self.wait(think):
+                return
+            if cursor and self.rng.random() < self.args.scroll_share:
+                more, cursor = self.load_channels(cursor)
+                channels.extend(more)
+            elif channels:
+                self.open_daily_programs(self.rng.choice(channels))
+
+    def load_channels(self, cursor: Optional[str]):
+        """Fetch one page of channels and their programs for the next 24h."""
+        params: Dict[str, Any] = {"limit": CHANNELS_PER_PAGE}
+        if cursor:
+            params["cursor"] = cursor
+        data = self.fetch(EPG_CHANNELS, f"/api/epg/channels?{urlencode(params)}")
+        if not data or not data.get("success"):
+            return [], None
+        channels = [c.get("id") for c in data.get("channels", []) if "id" in c]
+        next_cursor = data.get("next_cursor") if data.get("has_more") else None
+        if channels:
+            now = datetime.now(timezone.utc)
+            query = urlencode(
+                {
+                    "channels": ",".join(str(c) for c in channels),
+                    "start": _browser_time(now),
+                    "end": _browser_time(now + timedelta(days=1)),
+                }
+            )
+            self.fetch(EPG_PROGRAMS, f"/api/epg/programs?{query}")
+        return channels, next_cursor
+
+    def open_daily_programs(self, channel_id: Any):
+        """The daily program list of a channel for the browser's local day."""
+        today = datetime.now().astimezone()
+        start = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = today.replace(hour=23, minute=59, second=59, microsecond=999000)
+        self.fetch(
+            CHANNEL_PROGRAMS,
+            f"/api/channels/{channel_id}/programs"
+            f"?start={_browser_time(start)}&end={_browser_time(end)}",
+        )
+
+
+def print_report(summary: Dict[str, Any]):
+    print(
+        f"{'request':<34}{'count':>8}{'errors':>8}{'req/s':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for label, stats in summary["requests"].items():
+        print(
+            f"{label:<34}{stats['requests']:>8}{stats['errors']:>8}{stats['rps']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    total = summary["total_requests"]
+    errors = summary["total_errors"]
+    rate = errors / total if total else 0.0
+    print()
+    print(f"{total} requests in {summary['elapsed_s']} s, {errors} errors ({rate:.2%})")
+    print(f"Peak requests in flight: {summary['peak_in_flight']}")
+    print(
+        f"Peak open status streams: {summary['peak_streams']} "
+        f"({summary['streams_rejected']} rejected, polling instead)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:7779")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=300, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=300,
+        help="EPG page reload interval (ui.refresh_interval)",
+    )
+    parser.add_argument("--think", type=float, default=20, help="mean seconds")
+    parser.add_argument("--visit", type=float, default=600, help="mean page seconds")
+    parser.add_argument("--epg-share", type=float, default=0.8)
+    parser.add_argument(
+        "--scroll-share",
+        type=float,
+        default=0.6,
+        help="share of EPG actions that scroll to more channels",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="divide all waits by this factor to compress time",
+    )
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="start stub upstreams and gunicorn instead of using --url",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument(
+        "--worker-class", default="gthread", choices=("gthread", "gevent")
+    )
+    add_data_arguments(parser)
+    args = parser.parse_args()
+    args.speed = max(args.speed, 0.001)
+
+    with ExitStack() as stack:
+        base_url = args.url
+        if args.spawn:
+            webepg, ultimate = start_stubs(
+                data_from_arguments(args), args.latency, args.jitter
+            )
+            stack.callback(ultimate.shutdown)
+            stack.callback(webepg.shutdown)
+            base_url = stack.enter_context(
+                run_app(
+                    webepg.url,
+                    ultimate.url,
+                    workers=args.workers,
+                    threads=args.threads,
+                    worker_class=args.worker_class,
+                    env={"UI_REFRESH_INTERVAL": str(int(args.refresh_interval))},
+                )
+            )
+
+        report = Report()
+        stop = threading.Event()
+        users = [
+            VirtualUser(number, base_url, args, report, stop)
+            for number in range(args.users)
+        ]
+        for user in users:
+            user.start()
+        try:
+            stop.wait(args.duration / args.speed)
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        for user in users:
+            user.join(timeout=30)
+        report.finish()
+
+    summary = report.summary()
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if summary["total_requests"] == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
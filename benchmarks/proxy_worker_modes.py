@@ -0,0 +1,92 @@
+"""
+Compare gunicorn worker modes for the upstream-bound /api/* proxy routes.
+
+Starts stub upstreams (see stub_upstreams.py) that answer every request
+after a fixed delay, runs ultimate-ui under gunicorn once per worker mode
+against them, and fires a burst of concurrent proxied requests at each.
+Run from the repository root:
+
+    python benchmarks/proxy_worker_modes.py --requests 200 --delay 0.5
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+from stub_upstreams import StubServer, SyntheticData, start_stubs
+from support import HttpClient, run_app, summarize
+
+MODES = ("gthread", "gevent")
+
+
+def start_slow_upstreams(delay: float) -> Tuple[StubServer, StubServer]:
+    """Start stub upstreams that wait ``delay`` seconds before answering."""
+    data = SyntheticData(
+        channels=1, days=1, aliases=0, providers=1, provider_channels=1
+    )
+    return start_stubs(data, latency=delay)
+
+
+def run_mode(
+    name: str, webepg: StubServer, ultimate: StubServer, args
+) -> Dict[str, Any]:
+    with run_app(
+        webepg.url,
+        ultimate.url,
+        workers=args.workers,
+        threads=args.threads,
+        worker_class=name,
+        env={"WEBEPG_TIMEOUT": "30"},
+    ) as base_url:
+        client = HttpClient(base_url, timeout=120)
+        lock = threading.Lock()
+        errors = 0
+
+        def call(_index) -> float:
+            nonlocal errors
+            status, _, _, elapsed = client.get("/api/import/status")
+            if status != 200:
+                with lock:
+                    errors += 1
+            return elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.requests) as pool:
+            latencies = list(pool.map(call, range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    return {"mode": name, **summarize(latencies, errors, elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    webepg, ultimate = start_slow_upstreams(args.delay)
+    try:
+        results = [run_mode(name, webepg, ultimate, args) for name in args.modes]
+    finally:
+        webepg.shutdown()
+        ultimate.shutdown()
+
+    print(
+        f"{'mode':<10}{'elapsed s':>12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'errors':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:<10}{result['elapsed_s']:>12}{result['throughput_rps']:>10}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
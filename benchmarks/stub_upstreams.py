@@ -0,0 +1,426 @@
+"""
+Local stub webepg and ultimate-backend servers with synthetic data.
+
+The stubs speak the ``/api/v1/*`` (webepg) and ``/api/providers*``
+(ultimate-backend) routes the UI calls, answer after a configurable delay
+with jitter, and support ETag revalidation. Data is generated from a seed,
+so runs at the same scale see the same channels, programs and aliases;
+programs are generated per channel and day when first requested. Run on
+its own to point a local ultimate-ui at the stubs:
+
+    python benchmarks/stub_upstreams.py --channels 5000 --days 7 --aliases 50000
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CATEGORIES = ("news", "sport", "movie", "series", "documentary", "kids", "music")
+PROGRAM_MINUTES = (15, 30, 30, 45, 60, 60, 90, 120)
+TITLES = (
+    "Tagesschau",
+    "Sportschau",
+    "Tatort",
+    "Wetter",
+    "Dokumentation",
+    "Nachtmagazin",
+    "Spielfilm",
+    "Kinderprogramm",
+)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SyntheticData:
+    """Channels, programs, aliases and providers at a configurable scale.
+
+    Program guides start at midnight UTC of the current day and cover
+    ``days`` days. Aliases are spread round-robin over the channels.
+    """
+
+    def __init__(
+        self,
+        channels: int = 5000,
+        days: int = 7,
+        aliases: int = 50000,
+        providers: int = 5,
+        provider_channels: int = 500,
+        seed: int = 1,
+    ):
+        self.days = days
+        self.seed = seed
+        self.guide_start = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.channels = [
+            {
+                "id": i,
+                "name": f"channel-{i}",
+                "display_name": f"Channel {i}",
+                "icon_url": f"http://logos.invalid/{i}.png",
+            }
+            for i in range(1, channels + 1)
+        ]
+        self.channel_ids = {str(channel["id"]) for channel in self.channels}
+        self.aliases = [
+            {
+                "id": i,
+                "alias": f"alias-{i}",
+                "channel_id": self.channels[i % channels]["id"] if channels else 0,
+                "alias_type": "name" if i % 3 else "tvg-id",
+            }
+            for i in range(1, aliases + 1)
+        ]
+        self.providers = [
+            {
+                "id": i,
+                "name": f"Provider {i}",
+                "xmltv_url": f"http://xmltv.invalid/{i}.xml",
+                "enabled": True,
+            }
+            for i in range(1, providers + 1)
+        ]
+        self.backend_providers = [
+            {"id": f"provider{i}", "name": f"Provider {i}"}
+            for i in range(1, providers + 1)
+        ]
+        self.provider_channels = provider_channels
+
+    @lru_cache(maxsize=65536)
+    def _day_programs(self, channel_id: str, day: int) -> Tuple[Dict[str, Any], ...]:
+        rng = random.Random(f"{self.seed}:{channel_id}:{day}")
+        start = self.guide_start + timedelta(days=day)
+        end = start + timedelta(days=1)
+        programs = []
+        number = 0
+        while start < end:
+            stop = min(start + timedelta(minutes=rng.choice(PROGRAM_MINUTES)), end)
+            number += 1
+            programs.append(
+                {
+                    "id": f"{channel_id}-{day}-{number}",
+                    "title": rng.choice(TITLES),
+                    "subtitle": f"Folge {rng.randint(1, 300)}",
+                    "description": "Synthetic program " * rng.randint(1, 12),
+                    "start_time": _iso(start),
+                    "end_time": _iso(stop),
+                    "category": rng.choice(CATEGORIES),
+                }
+            )
+            start = stop
+        return tuple(programs)
+
+    def programs(
+        self, channel_id: str, start: Optional[datetime], end: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Return the programs of a channel that overlap [start, end)."""
+        if channel_id not in self.channel_ids:
+            return []
+        start = start or self.guide_start
+        end = end or start + timedelta(days=1)
+        first = max((start - self.guide_start).days, 0)
+        last = min((end - self.guide_start).days, self.days - 1)
+        start_text, end_text = _iso(start), _iso(end)
+        return [
+            program
+            for day in range(first, last + 1)
+            for program in self._day_programs(channel_id, day)
+            if program["end_time"] > start_text and program["start_time"] < end_text
+        ]
+
+    def channel_aliases(self, channel_id: str) -> List[Dict[str, Any]]:
+        return [a for a in self.aliases if str(a["channel_id"]) == channel_id]
+
+    def paginated_aliases(self, query: Dict[str, str]) -> Dict[str, Any]:
+        page = max(int(query.get("page", 1)), 1)
+        per_page = max(int(query.get("per_page", 100)), 1)
+        aliases = self.aliases
+        if query.get("alias_type"):
+            aliases = [a for a in aliases if a["alias_type"] == query["alias_type"]]
+        if query.get("channel_id"):
+            aliases = [
+                a for a in aliases if str(a["channel_id"]) == query["channel_id"]
+            ]
+        offset = (page - 1) * per_page
+        end = offset + per_page
+        return {
+            "aliases": aliases[offset:end],
+            "page": page,
+            "per_page": per_page,
+            "total": len(aliases),
+        }
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "total_channels": len(self.channels),
+            "total_programs": len(self.channels) * self.days * 24,
+            "total_providers": len(self.providers),
+            "total_aliases": len(self.aliases),
+            "earliest_program": _iso(self.guide_start),
+            "latest_program": _iso(self.guide_start + timedelta(days=self.days)),
+            "days_covered": self.days,
+        }
+
+    def import_status(self) -> Dict[str, Any]:
+        finished = self.guide_start + timedelta(hours=3)
+        return {
+            "recent_imports": [
+                {
+                    "id": f"import{provider['id']}",
+                    "provider_id": provider["id"],
+                    "started_at": _iso(finished - timedelta(minutes=5)),
+                    "completed_at": _iso(finished),
+                    "status": "success",
+                    "programs_imported": len(self.channels) * 24,
+                    "programs_skipped": 0,
+                }
+                for provider in self.providers
+            ],
+            "next_scheduled_import": _iso(self.guide_start + timedelta(days=1)),
+        }
+
+    def backend_channels(self, provider_id: str) -> Optional[List[Dict[str, Any]]]:
+        if not any(p["id"] == provider_id for p in self.backend_providers):
+            return None
+        return [
+            {"id": f"{provider_id}-{i}", "name": f"Channel {i}"}
+            for i in range(1, self.provider_channels + 1)
+        ]
+
+
+Route = Callable[[re.Match, Dict[str, str]], Any]
+
+
+def webepg_routes(data: SyntheticData) -> List[Tuple[re.Pattern, Route]]:
+    """GET routes of the webepg API; a handler returning None means 404."""
+    aliases_mapping = {a["alias"]: a["channel_id"] for a in data.aliases}
+    return [
+        (re.compile(r"^/api/v1/health$"), lambda m, q: {"status": "ok"}),
+        (re.compile(r"^/api/v1/channels$"), lambda m, q: data.channels),
+        (
+            re.compile(r"^/api/v1/channels/([^/]+)/programs$"),
+            lambda m, q: data.programs(
+                m.group(1), _parse_time(q.get("start")), _parse_time(q.get("end"))
+            ),
+        ),
+        (
+            re.compile(r"^/api/v1/channels/([^/]+)/aliases$"),
+            lambda m, q: data.channel_aliases(m.group(1)),
+        ),
+        (
+            re.compile(r"^/api/v1/channels/([^/]+)$"),
+            lambda m, q: next(
+                (c for c in data.channels if str(c["id"]) == m.group(1)), None
+            ),
+        ),
+        (re.compile(r"^/api/v1/aliases$"), lambda m, q: data.aliases),
+        (re.compile(r"^/api/v1/aliases/mapping$"), lambda m, q: aliases_mapping),
+        (
+            re.compile(r"^/api/v1/aliases/paginated$"),
+            lambda m, q: data.paginated_aliases(q),
+        ),
+        (
+            re.compile(r"^/api/v1/aliases/statistics$"),
+            lambda m, q: {"total_aliases": len(data.aliases)},
+        ),
+        (re.compile(r"^/api/v1/providers$"), lambda m, q: data.providers),
+        (re.compile(r"^/api/v1/import/status$"), lambda m, q: data.import_status()),
+        (re.compile(r"^/api/v1/statistics$"), lambda m, q: data.statistics()),
+    ]
+
+
+def ultimate_routes(data: SyntheticData) -> List[Tuple[re.Pattern, Route]]:
+    """GET routes of the ultimate-backend API."""
+    return [
+        (re.compile(r"^/api/providers$"), lambda m, q: data.backend_providers),
+        (
+            re.compile(r"^/api/providers/([^/]+)/channels$"),
+            lambda m, q: data.backend_channels(m.group(1)),
+        ),
+    ]
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded JSON server that answers GETs from a route table.
+
+    Every request waits ``latency`` seconds plus normally distributed
+    jitter (standard deviation ``jitter``) before the answer. Responses
+    carry a content ETag, and a matching If-None-Match gets a 304.
+    Serialized bodies are cached per URL.
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        routes: List[Tuple[re.Pattern, Route]],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.routes = routes
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+        super().__init__((host, port), _StubHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def delay(self):
+        with self._lock:
+            self.requests += 1
+        delay = self.latency
+        if self.jitter:
+            delay = random.gauss(self.latency, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def body(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Return the JSON body and ETag for url, or None if it is unknown."""
+        cached = self._bodies.get(url)
+        if cached is not None:
+            return cached
+        parts = urlsplit(url)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        for pattern, handler in self.routes:
+            match = pattern.match(parts.path)
+            if match is None:
+                continue
+            payload = handler(match, query)
+            if payload is None:
+                return None
+            body = json.dumps(payload).encode("utf-8")
+            result = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+            with self._lock:
+                if len(self._bodies) > 20000:
+                    self._bodies.clear()
+                self._bodies[url] = result
+            return result
+        return None
+
+    def start(self) -> "StubServer":
+        threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        return self
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def do_GET(self):
+        self.server.delay()
+        result = self.server.body(self.path)
+        if result is None:
+            self._send(404, b'{"detail": "Not found"}')
+            return
+        body, etag = result
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+        else:
+            self._send(200, body, etag)
+
+    def do_POST(self):
+        self.server.delay()
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._send(200, b'{"status": "ok"}')
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stubs(
+    data: SyntheticData, latency: float = 0.0, jitter: float = 0.0
+) -> Tuple[StubServer, StubServer]:
+    """Start a stub webepg and a stub ultimate-backend on free ports."""
+    webepg = StubServer(webepg_routes(data), latency, jitter).start()
+    ultimate = StubServer(ultimate_routes(data), latency, jitter).start()
+    return webepg, ultimate
+
+
+def add_data_arguments(parser: argparse.ArgumentParser):
+    """Add the scale and latency options shared by the benchmark scripts."""
+    parser.add_argument("--channels", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--aliases", type=int, default=50000)
+    parser.add_argument("--providers", type=int, default=5)
+    parser.add_argument("--provider-channels", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="upstream delay in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.01, help="standard deviation of the delay"
+    )
+
+
+def data_from_arguments(args) -> SyntheticData:
+    return SyntheticData(
+        channels=args.channels,
+        days=args.days,
+        aliases=args.aliases,
+        providers=args.providers,
+        provider_channels=args.provider_channels,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_data_arguments(parser)
+    args = parser.parse_args()
+
+    webepg, ultimate = start_stubs(data_from_arguments(args), args.latency, args.jitter)
+    print(f"WEBEPG_URL={webepg.url}")
+    print(f"ULTIMATE_BACKEND_URL={ultimate.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        webepg.shutdown()
+        ultimate.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Helpers shared by the benchmark scripts: running ultimate-ui under
+gunicorn, a keep-alive HTTP client and latency summaries.
+"""
+
+import gzip
+import http.client
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, as in the app
+    brotli = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sent with every request, like a browser would
+BROWSER_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Encoding": "gzip, deflate, br" if brotli else "gzip, deflate",
+    "User-Agent": "ultimate-ui-benchmark",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+@contextmanager
+def run_app(
+    webepg_url: str,
+    ultimate_url: str,
+    workers: int = 4,
+    threads: int = 2,
+    worker_class: str = "gthread",
+    env: Optional[Dict[str, str]] = None,
+) -> Iterator[str]:
+    """Run ultimate-ui under gunicorn against the given upstreams.
+
+    Yields the base URL once /health answers; gunicorn is stopped on exit.
+    """
+    port = free_port()
+    server_env = dict(os.environ)
+    server_env.update(
+        {
+            "PORT": str(port),
+            "WEBEPG_URL": webepg_url,
+            "ULTIMATE_BACKEND_URL": ultimate_url,
+            "GUNICORN_WORKER_CLASS": worker_class,
+            "GUNICORN_WORKERS": str(workers),
+            "GUNICORN_THREADS": str(threads),
+        }
+    )
+    server_env.update(env or {})
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            "src.app:app",
+        ],
+        cwd=REPO_ROOT,
+        env=server_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_for(f"{base}/health")
+        yield base
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=35)
+        except subprocess.TimeoutExpired:
+            # Open streaming responses can outlast gunicorn's graceful timeout
+            server.kill()
+            server.wait()
+
+
+class HttpClient:
+    """Keep-alive HTTP client with one connection per calling thread."""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(
+        self, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes, Dict[str, str], float]:
+        """GET path; return status, body, headers and seconds taken.
+
+        Connection errors give status 0 and the connection is reopened on
+        the next call.
+        """
+        request_headers = dict(BROWSER_HEADERS)
+        request_headers.update(headers or {})
+        started = time.perf_counter()
+        for attempt in range(2):
+            conn = self._connection()
+            reused = conn.sock is not None
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                self.close()
+                # Like browsers, retry once if the server closed an idle connection
+                if reused and attempt == 0:
+                    continue
+                return 0, b"", {}, time.perf_counter() - started
+            if response.will_close:
+                self.close()
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            return (
+                response.status,
+                body,
+                response_headers,
+                time.perf_counter() - started,
+            )
+        return 0, b"", {}, time.perf_counter() - started
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def decode_body(body: bytes, headers: Dict[str, str]) -> bytes:
+    """Undo the Content-Encoding of a response body."""
+    encoding = headers.get("content-encoding", "")
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(body)
+    return body
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (in ms) of one measured run."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+    }
@@ -34,6 +34,7 @@ module.exports = [
         Request: "readonly",
         Response: "readonly",
         AbortController: "readonly",
+        EventSource: "readonly",
         Event: "readonly",
         CustomEvent: "readonly",
 
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for ultimate-ui.
+
+Almost every request only waits on webepg or ultimate-backend, so the worker
+model decides how many requests can be in flight. Two modes are supported:
+
+* ``gthread`` (default): ``workers * threads`` concurrent requests.
+* ``gevent``: cooperative I/O. Blocking socket calls made by the API clients
+  yield to other requests, so each worker handles up to
+  ``worker_connections`` concurrent requests.
+
+All values can be overridden with environment variables.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7779')}"
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "500"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+
+def on_starting(server):
+    """Drop the per-worker metrics files of the previous run."""
+    from src.config import Config
+    from src.metrics import clear_directory
+
+    config = Config(os.getenv("ULTIMATE_UI_CONFIG", "config/config.yaml"))
+    clear_directory(config.get("metrics.dir"))
@@ -0,0 +1,181 @@
+"""
+In-memory alias -> channel index, kept in sync with alias writes.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Keys under which webepg may wrap the alias list or mapping
+_PAYLOAD_KEYS = ("aliases", "mapping", "mappings")
+
+
+def alias_records(payload: Any) -> List[Dict]:
+    """Turn an alias mapping payload into a list of alias records.
+
+    Accepts a list of alias objects, an ``{alias: channel}`` mapping (where
+    channel is an id or an object), or either of them wrapped under
+    "aliases"/"mapping". Every record has at least "alias" and "channel_id".
+    """
+    if isinstance(payload, dict):
+        for key in _PAYLOAD_KEYS:
+            if key in payload:
+                return alias_records(payload[key])
+        items: Iterable = (
+            {"alias": alias, **target}
+            if isinstance(target, dict)
+            else {"alias": alias, "channel_id": target}
+            for alias, target in payload.items()
+        )
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        return []
+
+    records = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("alias"):
+            continue
+        record = dict(item)
+        channel_id = record.get("channel_id", record.get("channel_identifier"))
+        if channel_id is None:
+            continue
+        record["channel_id"] = str(channel_id)
+        records.append(record)
+    return records
+
+
+class AliasIndex:
+    """Alias -> channel and channel -> aliases lookups held in memory.
+
+    The index is filled from ``loader`` (the webepg alias mapping) on first
+    use and again after ``ttl`` seconds, to pick up changes made outside
+    this process. Aliases created or deleted through the UI are patched in
+    place, so those never need a full reload.
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 300):
+        self._loader = loader
+        self.ttl = max(float(ttl or 0), 0.0)
+        self._lock = threading.RLock()
+        self._by_alias: Dict[str, Dict] = {}
+        self._by_folded: Dict[str, str] = {}
+        self._by_channel: Dict[str, Dict[str, Dict]] = {}
+        self._by_id: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def ensure_loaded(self):
+        """Load the index if it was never loaded, invalidated or expired.
+
+        Loader errors propagate; a previously loaded index is kept.
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is not None and (
+            not self.ttl or time.monotonic() - loaded_at < self.ttl
+        ):
+            return
+        records = alias_records(self._loader())
+        with self._lock:
+            self._by_alias.clear()
+            self._by_folded.clear()
+            self._by_channel.clear()
+            self._by_id.clear()
+            for record in records:
+                self._add(record)
+            self._loaded_at = time.monotonic()
+        logger.info(f"Loaded alias index with {len(records)} aliases")
+
+    def invalidate(self):
+        """Force a full reload on next use."""
+        with self._lock:
+            self._loaded_at = None
+
+    def add(self, record: Dict):
+        """Insert or replace one alias record, if the index is loaded."""
+        records = alias_records([record])
+        if not records:
+            return
+        with self._lock:
+            if self.loaded:
+                self._add(records[0])
+
+    def remove_id(self, alias_id: Any) -> bool:
+        """Remove the alias with the given id. Returns False if unknown."""
+        with self._lock:
+            alias = self._by_id.get(str(alias_id))
+            if alias is None:
+                return False
+            self._remove(alias)
+            return True
+
+    def resolve(self, alias: str) -> Optional[Dict]:
+        """Return the record for alias, falling back to a case-insensitive match."""
+        self.ensure_loaded()
+        with self._lock:
+            record = self._by_alias.get(alias)
+            if record is None:
+                exact = self._by_folded.get(alias.casefold())
+                record = self._by_alias.get(exact) if exact is not None else None
+            return dict(record) if record is not None else None
+
+    def resolve_many(self, aliases: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Resolve several aliases; unknown ones map to None."""
+        self.ensure_loaded()
+        return {alias: self.resolve(alias) for alias in aliases}
+
+    def aliases_for(self, channel_id: Any) -> List[Dict]:
+        """Return the alias records of one channel."""
+        self.ensure_loaded()
+        with self._lock:
+            return [
+                dict(record)
+                for record in self._by_channel.get(str(channel_id), {}).values()
+            ]
+
+    def statistics(self) -> Dict[str, Any]:
+        """Summarise the aliases held in the index."""
+        self.ensure_loaded()
+        with self._lock:
+            total = len(self._by_alias)
+            channels = len(self._by_channel)
+            by_type = Counter(
+                record.get("alias_type") or "unknown"
+                for record in self._by_alias.values()
+            )
+        return {
+            "total_aliases": total,
+            "channels_with_aliases": channels,
+            "average_aliases_per_channel": round(total / channels, 2)
+            if channels
+            else 0,
+            "aliases_by_type": dict(by_type),
+        }
+
+    def _add(self, record: Dict):
+        alias = record["alias"]
+        if alias in self._by_alias:
+            self._remove(alias)
+        self._by_alias[alias] = record
+        self._by_folded[alias.casefold()] = alias
+        self._by_channel.setdefault(record["channel_id"], {})[alias] = record
+        if record.get("id") is not None:
+            self._by_id[str(record["id"])] = alias
+
+    def _remove(self, alias: str):
+        record = self._by_alias.pop(alias)
+        if self._by_folded.get(alias.casefold()) == alias:
+            del self._by_folded[alias.casefold()]
+        channel_aliases = self._by_channel.get(record["channel_id"], {})
+        channel_aliases.pop(alias, None)
+        if not channel_aliases:
+            self._by_channel.pop(record["channel_id"], None)
+        if record.get("id") is not None:
+            self._by_id.pop(str(record["id"]), None)
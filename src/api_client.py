@@ -3,21 +3,166 @@ API clients for webepg and ultimate-backend.
 """
 
 import logging
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
 import requests
 from requests.exceptions import ConnectionError, RequestException, Timeout
 
+from . import tracing
+from .alias_index import alias_records
+from .cache import TTLCache
+from .circuit_breaker import CircuitBreaker, CircuitBreakerSession, CircuitOpenError
+from .concurrency import fan_out
+from .http_cache import ValidatorCache
+from .http_session import PooledAdapter, mount_adapter
+from .metrics import MetricsRegistry
+from .program_cache import ProgramWindowCache
+from .singleflight import SingleFlight
+from .statistics import StatisticsEngine
+from .timeutils import DEFAULT_TIMEZONE, parse_timestamp
+
 logger = logging.getLogger(__name__)
 
+# Path segments after these name one item; they become "{id}" in metric labels
+_ITEM_COLLECTIONS = {"channels", "providers", "aliases"}
+_ID_SEGMENT = re.compile(r"^\d+$")
+_COLLECTION_ACTIONS = {"mapping", "paginated", "statistics", "search", "resolve"}
+
+
+def endpoint_label(path: str) -> str:
+    """Turn a request path into a low-cardinality endpoint template."""
+    segments = path.split("/")
+    for i in range(1, len(segments)):
+        segment = segments[i]
+        if _ID_SEGMENT.match(segment) or (
+            segments[i - 1] in _ITEM_COLLECTIONS
+            and segment
+            and segment not in _COLLECTION_ACTIONS
+        ):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+class UpstreamSession(CircuitBreakerSession):
+    """Circuit-breaking session that records latency and errors per endpoint.
+
+    Calls made while a request trace is current carry its ``traceparent``
+    and are added to the trace's Server-Timing entries.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        circuit_breaker: CircuitBreaker,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        super().__init__(circuit_breaker)
+        self.upstream = upstream
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.histogram(
+                "upstream_request_duration_seconds",
+                "Upstream request latency by upstream, endpoint and method",
+            )
+            metrics.counter(
+                "upstream_requests_total",
+                "Upstream requests by upstream, endpoint, method and status",
+            )
+            metrics.counter(
+                "upstream_errors_total",
+                "Failed upstream requests by upstream, endpoint and reason",
+            )
+
+    def send(self, request, **kwargs):
+        trace = tracing.current_trace()
+        if trace is not None:
+            request.headers["traceparent"] = trace.traceparent()
+        if self.metrics is None and trace is None:
+            return super().send(request, **kwargs)
+
+        endpoint = endpoint_label(urlsplit(request.url).path)
+        labels = {"upstream": self.upstream, "endpoint": endpoint}
+        status = "error"
+        reason = None
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+            status = str(response.status_code)
+            if response.status_code >= 500:
+                reason = "http_5xx"
+            return response
+        except CircuitOpenError:
+            reason = "circuit_open"
+            raise
+        except Timeout:
+            reason = "timeout"
+            raise
+        except ConnectionError:
+            reason = "connection"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if trace is not None:
+                outcome = reason or status
+                if request.method == "GET" and reason is None:
+                    # A 304 means the validator cache had the body already
+                    outcome = {"200": "miss", "304": "revalidated"}.get(status, status)
+                trace.record(
+                    self.upstream, elapsed, f"{request.method} {endpoint} {outcome}"
+                )
+            if self.metrics is not None:
+                self.metrics.observe(
+                    "upstream_request_duration_seconds",
+                    elapsed,
+                    {**labels, "method": request.method},
+                )
+                self.metrics.inc(
+                    "upstream_requests_total",
+                    {**labels, "method": request.method, "status": status},
+                )
+                if reason is not None:
+                    self.metrics.inc(
+                        "upstream_errors_total", {**labels, "reason": reason}
+                    )
+
 
 class WebEPGClient:
     """Client for interacting with webepg backend."""
 
-    def __init__(self, base_url: str, timeout: int = 10):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 10,
+        cache_ttl: float = 0,
+        cache_stale_ttl: float = 0,
+        program_cache_ttl: float = 0,
+        program_bucket_seconds: int = 3600,
+        timezone: str = DEFAULT_TIMEZONE,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        single_flight: Optional[SingleFlight] = None,
+        http_adapter: Optional[PooledAdapter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.session = requests.Session()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("webepg")
+        self.session = UpstreamSession("webepg", self.circuit_breaker, metrics)
+        self.http_adapter = http_adapter or PooledAdapter()
+        mount_adapter(self.session, self.http_adapter)
+        self._channel_cache = TTLCache(
+            ttl=cache_ttl, stale_ttl=cache_stale_ttl, name="channels"
+        )
+        self._program_cache = ProgramWindowCache(
+            bucket_seconds=program_bucket_seconds, ttl=program_cache_ttl
+        )
+        self.single_flight = single_flight or SingleFlight("webepg")
+        self._validators = ValidatorCache(flight=self.single_flight)
+        self._statistics = StatisticsEngine(timezone=timezone)
 
     def get_health(self) -> bool:
         """Check if webepg is healthy."""
@@ -37,13 +182,9 @@ class WebEPGClient:
             return False
 
     def get_channels(self) -> List[Dict]:
-        """Get all channels."""
+        """Get all channels, served from the channel cache when enabled."""
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/channels", timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response.json()
+            return self._channel_cache.get_or_load("channels", self._fetch_channels)
         except (ConnectionError, Timeout):
             logger.warning(f"Could not connect to WebEPG at {self.base_url}")
             return []
@@ -51,6 +192,56 @@ class WebEPGClient:
             logger.error(f"Error fetching channels: {e}")
             return []
 
+    def _fetch_channels(self) -> List[Dict]:
+        """Fetch the full channel list from webepg, raising on failure."""
+        channels = self._validators.get_json(
+            self.session, f"{self.base_url}/api/v1/channels", timeout=self.timeout
+        )
+        self._statistics.update_channels(channels)
+        return channels
+
+    def invalidate_channels(self):
+        """Drop the cached channel list so the next call refetches it."""
+        self._channel_cache.invalidate()
+
+    def invalidate_programs(self, channel_identifier: Optional[str] = None):
+        """Drop cached programs for one channel, or for all channels."""
+        self._program_cache.invalidate(channel_identifier)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the client-side caches."""
+        return {
+            "channels": self._channel_cache.stats(),
+            "programs": self._program_cache.stats(),
+            "revalidation": self._validators.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "coalescing": self.single_flight.stats(),
+            "http": self.http_adapter.stats(),
+        }
+
+    def get_circuit_state(self) -> Dict[str, Any]:
+        """Get the circuit breaker state (changes only on transitions)."""
+        return self.circuit_breaker.summary()
+
+    def open_stream(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """Start a streaming GET against webepg without decoding the body.
+
+        The caller must close the returned response. Connection errors are
+        raised; HTTP error statuses are not.
+        """
+        return self.session.get(
+            f"{self.base_url}{path}",
+            params=params,
+            headers=headers,
+            timeout=self.timeout,
+            stream=True,
+        )
+
     def get_channel(self, channel_identifier: str) -> Optional[Dict]:
         """Get specific channel by ID, name, or alias."""
         try:
@@ -69,19 +260,47 @@ class WebEPGClient:
             logger.error(f"Error getting channel {channel_identifier}: {e}")
             return None
 
+    def fetch_channel_programs(
+        self, channel_identifier: str, start: str, end: str
+    ) -> List[Dict]:
+        """Get programs for a channel within time range, raising on failure.
+
+        With the program cache enabled, the window is served from hourly
+        buckets and only missing buckets are requested from webepg.
+        """
+        if self._program_cache.enabled:
+            window_start = parse_timestamp(start)
+            window_end = parse_timestamp(end)
+            if window_start is not None and window_end is not None:
+                return self._program_cache.get(
+                    str(channel_identifier),
+                    window_start,
+                    window_end,
+                    lambda run_start, run_end: self._fetch_channel_programs(
+                        channel_identifier, run_start.isoformat(), run_end.isoformat()
+                    ),
+                )
+        return self._fetch_channel_programs(channel_identifier, start, end)
+
+    def _fetch_channel_programs(
+        self, channel_identifier: str, start: str, end: str
+    ) -> List[Dict]:
+        """Request programs for a channel and window from webepg."""
+        programs = self._validators.get_json(
+            self.session,
+            f"{self.base_url}/api/v1/channels/{channel_identifier}/programs",
+            params={"start": start, "end": end},
+            timeout=self.timeout,
+        )
+        self._statistics.record_programs(channel_identifier, start, end, programs)
+        return programs
+
     def get_channel_programs(
         self, channel_identifier: str, start: str, end: str
     ) -> List[Dict]:
         """Get programs for a channel within time range."""
         try:
-            params = {"start": start, "end": end}
-            response = self.session.get(
-                f"{self.base_url}/api/v1/channels/{channel_identifier}/programs",
-                params=params,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json()
+            return self.fetch_channel_programs(channel_identifier, start, end)
         except (ConnectionError, Timeout):
             logger.warning(f"Could not connect to WebEPG at {self.base_url}")
             return []
@@ -92,11 +311,9 @@ class WebEPGClient:
     def get_providers(self) -> List[Dict]:
         """Get all EPG providers."""
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/v1/providers", timeout=self.timeout
+            return self._validators.get_json(
+                self.session, f"{self.base_url}/api/v1/providers", timeout=self.timeout
             )
-            response.raise_for_status()
-            return response.json()
         except (ConnectionError, Timeout):
             logger.warning(f"Could not connect to WebEPG at {self.base_url}")
             return []
@@ -141,6 +358,16 @@ class WebEPGClient:
             logger.error(f"Error creating alias: {e}")
             return None
 
+    def fetch_alias_mapping(self) -> Any:
+        """Fetch the alias -> channel mapping from webepg, raising on failure."""
+        mapping = self._validators.get_json(
+            self.session,
+            f"{self.base_url}/api/v1/aliases/mapping",
+            timeout=self.timeout,
+        )
+        self._statistics.update_aliases(alias_records(mapping))
+        return mapping
+
     def get_import_status(self) -> Dict:
         """Get import job status."""
         try:
@@ -186,67 +413,84 @@ class WebEPGClient:
             return self._calculate_basic_stats()
 
     def _calculate_basic_stats(self) -> Dict:
-        """Calculate basic statistics from available data."""
-        stats = {"total_channels": 0, "estimated_programs_today": 0}
-        try:
-            channels = self.get_channels()
-            stats["total_channels"] = len(channels)
-
-            # Get programs for today to estimate
-            import datetime
-
-            today = datetime.datetime.now().isoformat()
-            tomorrow = (
-                datetime.datetime.now() + datetime.timedelta(days=1)
-            ).isoformat()
-
-            programs_today = 0
-            for channel in channels[:5]:  # Sample first 5 channels
-                if "id" in channel:
-                    programs = self.get_channel_programs(
-                        str(channel["id"]), today, tomorrow
-                    )
-                    programs_today += len(programs)
+        """Statistics computed locally from already fetched data.
 
-            stats["estimated_programs_today"] = programs_today
-
-        except Exception:
-            pass
-
-        return stats
+        Used when webepg's statistics endpoint fails. Only the channel list
+        may be requested (usually answered from the channel cache); program
+        and alias counts cover what the UI has loaded so far, as of the
+        returned "as_of" time.
+        """
+        if not self._statistics.has_data:
+            self.get_channels()
+        return self._statistics.snapshot()
 
 
 class UltimateBackendClient:
     """Client for interacting with ultimate-backend."""
 
-    def __init__(self, base_url: str, timeout: int = 10):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 10,
+        max_concurrency: int = 4,
+        provider_timeout: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        single_flight: Optional[SingleFlight] = None,
+        http_adapter: Optional[PooledAdapter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.session = requests.Session()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("ultimate_backend")
+        self.session = UpstreamSession(
+            "ultimate_backend", self.circuit_breaker, metrics
+        )
+        self.http_adapter = http_adapter or PooledAdapter()
+        mount_adapter(self.session, self.http_adapter)
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.provider_timeout = provider_timeout or timeout
+        self.single_flight = single_flight or SingleFlight("ultimate_backend")
+        self._validators = ValidatorCache(flight=self.single_flight)
+
+    def get_circuit_state(self) -> Dict[str, Any]:
+        """Get the circuit breaker state (changes only on transitions)."""
+        return self.circuit_breaker.summary()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get revalidation, circuit breaker and coalescing counters."""
+        return {
+            "revalidation": self._validators.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "coalescing": self.single_flight.stats(),
+            "http": self.http_adapter.stats(),
+        }
 
     def get_providers(self) -> List[Dict]:
         """Get available providers from ultimate-backend."""
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/providers", timeout=self.timeout
+            return self._validators.get_json(
+                self.session, f"{self.base_url}/api/providers", timeout=self.timeout
             )
-            response.raise_for_status()
-            return response.json()
         except (ConnectionError, Timeout):
             logger.warning(f"Could not connect to Ultimate Backend at {self.base_url}")
             return []
         except RequestException:
             return []
 
+    def fetch_provider_channels(
+        self, provider_id: str, timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """Get channels for a specific provider, raising on failure."""
+        return self._validators.get_json(
+            self.session,
+            f"{self.base_url}/api/providers/{provider_id}/channels",
+            timeout=timeout or self.timeout,
+        )
+
     def get_provider_channels(self, provider_id: str) -> List[Dict]:
         """Get channels for a specific provider."""
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/providers/{provider_id}/channels",
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json()
+            return self.fetch_provider_channels(provider_id)
         except (ConnectionError, Timeout):
             logger.warning(f"Could not connect to Ultimate Backend at {self.base_url}")
             return []
@@ -254,17 +498,54 @@ class UltimateBackendClient:
             return []
 
     def get_all_channels(self) -> Dict[str, Any]:
-        """Get all channels grouped by provider."""
-        providers = self.get_providers()
+        """Get all channels grouped by provider.
+
+        Provider lineups are fetched concurrently, at most
+        ``max_concurrency`` at a time and each bounded by
+        ``provider_timeout``. Providers that fail keep an empty channel list
+        and carry an ``error`` message.
+        """
+        providers = [p for p in self.get_providers() if p.get("id")]
         all_channels: Dict[str, Any] = {}
+        if not providers:
+            return all_channels
+
+        provider_ids = [provider["id"] for provider in providers]
+        workers = min(self.max_concurrency, len(provider_ids))
+        # Providers beyond the concurrency cap run in later waves
+        deadline = self.provider_timeout * math.ceil(len(provider_ids) / workers)
+
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ultimate-channels"
+        )
+        try:
+            outcome = fan_out(
+                lambda provider_id: self.fetch_provider_channels(
+                    provider_id, timeout=self.provider_timeout
+                ),
+                provider_ids,
+                executor,
+                timeout=deadline,
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         for provider in providers:
-            provider_id = provider.get("id")
-            if provider_id:
-                channels = self.get_provider_channels(provider_id)
-                all_channels[provider_id] = {
-                    "provider_info": provider,
-                    "channels": channels,
-                }
+            provider_id = provider["id"]
+            entry: Dict[str, Any] = {
+                "provider_info": provider,
+                "channels": outcome.results.get(provider_id, []),
+            }
+            if provider_id in outcome.errors:
+                error = outcome.errors[provider_id]
+                entry["error"] = str(error) or type(error).__name__
+            elif provider_id in outcome.timed_out:
+                entry["error"] = "Timed out"
+            if "error" in entry:
+                logger.warning(
+                    f"Could not load channels for provider {provider_id}: "
+                    f"{entry['error']}"
+                )
+            all_channels[provider_id] = entry
 
         return all_channels
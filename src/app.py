@@ -3,14 +3,50 @@ Main Flask application for ultimate-ui - FIXED VERSION WITH PROVIDER PROXIES
 """
 
 import logging
+import mimetypes
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
-import pytz
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    g,
+    jsonify,
+    render_template,
+    request,
+    send_file,
+    send_from_directory,
+    template_rendered,
+    url_for,
+)
+from flask.json.provider import DefaultJSONProvider
 
+from . import tracing
+from .alias_index import AliasIndex
 from .api_client import UltimateBackendClient, WebEPGClient
+from .assets import AssetManifest, build_manifest
+from .channel_index import ChannelIndex
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .compression import (
+    CompressionStats,
+    compress_response,
+    precompress_directory,
+    precompressed_variant,
+)
+from .concurrency import fan_out
 from .config import Config
+from .http_session import PooledAdapter
+from .matching import ChannelMatcher
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import SIZE_BUCKETS, MetricsRegistry
+from .monitoring import MonitoringAggregator
+from .profiling import PROFILE_HEADER, ProfilingMiddleware, RequestProfiler
+from .singleflight import SingleFlight
+from .timeutils import DEFAULT_TIMEZONE, localize_programs, parse_timestamp, to_local
 
 # Setup logging
 logging.basicConfig(
@@ -25,6 +61,13 @@ config = Config(config_path)
 # Initialize API clients as None (lazy initialization)
 _webepg_client = None
 _ultimate_backend_client = None
+_channel_index = None
+_fanout_executor = None
+_channel_matcher = None
+_alias_index = None
+_monitoring_aggregator = None
+_stream_slots = None
+_profiler = None
 
 
 def _get_config_value(key, default):
@@ -36,14 +79,81 @@ def _get_config_value(key, default):
         return default
 
 
+def _create_circuit_breaker(name):
+    """Build the circuit breaker for one upstream from the configuration."""
+    return CircuitBreaker(
+        name,
+        failure_threshold=_get_config_value("circuit_breaker.failure_threshold", 5),
+        recovery_timeout=_get_config_value("circuit_breaker.recovery_timeout", 30),
+        max_recovery_timeout=_get_config_value(
+            "circuit_breaker.max_recovery_timeout", 300
+        ),
+    )
+
+
+def _create_single_flight(name):
+    """Build the request coalescer for one upstream from the configuration."""
+    return SingleFlight(
+        name,
+        enabled=bool(_get_config_value("coalescing.enabled", True)),
+        lock_dir=_get_config_value("coalescing.lock_dir", "") or None,
+        wait_timeout=_get_config_value("coalescing.wait_timeout", 30.0),
+    )
+
+
+def _create_http_adapter():
+    """Build the connection pool and retry policy for one upstream."""
+    return PooledAdapter(
+        pool_connections=_get_config_value("http.pool_connections", 10),
+        pool_maxsize=_get_config_value("http.pool_maxsize", 16),
+        pool_block=_get_config_value("http.pool_block", False),
+        keep_alive=_get_config_value("http.keep_alive", True),
+        retries=_get_config_value("http.retries", 2),
+        backoff_factor=_get_config_value("http.backoff_factor", 0.2),
+        backoff_jitter=_get_config_value("http.backoff_jitter", 0.2),
+        backoff_max=_get_config_value("http.backoff_max", 5.0),
+    )
+
+
+def _create_webepg_client():
+    """Build a WebEPG client from the current configuration."""
+    cache_enabled = _get_config_value("cache.enabled", True)
+    return WebEPGClient(
+        base_url=_get_config_value("webepg.url", "http://localhost:8080"),
+        timeout=_get_config_value("webepg.timeout", 10),
+        cache_ttl=_get_config_value("cache.ttl", 60) if cache_enabled else 0,
+        cache_stale_ttl=_get_config_value("cache.stale_ttl", 300),
+        program_cache_ttl=(
+            _get_config_value("cache.program_ttl", 300) if cache_enabled else 0
+        ),
+        program_bucket_seconds=_get_config_value("cache.program_bucket", 3600),
+        timezone=_get_config_value("ui.timezone", DEFAULT_TIMEZONE),
+        circuit_breaker=_create_circuit_breaker("webepg"),
+        single_flight=_create_single_flight("webepg"),
+        http_adapter=_create_http_adapter(),
+        metrics=metrics if _get_config_value("metrics.enabled", True) else None,
+    )
+
+
+def _create_ultimate_backend_client():
+    """Build an Ultimate Backend client from the current configuration."""
+    return UltimateBackendClient(
+        base_url=_get_config_value("ultimate_backend.url", "http://localhost:3000"),
+        timeout=_get_config_value("ultimate_backend.timeout", 10),
+        max_concurrency=_get_config_value("ultimate_backend.max_concurrency", 4),
+        provider_timeout=_get_config_value("ultimate_backend.provider_timeout", None),
+        circuit_breaker=_create_circuit_breaker("ultimate_backend"),
+        single_flight=_create_single_flight("ultimate_backend"),
+        http_adapter=_create_http_adapter(),
+        metrics=metrics if _get_config_value("metrics.enabled", True) else None,
+    )
+
+
 def get_webepg_client():
     """Get or create WebEPG client with lazy initialization."""
     global _webepg_client
     if _webepg_client is None:
-        _webepg_client = WebEPGClient(
-            base_url=_get_config_value("webepg.url", "http://localhost:8080"),
-            timeout=_get_config_value("webepg.timeout", 10),
-        )
+        _webepg_client = _create_webepg_client()
     return _webepg_client
 
 
@@ -51,33 +161,315 @@ def get_ultimate_backend_client():
     """Get or create Ultimate Backend client with lazy initialization."""
     global _ultimate_backend_client
     if _ultimate_backend_client is None:
-        _ultimate_backend_client = UltimateBackendClient(
-            base_url=_get_config_value("ultimate_backend.url", "http://localhost:3000"),
-            timeout=_get_config_value("ultimate_backend.timeout", 10),
-        )
+        _ultimate_backend_client = _create_ultimate_backend_client()
     return _ultimate_backend_client
 
 
+def get_channel_index():
+    """Get or create the channel index backed by the WebEPG channel list."""
+    global _channel_index
+    if _channel_index is None:
+        _channel_index = ChannelIndex(lambda: get_webepg_client().get_channels())
+    return _channel_index
+
+
+def get_fanout_executor():
+    """Get or create the shared thread pool used for upstream fan-out."""
+    global _fanout_executor
+    if _fanout_executor is None:
+        _fanout_executor = ThreadPoolExecutor(
+            max_workers=max(int(_get_config_value("epg.fanout_workers", 8)), 1),
+            thread_name_prefix="fanout",
+        )
+    return _fanout_executor
+
+
+def get_channel_matcher():
+    """Get or create the fuzzy matcher for streaming -> EPG channel names."""
+    global _channel_matcher
+    if _channel_matcher is None:
+        _channel_matcher = ChannelMatcher(
+            processes=_get_config_value("matching.processes", 2),
+            pool_threshold=_get_config_value("matching.pool_threshold", 200),
+        )
+    return _channel_matcher
+
+
+def get_alias_index():
+    """Get or create the alias index backed by the WebEPG alias mapping."""
+    global _alias_index
+    if _alias_index is None:
+        _alias_index = AliasIndex(
+            lambda: get_webepg_client().fetch_alias_mapping(),
+            ttl=_get_config_value("cache.alias_ttl", 300),
+        )
+    return _alias_index
+
+
+# Monitoring values collected by the aggregator: key -> (client method, fallback)
+MONITORING_SOURCES = {
+    "import_status": ("get_import_status", {}),
+    "statistics": ("get_statistics", {}),
+    "webepg_health": ("get_health", False),
+}
+
+
+def _collect_monitoring_status():
+    """Fetch import status, statistics and health from WebEPG in parallel."""
+    webepg = get_webepg_client()
+    outcome = fan_out(
+        lambda key: getattr(webepg, MONITORING_SOURCES[key][0])(),
+        MONITORING_SOURCES,
+        get_fanout_executor(),
+        timeout=_get_config_value("monitoring.timeout", 15.0),
+    )
+    status = {}
+    for key, (_, fallback) in MONITORING_SOURCES.items():
+        if key in outcome.errors:
+            logger.error(f"Error collecting {key}: {outcome.errors[key]}")
+        status[key] = outcome.results.get(key, fallback)
+    status["circuit_breakers"] = [
+        webepg.get_circuit_state(),
+        get_ultimate_backend_client().get_circuit_state(),
+    ]
+
+    import_status = dict(status["import_status"] or {})
+    import_status.setdefault("recent_imports", [])
+    status["import_status"] = import_status
+    return status
+
+
+def get_monitoring_aggregator():
+    """Get or create the background collector for the monitoring status."""
+    global _monitoring_aggregator
+    if _monitoring_aggregator is None:
+        _monitoring_aggregator = MonitoringAggregator(
+            _collect_monitoring_status,
+            interval=_get_config_value("monitoring.interval", 30),
+            active_interval=_get_config_value("monitoring.active_interval", 5),
+        )
+    return _monitoring_aggregator
+
+
+def _poke_monitoring():
+    """Collect the monitoring status early, e.g. right after an import trigger."""
+    if _monitoring_aggregator is not None:
+        _monitoring_aggregator.poke()
+
+
+def _cooperative_io():
+    """Whether blocking waits yield to other requests (gunicorn gevent worker)."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+def _stream_limit():
+    """Maximum number of concurrent monitoring streams per worker.
+
+    A stream parks its request until the client disconnects. Under gevent
+    that costs a greenlet, under gthread a whole worker thread for up to
+    ``monitoring.stream_max_seconds``, so unless ``stream_max_clients`` is
+    set streaming is only enabled for gevent and gthread clients poll.
+    """
+    limit = int(_get_config_value("monitoring.stream_max_clients", 0) or 0)
+    if limit > 0:
+        return limit
+    return 500 if _cooperative_io() else 0
+
+
+def get_stream_slots():
+    """Get the semaphore limiting concurrent monitoring streams in this worker."""
+    global _stream_slots
+    if _stream_slots is None:
+        _stream_slots = threading.BoundedSemaphore(_stream_limit())
+    return _stream_slots
+
+
+def get_profiler():
+    """Get the request profiler, or None while profiling is disabled."""
+    global _profiler
+    if not _get_config_value("profiling.enabled", False):
+        return None
+    token = _get_config_value("profiling.token", "")
+    if not token:
+        return None
+    if _profiler is None or _profiler.token != token:
+        _profiler = RequestProfiler(
+            directory=_get_config_value("profiling.dir", "/app/data/profiles"),
+            token=token,
+            max_profiles=_get_config_value("profiling.max_profiles", 50),
+        )
+    return _profiler
+
+
 def update_clients():
     """Update clients with new configuration."""
-    global _webepg_client, _ultimate_backend_client
-    _webepg_client = WebEPGClient(
-        base_url=_get_config_value("webepg.url", "http://localhost:8080"),
-        timeout=_get_config_value("webepg.timeout", 10),
+    global _webepg_client, _ultimate_backend_client, _fanout_executor
+    global _channel_matcher, _alias_index, _monitoring_aggregator, _profiler
+    _webepg_client = _create_webepg_client()
+    _ultimate_backend_client = _create_ultimate_backend_client()
+    if _fanout_executor is not None:
+        _fanout_executor.shutdown(wait=False)
+        _fanout_executor = None
+    if _channel_matcher is not None:
+        _channel_matcher.close()
+        _channel_matcher = None
+    _alias_index = None
+    if _monitoring_aggregator is not None:
+        _monitoring_aggregator.stop()
+        _monitoring_aggregator = None
+    _profiler = None
+
+
+# Create Flask app
+# Static files are served by serve_static below (endpoint "static"), which
+# knows about precompressed .br/.gz variants
+app = Flask(__name__, template_folder="templates", static_folder=None)
+STATIC_DIR = os.path.join(app.root_path, "static")
+
+# Requests carrying the profiling token are profiled end to end (see /api/admin/profiles)
+app.wsgi_app = ProfilingMiddleware(app.wsgi_app, get_profiler)  # type: ignore[method-assign]
+
+# Counters for on-the-fly API response compression
+compression_stats = CompressionStats()
+
+# Logical static file name -> content-hashed copy (see `flask build-assets`)
+asset_manifest = AssetManifest(STATIC_DIR)
+
+
+# Request, template and upstream metrics, merged across gunicorn workers
+def _define_request_metrics(registry):
+    """Declare the route and template metrics recorded by the app."""
+    registry.histogram(
+        "http_request_duration_seconds", "Request latency by route and method"
     )
-    _ultimate_backend_client = UltimateBackendClient(
-        base_url=_get_config_value("ultimate_backend.url", "http://localhost:3000"),
-        timeout=_get_config_value("ultimate_backend.timeout", 10),
+    registry.counter("http_requests_total", "Requests by route, method and status")
+    registry.histogram(
+        "http_response_size_bytes", "Response body size by route", SIZE_BUCKETS
     )
+    registry.gauge(
+        "http_requests_in_flight", "Requests being handled (open streams excluded)"
+    )
+    registry.histogram(
+        "template_render_duration_seconds", "Jinja rendering time by template"
+    )
+    return registry
 
 
-# Create Flask app
-app = Flask(__name__, template_folder="templates", static_folder="static")
+metrics = _define_request_metrics(
+    MetricsRegistry(
+        directory=_get_config_value("metrics.dir", "") or None,
+        flush_interval=_get_config_value("metrics.flush_interval", 5),
+    )
+)
+
+# Cache lifetime for fingerprinted assets, whose content never changes
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
 
 # Add secret key for session management (generate a random one in production)
 app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 
 
+def _metrics_enabled():
+    return bool(_get_config_value("metrics.enabled", True))
+
+
+def _route_label():
+    # The URL rule, not the path, keeps label values bounded
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with serialization time added to the request trace."""
+
+    def dumps(self, obj, **kwargs):
+        with tracing.span("json"):
+            return super().dumps(obj, **kwargs)
+
+
+app.json = TimedJSONProvider(app)
+
+
+@app.before_request
+def start_request_trace():
+    if _get_config_value("tracing.enabled", True):
+        g.trace_token = tracing.start_trace(request.headers.get("traceparent"))
+
+
+@app.before_request
+def start_request_metrics():
+    if not _metrics_enabled():
+        return
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = _route_label()
+    metrics.add("http_requests_in_flight", {"route": g.metrics_route}, 1)
+
+
+@app.after_request
+def add_server_timing(response):
+    """Break the response time down by upstream call, cache, render and JSON."""
+    trace = tracing.current_trace()
+    if trace is not None and g.get("trace_token") is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, status and size (registered first, so it runs last)."""
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+    labels = {"route": g.metrics_route, "method": request.method}
+    metrics.observe(
+        "http_request_duration_seconds", time.perf_counter() - started, labels
+    )
+    metrics.inc("http_requests_total", {**labels, "status": response.status_code})
+    if response.content_length is not None:
+        metrics.observe(
+            "http_response_size_bytes",
+            response.content_length,
+            {"route": g.metrics_route},
+        )
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if g.pop("metrics_started", None) is not None:
+        metrics.add("http_requests_in_flight", {"route": g.metrics_route}, -1)
+
+
+@app.teardown_request
+def finish_request_trace(error=None):
+    token = g.pop("trace_token", None)
+    if token is not None:
+        tracing.end_trace(token)
+
+
+def _record_template_start(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+
+def _record_template_rendered(sender, template, context, **extra):
+    started = g.pop("template_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    tracing.record("render", elapsed, template.name)
+    if _metrics_enabled():
+        metrics.observe(
+            "template_render_duration_seconds", elapsed, {"template": template.name}
+        )
+
+
+before_render_template.connect(_record_template_start, app)
+template_rendered.connect(_record_template_rendered, app)
+
+
 @app.template_filter("format_time")
 def format_time(value):
     """Format datetime to HH:MM time string with timezone conversion."""
@@ -85,29 +477,9 @@ def format_time(value):
         return ""
 
     try:
-        # Get timezone from config
-        ui_timezone = config.get("ui.timezone", "Europe/Berlin")
-
-        # Parse the date
-        if isinstance(value, str):
-            # Handle ISO format with timezone
-            if "Z" in value:
-                date = datetime.fromisoformat(value.replace("Z", "+00:00"))
-            elif "+" in value or "-" in value[10:]:  # Has timezone offset
-                date = datetime.fromisoformat(value)
-            else:
-                # Assume UTC if no timezone specified
-                date = datetime.fromisoformat(value + "+00:00")
-        else:
-            date = value
-
-        # Ensure datetime has timezone info
-        if date.tzinfo is None:
-            date = date.replace(tzinfo=timezone.utc)
-
-        # Convert to configured timezone
-        target_tz = pytz.timezone(ui_timezone)
-        local_date = date.astimezone(target_tz)
+        local_date = to_local(value, _get_config_value("ui.timezone", DEFAULT_TIMEZONE))
+        if local_date is None:
+            raise ValueError("unparseable timestamp")
 
         # Format as HH:MM
         return local_date.strftime("%H:%M")
@@ -137,27 +509,9 @@ def format_datetime(value):
         return ""
 
     try:
-        # Get timezone from config
-        ui_timezone = config.get("ui.timezone", "Europe/Berlin")
-
-        # Parse the date
-        if isinstance(value, str):
-            if "Z" in value:
-                date = datetime.fromisoformat(value.replace("Z", "+00:00"))
-            elif "+" in value or "-" in value[10:]:
-                date = datetime.fromisoformat(value)
-            else:
-                date = datetime.fromisoformat(value + "+00:00")
-        else:
-            date = value
-
-        # Ensure datetime has timezone info
-        if date.tzinfo is None:
-            date = date.replace(tzinfo=timezone.utc)
-
-        # Convert to configured timezone
-        target_tz = pytz.timezone(ui_timezone)
-        local_date = date.astimezone(target_tz)
+        local_date = to_local(value, _get_config_value("ui.timezone", DEFAULT_TIMEZONE))
+        if local_date is None:
+            raise ValueError("unparseable timestamp")
 
         # Format as localized date/time
         return local_date.strftime("%d.%m.%Y %H:%M")
@@ -167,6 +521,12 @@ def format_datetime(value):
         return str(value)
 
 
+@app.template_global("asset_url")
+def asset_url(filename):
+    """URL of a static asset, using its fingerprinted copy when built."""
+    return url_for("static", filename=asset_manifest.resolve(filename))
+
+
 @app.template_filter("truncate")
 def truncate_filter(text, length=100):
     """Truncate text to specified length."""
@@ -184,9 +544,11 @@ def time_diff_filter(start, end):
         return "-"
     try:
         if isinstance(start, str):
-            start = datetime.fromisoformat(start.replace("Z", "+00:00"))
+            start = parse_timestamp(start)
         if isinstance(end, str):
-            end = datetime.fromisoformat(end.replace("Z", "+00:00"))
+            end = parse_timestamp(end)
+        if start is None or end is None:
+            raise ValueError("unparseable timestamp")
 
         diff = end - start
         hours = diff.seconds // 3600
@@ -212,9 +574,50 @@ def inject_config():
         "current_year": datetime.now().year,
         "current_time": datetime.now().strftime("%a, %d.%m %H:%M"),
         "config_path": config_path,  # ADDED - was missing
+        "status_stream_enabled": _stream_limit() > 0,
     }
 
 
+def _serialize_programs(programs):
+    """Ensure program start/end times are ISO strings for JSON responses.
+
+    Also adds the start_time_local, end_time_local and date_local display
+    fields in the configured UI timezone.
+    """
+    localize_programs(programs, _get_config_value("ui.timezone", DEFAULT_TIMEZONE))
+    processed_programs = []
+    for program in programs:
+        if isinstance(program.get("start_time"), datetime):
+            program["start_time"] = program["start_time"].isoformat()
+        if isinstance(program.get("end_time"), datetime):
+            program["end_time"] = program["end_time"].isoformat()
+        processed_programs.append(program)
+    return processed_programs
+
+
+def _json_with_etag(payload, etag=None):
+    """Return payload as JSON with a strong ETag, or 304 if the client has it.
+
+    With a precomputed etag (such as the channel snapshot version) a matching
+    request is answered before the payload is serialized; otherwise the tag
+    is a hash of the serialized body. Compressed responses carry the weak
+    form of the tag, so the precomputed tag is compared weakly.
+    """
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+    else:
+        response = jsonify(payload)
+        if etag is None:
+            response.add_etag()
+        else:
+            response.set_etag(etag)
+        response = response.make_conditional(request)
+    # Let browsers keep the body but revalidate it on every use
+    response.cache_control.no_cache = True
+    return response
+
+
 @app.route("/")
 def index():
     """Home page - redirect to EPG tab."""
@@ -291,26 +694,14 @@ def epg_mapping():
 def monitoring():
     """Monitoring tab - FIXED data structure."""
     try:
-        webepg = get_webepg_client()
-
-        # Get import status from webepg
-        import_status = webepg.get_import_status()
-
-        # Get statistics
-        statistics = webepg.get_statistics()
-
-        # Check backend health
-        webepg_health = webepg.get_health()
-
-        # Ensure recent_imports exists in import_status
-        if "recent_imports" not in import_status:
-            import_status["recent_imports"] = []
+        status = get_monitoring_aggregator().snapshot().data
 
         return render_template(
             "monitoring.html",
-            import_status=import_status,
-            statistics=statistics,
-            webepg_health=webepg_health,
+            import_status=status["import_status"],
+            statistics=status["statistics"],
+            webepg_health=status["webepg_health"],
+            circuit_breakers=status.get("circuit_breakers", []),
             active_tab="monitoring",
         )
 
@@ -341,6 +732,65 @@ def epg_providers():
 # ============================================================================
 
 
+# Upstream response headers forwarded by passthrough proxy routes
+PASSTHROUGH_HEADERS = (
+    "Content-Type",
+    "Content-Encoding",
+    "Content-Length",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+)
+PASSTHROUGH_CHUNK_SIZE = 64 * 1024
+
+
+def _circuit_open_response(error):
+    """503 for a request rejected because its upstream's circuit is open."""
+    response = jsonify({"error": str(error), "circuit_open": error.name})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(max(int(error.retry_in), 1))
+    return response
+
+
+@app.errorhandler(CircuitOpenError)
+def handle_circuit_open(error):
+    return _circuit_open_response(error)
+
+
+def _passthrough(client, path, params=None):
+    """Stream an upstream GET response to the client byte for byte.
+
+    The body is never decoded or re-encoded: status, content type and
+    content encoding are kept, and the client's Accept-Encoding is forwarded
+    so a compressed upstream body is only passed on to clients that accept it.
+    """
+    headers = {"Accept-Encoding": request.headers.get("Accept-Encoding", "identity")}
+    # Forward validators so an unchanged upstream resource comes back as 304
+    for name in ("If-None-Match", "If-Modified-Since"):
+        if name in request.headers:
+            headers[name] = request.headers[name]
+    try:
+        upstream = client.open_stream(path, params=params, headers=headers)
+    except CircuitOpenError as e:
+        return _circuit_open_response(e)
+    if upstream.status_code >= 400:
+        logger.warning(f"Upstream {path} returned HTTP {upstream.status_code}")
+
+    headers = {
+        name: upstream.headers[name]
+        for name in PASSTHROUGH_HEADERS
+        if name in upstream.headers
+    }
+
+    def generate():
+        try:
+            yield from upstream.raw.stream(PASSTHROUGH_CHUNK_SIZE, decode_content=False)
+        finally:
+            upstream.close()
+
+    return Response(generate(), status=upstream.status_code, headers=headers)
+
+
 @app.route("/api/providers", methods=["GET"])
 def api_list_providers():
     """PROXY: List all providers from WebEPG backend."""
@@ -355,15 +805,10 @@ def api_list_providers():
 
 @app.route("/api/providers/<int:provider_id>", methods=["GET"])
 def api_get_provider(provider_id):
-    """PROXY: Get provider by ID from WebEPG backend."""
+    """PROXY: Get provider by ID from WebEPG backend (streamed passthrough)."""
     try:
         webepg = get_webepg_client()
-        # WebEPGClient doesn't have get_provider, use session directly
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/providers/{provider_id}", timeout=webepg.timeout
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, f"/api/v1/providers/{provider_id}")
     except Exception as e:
         logger.error(f"Error getting provider {provider_id}: {e}")
         return jsonify({"error": str(e)}), 500
@@ -465,6 +910,7 @@ def api_trigger_provider_import(provider_id):
             timeout=webepg.timeout,
         )
         response.raise_for_status()
+        _poke_monitoring()
         return jsonify(response.json())
     except Exception as e:
         logger.error(f"Error triggering import for provider {provider_id}: {e}")
@@ -487,9 +933,8 @@ def api_import_status():
 def api_list_channels():
     """PROXY: List all channels from WebEPG backend."""
     try:
-        webepg = get_webepg_client()
-        channels = webepg.get_channels()
-        return jsonify(channels)
+        snapshot = get_channel_index().snapshot()
+        return _json_with_etag(snapshot.source, etag=snapshot.version)
     except Exception as e:
         logger.error(f"Error listing channels: {e}")
         return jsonify({"error": str(e)}), 500
@@ -497,14 +942,10 @@ def api_list_channels():
 
 @app.route("/api/aliases", methods=["GET"])
 def api_list_all_aliases():
-    """PROXY: Get all aliases from WebEPG."""
+    """PROXY: Get all aliases from WebEPG (streamed passthrough)."""
     try:
         webepg = get_webepg_client()
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/aliases", timeout=webepg.timeout
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, "/api/v1/aliases")
     except Exception as e:
         logger.error(f"Error listing aliases: {e}")
         return jsonify({"error": str(e)}), 500
@@ -526,13 +967,7 @@ def api_list_aliases_paginated():
         if channel_id:
             params["channel_id"] = channel_id
 
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/aliases/paginated",
-            params=params,
-            timeout=webepg.timeout,
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, "/api/v1/aliases/paginated", params=params)
     except Exception as e:
         logger.error(f"Error listing paginated aliases: {e}")
         return jsonify({"error": str(e)}), 500
@@ -540,46 +975,97 @@ def api_list_aliases_paginated():
 
 @app.route("/api/aliases/statistics", methods=["GET"])
 def api_get_alias_statistics():
-    """PROXY: Get alias statistics."""
+    """Get alias statistics from the alias index, or from WebEPG as fallback."""
+    try:
+        return _json_with_etag(get_alias_index().statistics())
+    except Exception as e:
+        logger.warning(f"Alias index unavailable, proxying statistics: {e}")
     try:
         webepg = get_webepg_client()
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/aliases/statistics", timeout=webepg.timeout
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, "/api/v1/aliases/statistics")
     except Exception as e:
         logger.error(f"Error getting alias statistics: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+# Upper bound on aliases resolved by one batch request
+MAX_RESOLVE_ALIASES = 1000
+
+
+@app.route("/api/aliases/resolve", methods=["GET", "POST"])
+def api_resolve_aliases():
+    """Resolve aliases to channels from the in-memory alias index.
+
+    GET takes one or more ``alias`` query parameters, POST a JSON body
+    ``{"aliases": [...]}``. Unknown aliases resolve to null.
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        aliases = data.get("aliases")
+    else:
+        aliases = request.args.getlist("alias")
+    if (
+        not isinstance(aliases, list)
+        or not aliases
+        or not all(isinstance(alias, str) for alias in aliases)
+    ):
+        return jsonify({"success": False, "error": "aliases must be a list"}), 400
+    if len(aliases) > MAX_RESOLVE_ALIASES:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": f"At most {MAX_RESOLVE_ALIASES} aliases per request",
+                }
+            ),
+            400,
+        )
+
+    try:
+        resolved = get_alias_index().resolve_many(aliases)
+        return _json_with_etag({"success": True, "resolved": resolved})
+    except Exception as e:
+        logger.error(f"Error resolving aliases: {e}")
+        return jsonify({"success": False, "error": str(e)}), 502
+
+
 @app.route("/api/aliases/mapping", methods=["GET"])
 def api_get_alias_mapping():
     """PROXY: Get optimized alias mapping."""
     try:
         webepg = get_webepg_client()
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/aliases/mapping", timeout=webepg.timeout
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, "/api/v1/aliases/mapping")
     except Exception as e:
         logger.error(f"Error getting alias mapping: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+def _upstream_alias(record):
+    """Give an alias index record the numeric channel_id WebEPG returns."""
+    channel_id = record["channel_id"]
+    if channel_id.isdigit():
+        record["channel_id"] = int(channel_id)
+    return record
+
+
 @app.route("/api/channels/<channel_identifier>/aliases", methods=["GET"])
 def api_list_channel_aliases(channel_identifier):
-    """PROXY: List aliases for a specific channel."""
+    """List the aliases of a channel from the alias index, or from WebEPG.
+
+    The index is keyed by channel id and only answers when it holds full
+    alias objects for the channel. Channel names, unknown ids and mappings
+    without alias details are proxied, since WebEPG resolves those itself.
+    """
+    try:
+        records = get_alias_index().aliases_for(channel_identifier)
+    except Exception as e:
+        logger.warning(f"Alias index unavailable, proxying channel aliases: {e}")
+        records = []
+    if records and all(record.get("id") is not None for record in records):
+        return _json_with_etag([_upstream_alias(record) for record in records])
     try:
         webepg = get_webepg_client()
-        # Use session directly since WebEPGClient doesn't have list_aliases method
-        response = webepg.session.get(
-            f"{webepg.base_url}/api/v1/channels/{channel_identifier}/aliases",
-            timeout=webepg.timeout,
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return _passthrough(webepg, f"/api/v1/channels/{channel_identifier}/aliases")
     except Exception as e:
         logger.error(f"Error listing aliases: {e}")
         return jsonify({"error": str(e)}), 500
@@ -594,6 +1080,10 @@ def api_delete_alias(alias_id):
             f"{webepg.base_url}/api/v1/aliases/{alias_id}", timeout=webepg.timeout
         )
         response.raise_for_status()
+        index = get_alias_index()
+        if not index.remove_id(alias_id):
+            # Not in the index (not loaded yet or added elsewhere): reload later
+            index.invalidate()
         return "", 204
     except Exception as e:
         logger.error(f"Error deleting alias {alias_id}: {e}")
@@ -611,6 +1101,7 @@ def api_trigger_import():
     try:
         webepg = get_webepg_client()
         result = webepg.trigger_import()
+        _poke_monitoring()
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error triggering import: {e}")
@@ -623,24 +1114,92 @@ def api_get_mapping_providers():
     try:
         ultimate = get_ultimate_backend_client()
         providers = ultimate.get_providers()
-        return jsonify({"success": True, "providers": providers})
+        return _json_with_etag({"success": True, "providers": providers})
     except Exception as e:
         logger.error(f"Error getting providers: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/mapping/channels")
+def api_get_all_provider_channels():
+    """Get channels for every provider in one call."""
+    try:
+        ultimate = get_ultimate_backend_client()
+        all_channels = ultimate.get_all_channels()
+        failed = [
+            provider_id
+            for provider_id, entry in all_channels.items()
+            if entry.get("error")
+        ]
+        return _json_with_etag(
+            {"success": True, "providers": all_channels, "failed": failed}
+        )
+    except Exception as e:
+        logger.error(f"Error getting all provider channels: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/api/mapping/channels/<provider_id>")
 def api_get_provider_channels(provider_id):
     """Get channels for a specific provider."""
     try:
         ultimate = get_ultimate_backend_client()
         channels = ultimate.get_provider_channels(provider_id)
-        return jsonify({"success": True, "channels": channels})
+        return _json_with_etag({"success": True, "channels": channels})
     except Exception as e:
         logger.error(f"Error getting provider channels: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+# Upper bound on streaming channels accepted by the suggestions endpoint
+MAX_SUGGESTION_CHANNELS = 5000
+
+
+@app.route("/api/mapping/suggestions", methods=["POST"])
+def api_get_mapping_suggestions():
+    """Rank EPG channel matches for many streaming channels at once.
+
+    Body: ``{"channels": [{"id": ..., "name": ...}], "limit": 3,
+    "min_score": 70}``. Returns the suggestions keyed by streaming channel id.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        channels = data.get("channels")
+        if not isinstance(channels, list) or not channels:
+            return jsonify({"success": False, "error": "No channels given"}), 400
+        if len(channels) > MAX_SUGGESTION_CHANNELS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"At most {MAX_SUGGESTION_CHANNELS} channels per request",
+                    }
+                ),
+                400,
+            )
+        limit = max(min(int(data.get("limit", 3)), 20), 1)
+        min_score = int(data.get("min_score", 70))
+
+        names = {}
+        for channel in channels:
+            if not isinstance(channel, dict) or not channel.get("name"):
+                continue
+            names[str(channel.get("id", channel["name"]))] = channel["name"]
+
+        snapshot = get_channel_index().snapshot()
+        suggestions = get_channel_matcher().suggest(
+            snapshot.source, snapshot.version, names, limit=limit, min_score=min_score
+        )
+        return jsonify(
+            {"success": True, "suggestions": suggestions, "version": snapshot.version}
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting mapping suggestions: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/api/mapping/create-alias", methods=["POST"])
 def api_create_alias():
     """Create a channel alias in webepg-service."""
@@ -658,6 +1217,14 @@ def api_create_alias():
         result = webepg.create_channel_alias(channel_identifier, alias, alias_type)
 
         if result:
+            record = {
+                "alias": alias,
+                "channel_id": channel_identifier,
+                "alias_type": alias_type,
+            }
+            if isinstance(result, dict):
+                record.update(result)
+            get_alias_index().add(record)
             return jsonify(
                 {
                     "success": True,
@@ -675,29 +1242,73 @@ def api_create_alias():
 
 @app.route("/api/monitoring/status")
 def api_get_monitoring_status():
-    """Get comprehensive monitoring status."""
+    """Get comprehensive monitoring status from the shared snapshot."""
     try:
-        webepg = get_webepg_client()
-        import_status = webepg.get_import_status()
-        statistics = webepg.get_statistics()
-        webepg_health = webepg.get_health()
+        snapshot = get_monitoring_aggregator().snapshot()
+        return _json_with_etag(
+            {"success": True, **snapshot.to_dict()},
+            etag=snapshot.digest,
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting monitoring status: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/monitoring/stream")
+def api_monitoring_stream():
+    """Push monitoring changes as Server-Sent Events.
+
+    Events: ``snapshot`` (full state on connect), ``health``,
+    ``import_status``, ``provider_progress`` and ``statistics``. Clients
+    reconnecting with Last-Event-ID only get a snapshot if they missed a
+    change. When streaming is disabled or all stream slots are taken the
+    client gets 503 and is expected to fall back to polling
+    /api/monitoring/status.
+    """
+    slots = get_stream_slots()
+    if not slots.acquire(blocking=False):
+        response = jsonify({"success": False, "error": "Too many monitoring streams"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "60"
+        return response
+
+    try:
+        aggregator = get_monitoring_aggregator()
+        events = aggregator.stream(
+            last_event_id=request.headers.get("Last-Event-ID"),
+            heartbeat=_get_config_value("monitoring.stream_heartbeat", 15),
+            max_seconds=_get_config_value("monitoring.stream_max_seconds", 300),
+        )
+        response = Response(events, mimetype="text/event-stream")
+    except Exception as e:
+        slots.release()
+        logger.error(f"Error opening monitoring stream: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    # Released by the WSGI server once the stream ends or the client leaves
+    response.call_on_close(slots.release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
-        # Ensure recent_imports exists
-        if "recent_imports" not in import_status:
-            import_status["recent_imports"] = []
 
+@app.route("/api/stats")
+def api_get_stats():
+    """Get internal performance counters (cache hit/miss, ...)."""
+    try:
+        webepg = get_webepg_client()
         return jsonify(
             {
                 "success": True,
-                "import_status": import_status,
-                "statistics": statistics,
-                "webepg_health": webepg_health,
+                "cache": webepg.get_cache_stats(),
+                "ultimate_backend": get_ultimate_backend_client().get_cache_stats(),
+                "compression": compression_stats.stats(),
                 "timestamp": datetime.now().isoformat(),
             }
         )
-
     except Exception as e:
-        logger.error(f"Error getting monitoring status: {e}")
+        logger.error(f"Error getting stats: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -771,55 +1382,53 @@ def epg_display():
 
         # Only load initial batch of channels for faster page load
         # The rest will be loaded by JavaScript
-        all_channels = webepg.get_channels()
-        initial_channels = all_channels[:10]  # Just 10 for initial render
+        initial_channels = get_channel_index().page(limit=10)["channels"]
 
-        # Get programs for initial channels only
+        # Get programs for initial channels only, concurrently and bounded by
+        # a deadline so one slow channel cannot stall the first paint
         now = datetime.now(timezone.utc)
         tomorrow = now + timedelta(days=1)
 
+        # Copy the channels: the originals belong to the shared channel cache
+        channels_by_id = {
+            str(channel["id"]): dict(channel)
+            for channel in initial_channels
+            if "id" in channel
+        }
+        outcome = fan_out(
+            lambda channel_id: webepg.get_channel_programs(
+                channel_id, now.isoformat(), tomorrow.isoformat()
+            ),
+            channels_by_id,
+            get_fanout_executor(),
+            timeout=float(_get_config_value("epg.fanout_deadline", 3.0)),
+        )
+
         channels_with_programs = []
-        for channel in initial_channels:
-            if "id" in channel:
-                channel_id = channel["id"]
-                try:
-                    programs = webepg.get_channel_programs(
-                        str(channel_id), now.isoformat(), tomorrow.isoformat()
-                    )
-
-                    # Ensure programs have proper datetime objects
-                    for program in programs:
-                        for time_field in ["start_time", "end_time"]:
-                            if time_field in program and isinstance(
-                                program[time_field], str
-                            ):
-                                try:
-                                    time_str = program[time_field]
-                                    if "Z" in time_str:
-                                        program[time_field] = datetime.fromisoformat(
-                                            time_str.replace("Z", "+00:00")
-                                        )
-                                    elif "+" in time_str or "-" in time_str[10:]:
-                                        program[time_field] = datetime.fromisoformat(
-                                            time_str
-                                        )
-                                    else:
-                                        program[time_field] = datetime.fromisoformat(
-                                            time_str + "+00:00"
-                                        )
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Could not parse {time_field}: {program[time_field]}: {e}"
-                                    )
-
-                    channel["programs"] = programs[:10]  # Limit to 10 programs
-                    channels_with_programs.append(channel)
-                except Exception as e:
-                    logger.warning(
-                        f"Could not load programs for channel {channel_id}: {e}"
-                    )
-                    channel["programs"] = []
-                    channels_with_programs.append(channel)
+        for channel_id, channel in channels_by_id.items():
+            programs = outcome.results.get(channel_id, [])
+            if channel_id in outcome.errors:
+                logger.warning(
+                    f"Could not load programs for channel {channel_id}: "
+                    f"{outcome.errors[channel_id]}"
+                )
+
+            # Ensure programs have proper datetime objects
+            for program in programs:
+                for time_field in ["start_time", "end_time"]:
+                    if time_field in program and isinstance(program[time_field], str):
+                        parsed = parse_timestamp(program[time_field])
+                        if parsed is None:
+                            logger.warning(
+                                f"Could not parse {time_field}: {program[time_field]}"
+                            )
+                        else:
+                            program[time_field] = parsed
+
+            channel["programs"] = programs[:10]  # Limit to 10 programs
+            # Channels that missed the deadline are filled in by JavaScript
+            channel["programs_loading"] = channel_id in outcome.timed_out
+            channels_with_programs.append(channel)
 
         return render_template(
             "epg_display.html",
@@ -840,30 +1449,31 @@ def epg_display():
 
 @app.route("/api/epg/channels")
 def api_get_channels():
-    """Get channels with pagination support for infinite scroll."""
+    """Get channels with cursor (or legacy page) pagination for infinite scroll."""
     try:
-        page = int(request.args.get("page", 0))
+        cursor = request.args.get("cursor")
+        page = None if cursor else int(request.args.get("page", 0))
         limit = int(request.args.get("limit", 20))
 
-        webepg = get_webepg_client()
-        all_channels = webepg.get_channels()
-
-        # Calculate pagination
-        start_idx = page * limit
-        end_idx = start_idx + limit
-
-        paginated_channels = all_channels[start_idx:end_idx]
-        has_more = end_idx < len(all_channels)
+        try:
+            result = get_channel_index().page(
+                cursor=cursor, limit=limit, offset=(page or 0) * limit
+            )
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
 
-        return jsonify(
+        return _json_with_etag(
             {
                 "success": True,
-                "channels": paginated_channels,
+                "channels": result["channels"],
                 "page": page,
                 "limit": limit,
-                "total": len(all_channels),
-                "has_more": has_more,
-            }
+                "total": result["total"],
+                "has_more": result["has_more"],
+                "next_cursor": result["next_cursor"],
+                "version": result["version"],
+            },
+            etag=f"{result['version']}-{page}-{limit}-{cursor or ''}",
         )
 
     except Exception as e:
@@ -887,18 +1497,12 @@ def api_get_channel_programs(channel_id):
 
         programs = webepg.get_channel_programs(channel_id, start, end)
 
-        # Process programs to ensure consistent format
-        processed_programs = []
-        for program in programs:
-            # Ensure times are ISO strings
-            if isinstance(program.get("start_time"), datetime):
-                program["start_time"] = program["start_time"].isoformat()
-            if isinstance(program.get("end_time"), datetime):
-                program["end_time"] = program["end_time"].isoformat()
-            processed_programs.append(program)
-
-        return jsonify(
-            {"success": True, "programs": processed_programs, "channel_id": channel_id}
+        return _json_with_etag(
+            {
+                "success": True,
+                "programs": _serialize_programs(programs),
+                "channel_id": channel_id,
+            }
         )
 
     except Exception as e:
@@ -906,19 +1510,98 @@ def api_get_channel_programs(channel_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+# Upper bound on channel ids accepted by the batch programs endpoint
+MAX_BATCH_CHANNELS = 100
+
+
+@app.route("/api/epg/programs")
+def api_get_programs_batch():
+    """Get programs for several channels and one time window in one request.
+
+    Query parameters: ``channels`` (comma-separated ids), ``start``, ``end``.
+    Upstream calls run concurrently; channels that fail or miss the deadline
+    are listed in ``errors`` instead of failing the whole response.
+    """
+    try:
+        channel_ids = []
+        for channel_id in request.args.get("channels", "").split(","):
+            channel_id = channel_id.strip()
+            if channel_id and channel_id not in channel_ids:
+                channel_ids.append(channel_id)
+
+        if not channel_ids:
+            return jsonify({"success": False, "error": "No channels given"}), 400
+        if len(channel_ids) > MAX_BATCH_CHANNELS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"At most {MAX_BATCH_CHANNELS} channels per request",
+                    }
+                ),
+                400,
+            )
+
+        start = request.args.get("start")
+        end = request.args.get("end")
+        if not start:
+            start = datetime.now(timezone.utc).isoformat()
+        if not end:
+            end = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+
+        webepg = get_webepg_client()
+        outcome = fan_out(
+            lambda channel_id: webepg.fetch_channel_programs(channel_id, start, end),
+            channel_ids,
+            get_fanout_executor(),
+            timeout=float(_get_config_value("epg.batch_deadline", 10.0)),
+        )
+
+        errors = {
+            channel_id: str(error) or type(error).__name__
+            for channel_id, error in outcome.errors.items()
+        }
+        for channel_id in outcome.timed_out:
+            errors[channel_id] = "Timed out waiting for WebEPG"
+        for channel_id, error in errors.items():
+            logger.warning(f"Could not load programs for channel {channel_id}: {error}")
+
+        return _json_with_etag(
+            {
+                "success": True,
+                "programs": {
+                    channel_id: _serialize_programs(programs)
+                    for channel_id, programs in outcome.results.items()
+                },
+                "errors": errors,
+                "start": start,
+                "end": end,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting programs batch: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/api/epg/refresh")
 def api_refresh_epg():
-    """Refresh EPG data - returns fresh channel list."""
+    """Refresh EPG data - returns fresh channel list.
+
+    The ETag follows the channel snapshot version, so an unchanged list is
+    answered with 304 and the client keeps its earlier timestamp.
+    """
     try:
-        webepg = get_webepg_client()
-        channels = webepg.get_channels()
-        return jsonify(
+        snapshot = get_channel_index().snapshot()
+        channels = snapshot.source
+        return _json_with_etag(
             {
                 "success": True,
                 "channels": channels,
                 "total": len(channels),
                 "timestamp": datetime.now().isoformat(),
-            }
+            },
+            etag=snapshot.version,
         )
     except Exception as e:
         logger.error(f"Error refreshing EPG: {e}")
@@ -926,10 +1609,106 @@ def api_refresh_epg():
 
 
 # Static file serving
-@app.route("/static/<path:filename>")
+@app.route("/static/<path:filename>", endpoint="static")
 def serve_static(filename):
-    """Serve static files."""
-    return send_from_directory("static", filename)
+    """Serve static files, preferring a precompressed variant if accepted."""
+    variant = precompressed_variant(STATIC_DIR, filename, request.accept_encodings)
+    if variant is None:
+        response = send_from_directory(STATIC_DIR, filename)
+    else:
+        encoding, compressed_name = variant
+        response = send_from_directory(
+            STATIC_DIR,
+            compressed_name,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        )
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if asset_manifest.is_fingerprinted(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def _authorized_profiler():
+    """Return the profiler if the request carries its token, else an error."""
+    profiler = get_profiler()
+    if profiler is None:
+        return None, (jsonify({"error": "Profiling is disabled"}), 404)
+    supplied = request.headers.get(PROFILE_HEADER) or request.args.get("token")
+    if not profiler.authorized(supplied):
+        return None, (jsonify({"error": "Invalid profiling token"}), 403)
+    return profiler, None
+
+
+@app.route("/api/admin/profiles")
+def api_list_profiles():
+    """List stored request profiles (admin only)."""
+    profiler, error = _authorized_profiler()
+    if error:
+        return error
+    return jsonify({"success": True, "profiles": profiler.list_profiles()})
+
+
+@app.route("/api/admin/profiles/<filename>")
+def api_download_profile(filename):
+    """Download a stored .prof or .collapsed profile file (admin only)."""
+    profiler, error = _authorized_profiler()
+    if error:
+        return error
+    path = profiler.file_path(filename)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, as_attachment=True, download_name=filename)
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Request, template and upstream metrics in Prometheus text format."""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.after_request
+def compress_api_response(response):
+    """Compress JSON API responses for clients that accept it."""
+    if not request.path.startswith("/api/") or not _get_config_value(
+        "compression.enabled", True
+    ):
+        return response
+    if response.mimetype != "application/json":
+        return response
+    return compress_response(
+        response,
+        request.accept_encodings,
+        compression_stats,
+        min_size=int(_get_config_value("compression.min_size", 1024)),
+        level=int(_get_config_value("compression.level", 6)),
+        brotli_quality=int(_get_config_value("compression.brotli_quality", 4)),
+    )
+
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Write content-hashed copies of the static assets and their manifest."""
+    manifest = build_manifest(STATIC_DIR)
+    print(f"Fingerprinted {len(manifest)} static assets")
+
+
+@app.cli.command("precompress-static")
+def precompress_static_command():
+    """Write .gz/.br versions of the static assets."""
+    summary = precompress_directory(
+        STATIC_DIR, min_size=int(_get_config_value("compression.min_size", 1024))
+    )
+    print(
+        f"Precompressed {summary['files']} files: {summary['written']} written, "
+        f"{summary['skipped']} up to date or not smaller"
+    )
+    for encoding, size in summary["bytes_out"].items():
+        ratio = size / summary["bytes_in"] if summary["bytes_in"] else 0
+        print(f"  {encoding}: {summary['bytes_in']} -> {size} bytes ({ratio:.1%})")
 
 
 @app.route("/favicon.ico")
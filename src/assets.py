@@ -0,0 +1,125 @@
+"""
+Fingerprinted static assets: content-hashed copies and their manifest.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from typing import Dict, Optional
+
+from .compression import ENCODING_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Asset types that get fingerprinted copies
+FINGERPRINT_EXTENSIONS = (".css", ".js", ".svg", ".png", ".ico", ".woff", ".woff2")
+
+# Matches the ".<hash>" part that build_manifest inserts before the extension
+HASH_LENGTH = 10
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}(\.[^.]+)$" % HASH_LENGTH)
+
+
+def fingerprint(path: str) -> str:
+    """Return the content hash used in fingerprinted file names."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(filename: str, digest: str) -> str:
+    """Insert digest before the extension: css/base.css -> css/base.<digest>.css."""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+
+def build_manifest(static_dir: str) -> Dict[str, str]:
+    """Write content-hashed copies of the static assets and their manifest.
+
+    Copies are placed next to the original so relative ES module imports keep
+    working. Hashed copies from earlier builds that no longer match are
+    removed together with their precompressed .gz/.br variants. Returns the
+    manifest (logical name -> hashed name).
+    """
+    manifest: Dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(static_dir):
+        for name in sorted(filenames):
+            if not name.endswith(FINGERPRINT_EXTENSIONS) or _HASHED_NAME.search(name):
+                continue
+            path = os.path.join(dirpath, name)
+            logical = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            target = hashed_name(logical, fingerprint(path))
+            target_path = os.path.join(static_dir, target)
+            if not os.path.exists(target_path):
+                shutil.copy2(path, target_path)
+            manifest[logical] = target
+
+    current = set(manifest.values())
+    for dirpath, _, filenames in os.walk(static_dir):
+        for name in filenames:
+            base = name
+            for suffix in ENCODING_SUFFIXES.values():
+                if name.endswith(suffix):
+                    base = name[: -len(suffix)]
+            if not _HASHED_NAME.search(base):
+                continue
+            relative = os.path.relpath(os.path.join(dirpath, base), static_dir)
+            if relative.replace(os.sep, "/") not in current:
+                os.remove(os.path.join(dirpath, name))
+
+    with open(os.path.join(static_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class AssetManifest:
+    """Resolve logical static file names to their fingerprinted names.
+
+    The manifest is read lazily and re-read when the file changes on disk.
+    Without a manifest (e.g. in development) names resolve to themselves.
+    """
+
+    def __init__(self, static_dir: str, manifest_name: str = MANIFEST_NAME):
+        self.path = os.path.join(static_dir, manifest_name)
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._assets: Dict[str, str] = {}
+        self._hashed: frozenset = frozenset()
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            assets: Dict[str, str] = {}
+            if mtime is not None:
+                try:
+                    with open(self.path, "r") as f:
+                        assets = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not read asset manifest {self.path}: {e}")
+            self._assets = assets
+            self._hashed = frozenset(assets.values())
+            self._mtime = mtime
+
+    def resolve(self, filename: str) -> str:
+        """Return the fingerprinted name for filename, or filename itself."""
+        self._load()
+        return self._assets.get(filename, filename)
+
+    def is_fingerprinted(self, filename: str) -> bool:
+        """Whether filename is a hashed copy listed in the manifest."""
+        self._load()
+        return filename in self._hashed
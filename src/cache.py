@@ -0,0 +1,155 @@
+"""
+In-process caching for upstream API responses.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry:
+    """A cached value and the time it was stored."""
+
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class TTLCache:
+    """Thread-safe TTL cache with stale-while-revalidate and stale-on-error.
+
+    Entries younger than ``ttl`` are served directly. Entries older than
+    ``ttl`` but within ``ttl + stale_ttl`` are served immediately while a
+    background thread refreshes them. Older entries are reloaded inline; if
+    that load fails, the last known value is served instead of the error.
+    A ``ttl`` of 0 disables caching entirely.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0, name: str = "cache"):
+        self.ttl = max(float(ttl or 0), 0.0)
+        self.stale_ttl = max(float(stale_ttl or 0), 0.0)
+        self.name = name
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "stale_on_error": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader when needed."""
+        if not self.enabled:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < self.ttl:
+                    self._stats["hits"] += 1
+                    tracing.record("cache", 0.0, f"{self.name} hit")
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    self._schedule_refresh(key, loader)
+                    tracing.record("cache", 0.0, f"{self.name} stale")
+                    return entry.value
+            self._stats["misses"] += 1
+        tracing.record("cache", 0.0, f"{self.name} miss")
+
+        try:
+            value = loader()
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Serving stale {self.name} entry after load error: {e}")
+            with self._lock:
+                self._stats["stale_on_error"] += 1
+            return entry.value
+
+        self.set(key, value)
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key regardless of age, without loading."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, time.monotonic())
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or all entries when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and basic sizing information."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["hits"] + stats["stale_hits"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        stats["ttl"] = self.ttl
+        stats["stale_ttl"] = self.stale_ttl
+        return stats
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any]):
+        """Start a background refresh for key unless one is already running.
+
+        Must be called with ``self._lock`` held.
+        """
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(key, loader),
+            name=f"{self.name}-refresh",
+            daemon=True,
+        )
+        thread.start()
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"Background refresh of {self.name} failed: {e}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        else:
+            self.set(key, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
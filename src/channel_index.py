@@ -0,0 +1,127 @@
+"""
+In-memory channel index with stable ordering and cursor-based pagination.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SortKey = Tuple[int, int, str]
+
+
+def channel_sort_key(channel: Dict) -> SortKey:
+    """Stable sort key for a channel: numeric ids first, then string ids."""
+    channel_id = channel.get("id")
+    if isinstance(channel_id, bool):
+        channel_id = str(channel_id)
+    if isinstance(channel_id, int):
+        return (0, channel_id, "")
+    text = "" if channel_id is None else str(channel_id)
+    if text.isdigit():
+        return (0, int(text), "")
+    return (1, 0, text)
+
+
+def encode_cursor(version: str, key: SortKey) -> str:
+    """Encode a snapshot version and last-seen sort key as an opaque cursor."""
+    payload = json.dumps({"v": version, "k": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, SortKey]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        version = str(payload["v"])
+        rank, number, text = payload["k"]
+        return version, (int(rank), int(number), str(text))
+    except (binascii.Error, KeyError, TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class ChannelSnapshot:
+    """An immutable, sorted view of the channel list."""
+
+    def __init__(self, channels: List[Dict], version: str):
+        # The list as the loader returned it, in upstream order
+        self.source = channels
+        ordered = sorted(channels, key=channel_sort_key)
+        self.channels = ordered
+        self.keys = [channel_sort_key(channel) for channel in ordered]
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+
+class ChannelIndex:
+    """Channel list kept in memory in a stable order for cheap paging.
+
+    The index pulls the channel list through ``loader`` (normally the cached
+    ``WebEPGClient.get_channels``) and rebuilds its snapshot only when the
+    loader returns a different list. Cursors encode the sort key of the last
+    channel returned, so paging resumes at the right place even if the
+    snapshot was refreshed between two requests.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._source: Optional[List[Dict]] = None
+        self._snapshot = ChannelSnapshot([], self._compute_version([]))
+
+    @staticmethod
+    def _compute_version(channels: List[Dict]) -> str:
+        digest = hashlib.sha1(
+            json.dumps(channels, sort_keys=True, default=str).encode("utf-8")
+        )
+        return digest.hexdigest()[:16]
+
+    def snapshot(self) -> ChannelSnapshot:
+        """Return the current snapshot, rebuilding it if the source changed."""
+        channels = self._loader()
+        with self._lock:
+            if channels is self._source:
+                return self._snapshot
+            version = self._compute_version(channels)
+            if version != self._snapshot.version:
+                self._snapshot = ChannelSnapshot(channels, version)
+            self._source = channels
+            return self._snapshot
+
+    def page(
+        self, cursor: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> Dict[str, Any]:
+        """Return one page of channels.
+
+        With a cursor, the page starts after the channel the cursor points
+        at; otherwise it starts at ``offset``.
+        """
+        snapshot = self.snapshot()
+        limit = max(int(limit), 0)
+
+        if cursor:
+            _, last_key = decode_cursor(cursor)
+            start = bisect_right(snapshot.keys, last_key)
+        else:
+            start = max(int(offset), 0)
+
+        end = start + limit
+        channels = snapshot.channels[start:end]
+        has_more = end < len(snapshot)
+        next_cursor = None
+        if has_more and channels:
+            next_cursor = encode_cursor(snapshot.version, snapshot.keys[end - 1])
+
+        return {
+            "channels": channels,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total": len(snapshot),
+            "version": snapshot.version,
+        }
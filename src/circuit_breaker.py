@@ -0,0 +1,193 @@
+"""
+Per-upstream circuit breaker for the API clients.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.exceptions import ConnectionError, Timeout
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses that mean "the service is down", not "bad request"
+FAILURE_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling an upstream whose circuit is open.
+
+    Subclasses requests' ConnectionError, so callers that already fall back
+    on connection errors fail fast without changes.
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = max(retry_in, 0.0)
+        super().__init__(f"{name} circuit open; retrying in {self.retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected with CircuitOpenError. Once ``recovery_timeout``
+    seconds have passed a single probe call is let through (half-open): if
+    it succeeds the circuit closes, otherwise it opens again with the wait
+    doubled, up to ``max_recovery_timeout``. A ``failure_threshold`` of 0
+    disables the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_recovery_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 0)
+        self.recovery_timeout = max(float(recovery_timeout), 0.1)
+        self.max_recovery_timeout = max(
+            float(max_recovery_timeout), self.recovery_timeout
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._wait = self.recovery_timeout
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._changed_at = datetime.now(timezone.utc)
+        self._stats = {"rejected": 0, "opened": 0, "failures": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_request(self):
+        """Admit a call, or raise CircuitOpenError if the circuit is open."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            retry_in = self._opened_at + self._wait - self._clock()
+            if self._state == self.OPEN and retry_in <= 0:
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self._stats["rejected"] += 1
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self):
+        """The upstream answered; close the circuit."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                self._wait = self.recovery_timeout
+                self._set_state(self.CLOSED)
+                logger.info(f"{self.name} circuit closed")
+
+    def record_failure(self):
+        """The upstream is unreachable or unavailable."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            self._stats["failures"] += 1
+            if self._state == self.HALF_OPEN:
+                # Failed probe: back off further before the next one
+                self._wait = min(self._wait * 2, self.max_recovery_timeout)
+                self._open()
+            elif (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def release(self):
+        """End a call whose outcome says nothing about upstream health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self._probe_in_flight = False
+        self._opened_at = self._clock()
+        self._stats["opened"] += 1
+        self._set_state(self.OPEN)
+        logger.warning(
+            f"{self.name} circuit open after {self._failures} failures; "
+            f"probing again in {self._wait:.0f}s"
+        )
+
+    def _set_state(self, state: str):
+        self._state = state
+        self._changed_at = datetime.now(timezone.utc)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the state in a form that only changes on transitions."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state if self.enabled else "disabled",
+                "since": self._changed_at.isoformat(),
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state together with counters and timings."""
+        summary = self.summary()
+        with self._lock:
+            summary.update(self._stats)
+            summary["consecutive_failures"] = self._failures
+            summary["failure_threshold"] = self.failure_threshold
+            summary["retry_in"] = (
+                round(max(self._opened_at + self._wait - self._clock(), 0.0), 1)
+                if self._state == self.OPEN
+                else None
+            )
+        return summary
+
+
+class CircuitBreakerSession(requests.Session):
+    """A requests Session whose every call goes through a circuit breaker.
+
+    Connection errors, timeouts and 502/503/504 responses count as
+    failures; any other response closes the circuit.
+    """
+
+    def __init__(self, circuit_breaker: Optional[CircuitBreaker] = None):
+        super().__init__()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("upstream")
+
+    def send(self, request, **kwargs):
+        breaker = self.circuit_breaker
+        breaker.before_request()
+        try:
+            response = super().send(request, **kwargs)
+        except (ConnectionError, Timeout):
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        if response.status_code in FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
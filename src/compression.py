@@ -0,0 +1,205 @@
+"""
+Response compression and precompressed static assets.
+"""
+
+import gzip
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# File extensions written by precompress_directory, by content encoding
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Static asset types worth precompressing
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".json", ".svg", ".html", ".txt", ".map")
+
+
+def available_encodings() -> List[str]:
+    """Return supported content encodings in order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encodings, allowed: Optional[Iterable[str]] = None):
+    """Pick the preferred encoding the client accepts, or None.
+
+    ``accept_encodings`` is Werkzeug's parsed ``request.accept_encodings``.
+    """
+    for encoding in allowed or available_encodings():
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: int = 6, brotli_quality: int = 4):
+    """Compress data with the given content encoding."""
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("brotli is not installed")
+        return brotli.compress(data, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class CompressionStats:
+    """Thread-safe counters for on-the-fly response compression."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "compressed": 0,
+            "skipped_small": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "cpu_seconds": 0.0,
+        }
+
+    def record(self, bytes_in: int, bytes_out: int, cpu_seconds: float):
+        with self._lock:
+            self._stats["compressed"] += 1
+            self._stats["bytes_in"] += bytes_in
+            self._stats["bytes_out"] += bytes_out
+            self._stats["cpu_seconds"] += cpu_seconds
+
+    def record_skip(self):
+        with self._lock:
+            self._stats["skipped_small"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters plus the overall compression ratio."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["ratio"] = (
+            round(stats["bytes_out"] / stats["bytes_in"], 4)
+            if stats["bytes_in"]
+            else 0.0
+        )
+        stats["cpu_seconds"] = round(stats["cpu_seconds"], 6)
+        stats["encodings"] = available_encodings()
+        return stats
+
+
+def compress_response(
+    response,
+    accept_encodings,
+    stats: CompressionStats,
+    min_size: int = 1024,
+    level: int = 6,
+    brotli_quality: int = 4,
+):
+    """Compress a buffered response body in place when worthwhile.
+
+    Streamed responses, responses that already have a Content-Encoding and
+    non-200 responses are left alone. Bodies below ``min_size`` are counted
+    as skipped, since the framing overhead outweighs the saving.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        stats.record_skip()
+        return response
+
+    started = time.thread_time()
+    compressed = compress(data, encoding, level=level, brotli_quality=brotli_quality)
+    stats.record(len(data), len(compressed), time.thread_time() - started)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes differ from the identity body: weaken a strong tag
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def precompressed_variant(
+    directory: str, filename: str, accept_encodings
+) -> Optional[tuple]:
+    """Return (encoding, relative path) of a precompressed file to serve.
+
+    The variant is only used when it exists and is at least as new as the
+    original file, so a stale .gz/.br never shadows an edited asset.
+    """
+    original = os.path.join(directory, filename)
+    try:
+        original_mtime = os.path.getmtime(original)
+    except OSError:
+        return None
+    for encoding in ("br", "gzip"):
+        if accept_encodings[encoding] <= 0:
+            continue
+        candidate = filename + ENCODING_SUFFIXES[encoding]
+        try:
+            if os.path.getmtime(os.path.join(directory, candidate)) >= original_mtime:
+                return encoding, candidate
+        except OSError:
+            continue
+    return None
+
+
+def precompress_directory(
+    root: str,
+    min_size: int = 1024,
+    encodings: Optional[Iterable[str]] = None,
+    level: int = 9,
+    brotli_quality: int = 11,
+) -> Dict[str, Any]:
+    """Write .gz/.br next to every compressible file under root.
+
+    Files that are up to date or would not get smaller are skipped. Returns a
+    summary with file counts and byte totals.
+    """
+    encodings = list(encodings or available_encodings())
+    summary = {"files": 0, "written": 0, "skipped": 0, "bytes_in": 0, "bytes_out": {}}
+    for encoding in encodings:
+        summary["bytes_out"][encoding] = 0
+
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            summary["files"] += 1
+            summary["bytes_in"] += len(data)
+            mtime = os.path.getmtime(path)
+
+            for encoding in encodings:
+                target = path + ENCODING_SUFFIXES[encoding]
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    summary["bytes_out"][encoding] += os.path.getsize(target)
+                    summary["skipped"] += 1
+                    continue
+                compressed = compress(
+                    data, encoding, level=level, brotli_quality=brotli_quality
+                )
+                if len(compressed) >= len(data):
+                    summary["skipped"] += 1
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compressed)
+                summary["bytes_out"][encoding] += len(compressed)
+                summary["written"] += 1
+
+    return summary
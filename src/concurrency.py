@@ -0,0 +1,70 @@
+"""
+Bounded concurrent fan-out of blocking upstream calls.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutResult:
+    """Outcome of a fan-out: values, errors and keys that missed the deadline."""
+
+    def __init__(self):
+        self.results: Dict[Hashable, Any] = {}
+        self.errors: Dict[Hashable, Exception] = {}
+        self.timed_out: Set[Hashable] = set()
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors and not self.timed_out
+
+
+def fan_out(
+    fn: Callable[[Any], Any],
+    keys: Iterable[Hashable],
+    executor: Executor,
+    timeout: Optional[float] = None,
+) -> FanOutResult:
+    """Call ``fn(key)`` for every key on ``executor`` and wait up to ``timeout``.
+
+    Calls still running when the deadline passes are reported in
+    ``timed_out`` and left to finish in the background; calls that have not
+    started yet are cancelled so they do not occupy the pool. Each call runs
+    in a copy of the caller's context, so its upstream timings are added to
+    the caller's request trace.
+    """
+    outcome = FanOutResult()
+    futures: Dict[Future, Hashable] = {}
+    for key in keys:
+        context = contextvars.copy_context()
+        futures[executor.submit(context.run, fn, key)] = key
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = set(futures)
+    while pending:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = futures[future]
+            try:
+                outcome.results[key] = future.result()
+            except Exception as e:
+                outcome.errors[key] = e
+
+    for future in pending:
+        future.cancel()
+        outcome.timed_out.add(futures[future])
+
+    if outcome.timed_out:
+        logger.warning(
+            f"Fan-out deadline of {timeout}s missed for {len(outcome.timed_out)} "
+            f"of {len(futures)} calls"
+        )
+    return outcome
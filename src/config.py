@@ -14,10 +14,67 @@ class Config:
 
     DEFAULT_CONFIG = {
         "webepg": {"url": "http://localhost:8080", "timeout": 10},
-        "ultimate_backend": {"url": "http://localhost:3000", "timeout": 10},
+        "ultimate_backend": {
+            "url": "http://localhost:3000",
+            "timeout": 10,
+            "max_concurrency": 4,
+            "provider_timeout": 10,
+        },
         "ui": {"theme": "dark", "refresh_interval": 300, "timezone": "Europe/Berlin"},
         "player": {"default_size": "medium", "default_bitrate": "auto"},
         "database": {"retention_days": 7},
+        "cache": {
+            "enabled": True,
+            "ttl": 60,
+            "stale_ttl": 300,
+            "program_ttl": 300,
+            "program_bucket": 3600,
+            "alias_ttl": 300,
+        },
+        "epg": {"fanout_workers": 8, "fanout_deadline": 3.0, "batch_deadline": 10.0},
+        "matching": {"processes": 2, "pool_threshold": 200},
+        "circuit_breaker": {
+            "failure_threshold": 5,
+            "recovery_timeout": 30,
+            "max_recovery_timeout": 300,
+        },
+        "http": {
+            "pool_connections": 10,
+            "pool_maxsize": 16,
+            "pool_block": False,
+            "keep_alive": True,
+            "retries": 2,
+            "backoff_factor": 0.2,
+            "backoff_jitter": 0.2,
+            "backoff_max": 5.0,
+        },
+        "coalescing": {"enabled": True, "lock_dir": "", "wait_timeout": 30.0},
+        "metrics": {
+            "enabled": True,
+            "dir": "/tmp/ultimate-ui-metrics",
+            "flush_interval": 5,
+        },
+        "profiling": {
+            "enabled": False,
+            "token": "",
+            "dir": "/app/data/profiles",
+            "max_profiles": 50,
+        },
+        "tracing": {"enabled": True},
+        "monitoring": {
+            "interval": 30,
+            "active_interval": 5,
+            "timeout": 15.0,
+            "stream_heartbeat": 15,
+            "stream_max_seconds": 300,
+            "stream_max_clients": 0,
+        },
+        "compression": {
+            "enabled": True,
+            "min_size": 1024,
+            "level": 6,
+            "brotli_quality": 4,
+        },
     }
 
     def __init__(self, config_path: Optional[str] = None):
@@ -79,6 +136,27 @@ class Config:
         if "UI_TIMEZONE" in os.environ:
             self.config["ui"]["timezone"] = os.environ["UI_TIMEZONE"]
 
+        # Cache
+        if "CACHE_ENABLED" in os.environ:
+            self.config["cache"]["enabled"] = os.environ["CACHE_ENABLED"].lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+
+        if "CACHE_TTL" in os.environ:
+            self.config["cache"]["ttl"] = int(os.environ["CACHE_TTL"])
+
+        # Compression
+        if "COMPRESSION_ENABLED" in os.environ:
+            self.config["compression"]["enabled"] = os.environ[
+                "COMPRESSION_ENABLED"
+            ].lower() in ("1", "true", "yes")
+
+        # Profiling (keep the admin token out of config files)
+        if "PROFILING_TOKEN" in os.environ:
+            self.config["profiling"]["token"] = os.environ["PROFILING_TOKEN"]
+
     def get(self, key_path: str, default: Any = None) -> Any:
         """Get configuration value by dot-notation path."""
         keys = key_path.split(".")
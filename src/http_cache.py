@@ -0,0 +1,142 @@
+"""
+Conditional GET support for upstream JSON requests.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import requests
+
+from .circuit_breaker import CircuitOpenError
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_body(body: Any) -> Any:
+    """Shallow-copy a JSON body so callers cannot modify the stored one."""
+    if isinstance(body, list):
+        return [dict(item) if isinstance(item, dict) else item for item in body]
+    if isinstance(body, dict):
+        return dict(body)
+    return body
+
+
+class _Validated:
+    """An upstream body together with its ETag / Last-Modified validators."""
+
+    __slots__ = ("etag", "last_modified", "body")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+
+class ValidatorCache:
+    """Revalidate upstream GETs with If-None-Match / If-Modified-Since.
+
+    Responses that carry an ETag or Last-Modified header are remembered per
+    URL and query. The next request for the same resource sends those
+    validators, and a 304 from upstream is answered from the stored body,
+    so an unchanged resource costs one small round trip. While the
+    upstream's circuit breaker is open the stored body is served as is.
+    With a SingleFlight, concurrent requests for the same resource share
+    one upstream round trip.
+    """
+
+    def __init__(self, max_entries: int = 512, flight: Optional[SingleFlight] = None):
+        self.max_entries = max(int(max_entries), 1)
+        self.flight = flight
+        self._entries: "OrderedDict[Hashable, _Validated]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"not_modified": 0, "full": 0, "stale_on_open": 0}
+
+    @staticmethod
+    def _key(url: str, params: Optional[Dict[str, Any]]) -> Tuple:
+        return (url, tuple(sorted((params or {}).items())))
+
+    def get_json(
+        self,
+        session: requests.Session,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """GET url and return its JSON body, raising on HTTP errors."""
+        key = self._key(url, params)
+        if self.flight is None:
+            body = self._get(session, key, url, params, timeout)
+        else:
+            body = self.flight.do(
+                key, lambda: self._get(session, key, url, params, timeout)
+            )
+        return _copy_body(body)
+
+    def _get(
+        self,
+        session: requests.Session,
+        key: Tuple,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        timeout: Optional[float],
+    ) -> Any:
+        """Make the (conditional) request and return the body, uncopied."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            response = session.get(
+                url, params=params, headers=headers or None, timeout=timeout
+            )
+        except CircuitOpenError:
+            if entry is None:
+                raise
+            # Upstream is known to be down: the last body beats an error
+            with self._lock:
+                self._stats["stale_on_open"] += 1
+            return entry.body
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._stats["not_modified"] += 1
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            return entry.body
+
+        response.raise_for_status()
+        body = response.json()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        with self._lock:
+            self._stats["full"] += 1
+            if etag or last_modified:
+                self._entries[key] = _Validated(etag, last_modified, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.pop(key, None)
+        return body
+
+    def clear(self):
+        """Forget all stored validators."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return 304 vs full response counters."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
@@ -0,0 +1,137 @@
+"""
+Connection pooling, keep-alive and retry policy for upstream HTTP sessions.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Statuses retried for idempotent requests; the circuit breaker sees the last one
+RETRY_STATUSES = (502, 503, 504)
+
+
+class _CountingRetry(Retry):
+    """Retry that reports every retry it grants to a callback."""
+
+    def __init__(self, *args, on_retry: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kw: Any) -> "_CountingRetry":
+        retry = super().new(**kw)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, *args, **kwargs) -> "_CountingRetry":
+        # Raises MaxRetryError once the budget is used up
+        retry = super().increment(*args, **kwargs)
+        if self.on_retry is not None:
+            self.on_retry()
+        return retry
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with a configurable pool, keep-alive and retry policy.
+
+    ``pool_maxsize`` connections are kept per upstream host, so it should
+    cover the threads that call one upstream at the same time (gunicorn
+    threads plus fan-out workers). With ``pool_block`` a request waits for
+    a free connection instead of opening one that is discarded afterwards.
+    Idempotent requests are retried up to ``retries`` times on connection
+    errors and 502/503/504 with exponential backoff plus random jitter;
+    POSTs are never retried. Read timeouts are not retried either: the
+    upstream already spent the whole timeout on the request, and retrying
+    would hold the worker thread for a multiple of it. Retry-After headers
+    are not honoured, so one slow upstream cannot hold a worker thread for
+    minutes; longer outages are left to the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 16,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        retries: int = 2,
+        backoff_factor: float = 0.2,
+        backoff_jitter: float = 0.2,
+        backoff_max: float = 5.0,
+        retry_statuses: Collection[int] = RETRY_STATUSES,
+    ):
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._retried = 0
+        retries = max(int(retries), 0)
+        max_retries = _CountingRetry(
+            total=retries,
+            connect=retries,
+            # Re-raise read errors as they are, so a timeout stays a Timeout
+            read=False,
+            status=retries,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            status_forcelist=frozenset(retry_statuses),
+            backoff_factor=float(backoff_factor),
+            backoff_jitter=float(backoff_jitter),
+            backoff_max=float(backoff_max),
+            raise_on_status=False,
+            respect_retry_after_header=False,
+            on_retry=self._count_retry,
+        )
+        super().__init__(
+            pool_connections=max(int(pool_connections), 1),
+            pool_maxsize=max(int(pool_maxsize), 1),
+            max_retries=max_retries,
+            pool_block=bool(pool_block),
+        )
+
+    def _count_retry(self):
+        with self._lock:
+            self._retried += 1
+
+    def add_headers(self, request, **kwargs):
+        if not self.keep_alive:
+            request.headers["Connection"] = "close"
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-host pool usage and the number of retries made."""
+        pools: List[Dict[str, Any]] = []
+        manager = self.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            queue = pool.pool
+            idle = sum(1 for conn in list(queue.queue) if conn) if queue else 0
+            pools.append(
+                {
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "maxsize": queue.maxsize if queue else 0,
+                    "idle": idle,
+                    # Connections created beyond maxsize are discarded after use (churn)
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests,
+                }
+            )
+        with self._lock:
+            retried = self._retried
+        return {
+            "pool_maxsize": self._pool_maxsize,
+            "pool_block": self._pool_block,
+            "keep_alive": self.keep_alive,
+            "retries": self.max_retries.total,
+            "retried": retried,
+            "pools": pools,
+        }
+
+
+def mount_adapter(session: requests.Session, adapter: HTTPAdapter) -> requests.Session:
+    """Use adapter for every http:// and https:// request of session."""
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
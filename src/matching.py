@@ -0,0 +1,316 @@
+"""
+Fuzzy matching of streaming channel names against EPG channels.
+"""
+
+import logging
+import multiprocessing
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Quality and format markers that say nothing about which channel it is
+QUALITY_TOKENS = {"hd", "sd", "uhd", "fhd", "4k", "8k", "hevc", "h265", "hdr", "raw"}
+
+# Country / region suffixes, only dropped at the end of a name
+COUNTRY_TOKENS = {
+    "de",
+    "at",
+    "ch",
+    "uk",
+    "us",
+    "fr",
+    "it",
+    "es",
+    "nl",
+    "pl",
+    "deutschland",
+    "germany",
+    "austria",
+    "osterreich",
+    "schweiz",
+}
+
+# "RTL II" and "RTL 2" are the same channel
+ROMAN_NUMERALS = {"ii": "2", "iii": "3", "iv": "4"}
+
+NGRAM_SIZE = 3
+
+# How many index candidates are re-scored with the sequence ratio
+RESCORE_CANDIDATES = 25
+
+# Pool workers are started from a clean process: forking a gunicorn worker
+# would copy its threads' locks in whatever state they are in
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9+]+")
+_DOMAIN_SUFFIX = re.compile(r"\.(de|at|ch|uk|com|tv)$")
+
+
+def normalize_name(name: Any) -> str:
+    """Normalise a channel name for matching.
+
+    Lowercases, strips accents and punctuation, drops quality markers
+    (HD, SD, UHD, ...) anywhere and country suffixes at the end, and spells
+    small roman numerals as digits, so "Das Erste HD (DE)" and "das erste"
+    compare equal.
+    """
+    if name is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = _DOMAIN_SUFFIX.sub("", text.strip())
+    tokens = [
+        ROMAN_NUMERALS.get(token, token)
+        for token in _NON_ALNUM.split(text)
+        if token and token not in QUALITY_TOKENS
+    ]
+    while len(tokens) > 1 and tokens[-1] in COUNTRY_TOKENS:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> set:
+    """Return the set of character n-grams of text, padded at both ends."""
+    if not text:
+        return set()
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {
+        padded[start:stop]
+        for start, stop in zip(range(len(padded)), range(size, len(padded) + 1))
+    }
+
+
+class MatchIndex:
+    """An n-gram inverted index over EPG channel names.
+
+    Every EPG channel is indexed under the normalised form of both its
+    display name and its technical name. A query only scores channels that
+    share at least one n-gram with it: the shared-gram counts give a Dice
+    coefficient, and the best candidates are re-scored with a sequence
+    ratio. Only the id and name of each channel are kept, which keeps the
+    index small when it is sent to pool workers.
+    """
+
+    def __init__(self, channels: Sequence[Dict], version: Optional[str] = None):
+        self.version = version
+        self.channels: List[Dict] = []
+        # (channel position, display name, normalised name, n-gram count)
+        self._entries: List[Tuple[int, str, str, int]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+
+        for channel in channels:
+            display_name = channel.get("display_name") or channel.get("name")
+            if not display_name and channel.get("id") is None:
+                continue
+            position = len(self.channels)
+            self.channels.append({"id": channel.get("id"), "name": channel.get("name")})
+            seen = set()
+            for label in (channel.get("display_name"), channel.get("name")):
+                normalized = normalize_name(label)
+                if not normalized or normalized in seen:
+                    continue
+                seen.add(normalized)
+                grams = ngrams(normalized)
+                entry = len(self._entries)
+                self._entries.append(
+                    (
+                        position,
+                        str(display_name or channel.get("id")),
+                        normalized,
+                        len(grams),
+                    )
+                )
+                self._exact[normalized].append(entry)
+                for gram in grams:
+                    self._postings[gram].append(entry)
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def suggest(
+        self, name: Any, limit: int = 3, min_score: int = 70
+    ) -> List[Dict[str, Any]]:
+        """Return up to limit EPG channels matching name, best first.
+
+        Scores are percentages (0-100); matches below min_score are dropped.
+        """
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+
+        scores: Dict[int, float] = {}
+        for entry in self._exact.get(normalized, ()):
+            scores[entry] = 1.0
+
+        grams = ngrams(normalized)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for entry in self._postings.get(gram, ()):
+                shared[entry] += 1
+
+        dice = {
+            entry: 2.0 * count / (len(grams) + self._entries[entry][3])
+            for entry, count in shared.items()
+            if entry not in scores
+        }
+        for entry in sorted(dice, key=dice.get, reverse=True)[:RESCORE_CANDIDATES]:
+            ratio = SequenceMatcher(None, normalized, self._entries[entry][2]).ratio()
+            scores[entry] = (dice[entry] + ratio) / 2
+
+        best: Dict[int, Tuple[float, int]] = {}
+        for entry, score in scores.items():
+            position = self._entries[entry][0]
+            if position not in best or score > best[position][0]:
+                best[position] = (score, entry)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+        results = []
+        for position, (score, entry) in ranked:
+            percent = int(round(score * 100))
+            if percent < min_score:
+                break
+            channel = self.channels[position]
+            results.append(
+                {
+                    "epg_id": str(
+                        channel["id"]
+                        if channel["id"] is not None
+                        else self._entries[entry][1]
+                    ),
+                    "display_name": self._entries[entry][1],
+                    "name": channel["name"],
+                    "score": percent,
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+    def suggest_many(
+        self, names: Dict[str, Any], limit: int = 3, min_score: int = 70
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Run suggest for every (key, name) pair."""
+        return {
+            key: self.suggest(name, limit=limit, min_score=min_score)
+            for key, name in names.items()
+        }
+
+
+# Index installed in each pool worker process by _init_worker
+_worker_index: Optional[MatchIndex] = None
+
+
+def _init_worker(index: MatchIndex):
+    global _worker_index
+    _worker_index = index
+
+
+def _suggest_chunk(names: Dict[str, Any], limit: int, min_score: int):
+    return _worker_index.suggest_many(names, limit=limit, min_score=min_score)
+
+
+class ChannelMatcher:
+    """Keep a MatchIndex per channel snapshot and score batches of names.
+
+    The index is rebuilt only when the snapshot version changes. Batches of
+    at least ``pool_threshold`` names are split across a process pool whose
+    workers receive the index once, at start-up; smaller batches, or
+    ``processes=0``, are scored in the calling thread. The pool is created,
+    replaced and shut down under one lock, so concurrent requests share a
+    single pool per index.
+    """
+
+    def __init__(self, processes: int = 2, pool_threshold: int = 200):
+        self.processes = max(int(processes), 0)
+        self.pool_threshold = max(int(pool_threshold), 1)
+        self._lock = threading.Lock()
+        self._index: Optional[MatchIndex] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def index_for(self, channels: Sequence[Dict], version: str) -> MatchIndex:
+        """Return the index for this snapshot version, building it if needed."""
+        with self._lock:
+            if self._index is None or self._index.version != version:
+                self._index = MatchIndex(channels, version=version)
+                self._shutdown_pool()
+                logger.info(
+                    f"Built channel match index for {len(self._index)} channels "
+                    f"(version {version})"
+                )
+            return self._index
+
+    def suggest(
+        self,
+        channels: Sequence[Dict],
+        version: str,
+        names: Dict[str, Any],
+        limit: int = 3,
+        min_score: int = 70,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Return ranked suggestions for every (key, name) pair."""
+        index = self.index_for(channels, version)
+        if self.processes and len(names) >= self.pool_threshold:
+            try:
+                return self._suggest_in_pool(index, names, limit, min_score)
+            except Exception as e:
+                logger.warning(f"Process pool matching failed, scoring inline: {e}")
+        return index.suggest_many(names, limit=limit, min_score=min_score)
+
+    def _suggest_in_pool(self, index, names, limit, min_score):
+        with self._lock:
+            if self._index is not index:
+                # The snapshot changed meanwhile; the pool would use a newer index
+                return index.suggest_many(names, limit=limit, min_score=min_score)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                    initializer=_init_worker,
+                    initargs=(index,),
+                )
+            pool = self._pool
+
+        items = list(names.items())
+        # Deal the names out round-robin so every worker gets a similar load
+        step = self.processes
+        chunks = [dict(items[offset::step]) for offset in range(step)]
+        try:
+            futures = [
+                pool.submit(_suggest_chunk, chunk, limit, min_score)
+                for chunk in chunks
+                if chunk
+            ]
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            for future in futures:
+                results.update(future.result())
+            return results
+        except Exception:
+            with self._lock:
+                # Only drop the pool that failed, not one a newer index started
+                if self._pool is pool:
+                    self._shutdown_pool()
+            raise
+
+    def _shutdown_pool(self):
+        """Stop the worker pool. Must be called with ``self._lock`` held.
+
+        Batches already submitted by other requests are left to finish.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def close(self):
+        with self._lock:
+            self._shutdown_pool()
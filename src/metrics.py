@@ -0,0 +1,274 @@
+"""
+Counters, gauges and histograms shared across gunicorn workers.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, Any]]) -> Labels:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Metric:
+    """Name, type, help text and (for histograms) bucket bounds."""
+
+    __slots__ = ("name", "kind", "help", "buckets")
+
+    def __init__(self, name: str, kind: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.buckets = tuple(buckets)
+
+
+class MetricsRegistry:
+    """Prometheus-style metrics for one process, merged across workers.
+
+    Metrics are declared once with ``counter``, ``gauge`` or ``histogram``
+    and then updated with ``inc``, ``add`` and ``observe``. Updates only
+    touch memory. With ``directory`` set, each worker process writes its
+    values to a file of its own in that directory at most every
+    ``flush_interval`` seconds (and on every scrape), and ``render()``
+    adds up the files of all workers. Counters and histograms of workers
+    that have exited are kept, so totals never go backwards; their gauges
+    are dropped. The directory should be emptied when the server starts.
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 5.0):
+        self.directory = directory or None
+        self.flush_interval = max(float(flush_interval), 0.0)
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._reset()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._file_id = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+        self._values: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    def _define(self, name: str, kind: str, help: str, buckets: Sequence[float] = ()):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = _Metric(name, kind, help, buckets)
+
+    def counter(self, name: str, help: str):
+        self._define(name, "counter", help)
+
+    def gauge(self, name: str, help: str):
+        self._define(name, "gauge", help)
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self._define(name, "histogram", help, sorted(buckets))
+
+    def _check_fork(self):
+        # A forked child must not report the parent's values as its own
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value: float = 1):
+        """Increase a counter."""
+        self.add(name, labels, value)
+
+    def add(self, name: str, labels: Optional[Dict[str, Any]] = None, value: float = 1):
+        """Add value (which may be negative for gauges) to a counter or gauge."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._check_fork()
+            self._values[key] = self._values.get(key, 0.0) + value
+            self._dirty = True
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Record one observation in a histogram."""
+        metric = self._metrics[name]
+        key = (name, _labels(labels))
+        with self._lock:
+            self._check_fork()
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0.0] * (len(metric.buckets) + 2)
+            index = len(metric.buckets)
+            for i, bound in enumerate(metric.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            counts[index] += 1
+            counts[-1] += value
+            self._dirty = True
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if (
+            self.directory
+            and self._dirty
+            and time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "pid": self._pid,
+            "values": [
+                [name, labels, value] for (name, labels), value in self._values.items()
+            ],
+            "histograms": [
+                [name, labels, counts]
+                for (name, labels), counts in self._histograms.items()
+            ],
+        }
+
+    def flush(self):
+        """Write this worker's values to its file in the metrics directory."""
+        if not self.directory:
+            return
+        with self._lock:
+            self._check_fork()
+            data = json.dumps(self._state())
+            path = os.path.join(self.directory, f"{self._file_id}.json")
+            self._dirty = False
+            self._flushed_at = time.monotonic()
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+    def _worker_states(self) -> List[Dict[str, Any]]:
+        if not self.directory:
+            with self._lock:
+                return [json.loads(json.dumps(self._state()))]
+        self.flush()
+        states = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r") as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping metrics file {entry.path}: {e}")
+        return states
+
+    def collect(
+        self,
+    ) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[float]]]:
+        """Return the values and histograms summed over all workers."""
+        values: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        for state in self._worker_states():
+            alive = state.get("pid") == os.getpid() or _pid_alive(state.get("pid", 0))
+            for name, labels, value in state.get("values", []):
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                values[key] = values.get(key, 0.0) + value
+            for name, labels, counts in state.get("histograms", []):
+                metric = self._metrics.get(name)
+                if metric is None or len(counts) != len(metric.buckets) + 2:
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                total = histograms.setdefault(key, [0.0] * len(counts))
+                for i, count in enumerate(counts):
+                    total[i] += count
+        return values, histograms
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        values, histograms = self.collect()
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if metric.kind == "histogram":
+                for (series, labels), counts in sorted(histograms.items()):
+                    if series != name:
+                        continue
+                    cumulative = 0.0
+                    bounds = list(metric.buckets) + [math.inf]
+                    for bound, count in zip(bounds, counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)} "
+                            f"{_format_value(cumulative)}"
+                        )
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}"
+                    )
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}"
+                    )
+            else:
+                for (series, labels), value in sorted(values.items()):
+                    if series == name:
+                        lines.append(
+                            f"{name}{_format_labels(labels)} {_format_value(value)}"
+                        )
+        return "\n".join(lines) + "\n"
+
+
+def clear_directory(directory: Optional[str]):
+    """Remove the files of a previous server run from a metrics directory."""
+    if not directory or not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        if entry.name.endswith((".json", ".tmp")):
+            try:
+                os.unlink(entry.path)
+            except OSError as e:
+                logger.warning(f"Could not remove {entry.path}: {e}")
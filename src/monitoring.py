@@ -0,0 +1,280 @@
+"""
+Background collection of the monitoring status shared by all viewers.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reconnect delay suggested to EventSource clients (milliseconds)
+STREAM_RETRY_MS = 5000
+
+# Import states during which the aggregator collects at its active interval
+RUNNING_IMPORT_STATUSES = {"pending", "running", "in_progress", "started"}
+
+
+def data_digest(data: Any) -> str:
+    """Return a short stable hash of JSON-serialisable data."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+class MonitoringSnapshot:
+    """One published monitoring state.
+
+    ``version`` increases in this process whenever the collected data
+    changes. ``digest`` is a hash of the data, and so is the same in every
+    gunicorn worker; use it for ETags. ``changed_at`` is when the data was
+    first seen and ``collected_at`` when it was last confirmed.
+    """
+
+    __slots__ = ("data", "version", "digest", "changed_at", "collected_at")
+
+    def __init__(self, data: Dict[str, Any], version: int, changed_at: datetime):
+        self.data = data
+        self.version = version
+        self.digest = data_digest(data)
+        self.changed_at = changed_at
+        self.collected_at = changed_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The snapshot as served to clients (stable for a given digest)."""
+        return {
+            **self.data,
+            "version": self.digest,
+            "timestamp": self.changed_at.isoformat(),
+        }
+
+
+def format_event(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event."""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def latest_imports(import_status: Dict[str, Any]) -> Dict[str, Dict]:
+    """Return the most recent import of every provider, keyed by provider id."""
+    latest: Dict[str, Dict] = {}
+    for item in (import_status or {}).get("recent_imports") or []:
+        if not isinstance(item, dict) or item.get("provider_id") is None:
+            continue
+        key = str(item["provider_id"])
+        current = latest.get(key)
+        if current is None or str(item.get("started_at") or "") > str(
+            current.get("started_at") or ""
+        ):
+            latest[key] = item
+    return latest
+
+
+def imports_running(data: Dict[str, Any]) -> bool:
+    """Whether any provider import in the status is still in progress."""
+    return any(
+        str(item.get("status", "")).lower() in RUNNING_IMPORT_STATUSES
+        for item in latest_imports(data.get("import_status") or {}).values()
+    )
+
+
+def diff_events(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Tuple]:
+    """Return the (event, data) pairs that turn previous into current.
+
+    ``health`` fires on WebEPG health transitions, ``import_status``,
+    ``statistics`` and ``circuit_breakers`` when those change, and
+    ``provider_progress`` carries only the providers whose latest import
+    changed.
+    """
+    events: List[Tuple] = []
+    if previous.get("webepg_health") != current.get("webepg_health"):
+        events.append(("health", {"webepg_health": current.get("webepg_health")}))
+
+    before = previous.get("import_status") or {}
+    after = current.get("import_status") or {}
+    if before != after:
+        events.append(("import_status", after))
+        old_latest = latest_imports(before)
+        changed = {
+            provider_id: item
+            for provider_id, item in latest_imports(after).items()
+            if old_latest.get(provider_id) != item
+        }
+        if changed:
+            events.append(("provider_progress", {"providers": changed}))
+
+    if previous.get("statistics") != current.get("statistics"):
+        events.append(("statistics", current.get("statistics")))
+    if previous.get("circuit_breakers") != current.get("circuit_breakers"):
+        events.append(("circuit_breakers", current.get("circuit_breakers")))
+    return events
+
+
+class MonitoringAggregator:
+    """Collect the monitoring status on one schedule and publish snapshots.
+
+    ``collector`` returns the current status as a dict; it is called once
+    every ``interval`` seconds from a daemon thread, whatever the number of
+    viewers, and every ``active_interval`` seconds while an import is
+    running. The first ``snapshot()`` call collects synchronously and then
+    starts the thread, so nothing runs before the (gunicorn) worker serves
+    its first monitoring request.
+    """
+
+    def __init__(
+        self,
+        collector: Callable[[], Dict[str, Any]],
+        interval: float = 30,
+        active_interval: Optional[float] = None,
+    ):
+        self._collector = collector
+        self.interval = max(float(interval), 1.0)
+        self.active_interval = max(float(active_interval or self.interval), 1.0)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[MonitoringSnapshot] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> MonitoringSnapshot:
+        """Return the latest snapshot, collecting the first one if needed."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._refresh()
+            snapshot = self._snapshot
+            self.start()
+        return snapshot
+
+    def refresh(self) -> MonitoringSnapshot:
+        """Collect now and publish the result."""
+        with self._refresh_lock:
+            self._refresh()
+        return self._snapshot
+
+    def _refresh(self):
+        started = time.monotonic()
+        data = self._collector()
+        now = datetime.now()
+        with self._changed:
+            current = self._snapshot
+            if current is not None and current.data == data:
+                current.collected_at = now
+            else:
+                version = current.version + 1 if current is not None else 1
+                self._snapshot = MonitoringSnapshot(data, version, now)
+                self._changed.notify_all()
+        logger.debug(
+            f"Collected monitoring status in {time.monotonic() - started:.3f}s"
+        )
+
+    def poke(self):
+        """Ask the background thread to collect now, e.g. after an import trigger."""
+        self._wake.set()
+
+    def wait_for_change(
+        self, version: int, timeout: Optional[float] = None
+    ) -> Optional[MonitoringSnapshot]:
+        """Block until a snapshot newer than version is published.
+
+        Returns None on timeout or when the aggregator is stopped.
+        """
+
+        def changed():
+            snapshot = self._snapshot
+            return self._stop.is_set() or (
+                snapshot is not None and snapshot.version != version
+            )
+
+        with self._changed:
+            self._changed.wait_for(changed, timeout)
+            snapshot = self._snapshot
+        if self._stop.is_set() or snapshot is None or snapshot.version == version:
+            return None
+        return snapshot
+
+    def stream(
+        self,
+        last_event_id: Optional[str] = None,
+        heartbeat: float = 15.0,
+        max_seconds: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Yield Server-Sent Events for snapshot changes.
+
+        A client whose ``Last-Event-ID`` matches the current digest is up to
+        date; any other client first gets the full state as a ``snapshot``
+        event. After that only changes are sent, with a comment line every
+        ``heartbeat`` seconds. The stream ends after ``max_seconds`` (the
+        browser then reconnects) or when the aggregator stops.
+        """
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        snapshot = self.snapshot()
+        if last_event_id != snapshot.digest:
+            payload = snapshot.to_dict()
+            payload["providers"] = latest_imports(snapshot.data.get("import_status"))
+            yield format_event("snapshot", payload, snapshot.digest)
+
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        while not self._stop.is_set():
+            timeout = heartbeat
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+
+            current = self.wait_for_change(snapshot.version, timeout)
+            if current is None:
+                yield ": heartbeat\n\n"
+                continue
+            for event, data in diff_events(snapshot.data, current.data):
+                yield format_event(event, data, current.digest)
+            snapshot = current
+
+    def start(self):
+        """Start the background collection thread if it is not running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="monitoring-aggregator", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and end open streams.
+
+        Snapshots stay readable.
+        """
+        self._stop.set()
+        self._wake.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def _next_interval(self) -> float:
+        snapshot = self._snapshot
+        if snapshot is not None and imports_running(snapshot.data):
+            return self.active_interval
+        return self.interval
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._next_interval())
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error collecting monitoring status: {e}")
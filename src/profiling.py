@@ -0,0 +1,254 @@
+"""
+On-demand profiling of single requests.
+"""
+
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY = "_profile"
+PROFILE_EXTENSIONS = (".prof", ".collapsed")
+
+_NAME = re.compile(r"^[\w.-]+$")
+_SLUG = re.compile(r"[^\w]+")
+
+# Stacks deeper than this are cut off in the collapsed output
+MAX_STACK_DEPTH = 200
+
+
+def _frame_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """Convert profile stats to "a;b;c <microseconds>" flame graph lines.
+
+    cProfile records caller -> callee edges, not full stacks, so each
+    edge's time is split over the paths leading to its caller in
+    proportion to their share of the caller's cumulative time.
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[Any, Dict[Any, float]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    folded: Dict[str, float] = {}
+
+    def walk(func, stack: List[str], on_stack: set, cumulative: float):
+        total = entries[func][3]
+        fraction = cumulative / total if total > 0 else 0.0
+        own = entries[func][2] * fraction
+        key = ";".join(stack)
+        if own > 0:
+            folded[key] = folded.get(key, 0.0) + own
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            if callee in on_stack or edge_time * fraction <= 0:
+                continue
+            on_stack.add(callee)
+            walk(
+                callee,
+                stack + [_frame_label(callee)],
+                on_stack,
+                edge_time * fraction,
+            )
+            on_stack.discard(callee)
+
+    for func, (_, _, _, cumulative, callers) in entries.items():
+        if not callers:
+            walk(func, [_frame_label(func)], {func}, cumulative)
+
+    return [
+        f"{stack} {round(seconds * 1e6)}"
+        for stack, seconds in sorted(folded.items())
+        if round(seconds * 1e6) > 0
+    ]
+
+
+class RequestProfiler:
+    """Profile requests that carry the profiling token, and store the results.
+
+    A request is profiled when it sends the token in the X-Profile-Token
+    header or the ``_profile`` query parameter. The whole WSGI call is
+    profiled, including template rendering and time spent waiting on
+    upstream requests and fan-out futures, until the response body has been
+    sent. Work done inside fan-out threads shows up as time waiting on
+    them. Each profile is written to ``directory`` as a pstats ``.prof``
+    file and a ``.collapsed`` file for flame graph tools; only the newest
+    ``max_profiles`` are kept. One request is profiled at a time.
+    """
+
+    def __init__(self, directory: str, token: str, max_profiles: int = 50):
+        self.directory = directory
+        self.token = token
+        self.max_profiles = max(int(max_profiles), 1)
+        self._active = threading.Lock()
+
+    def authorized(self, supplied: Optional[str]) -> bool:
+        """Check a supplied token against the configured one."""
+        return bool(self.token and supplied) and hmac.compare_digest(
+            str(supplied).encode("utf-8"), self.token.encode("utf-8")
+        )
+
+    def requested(self, environ: Dict[str, Any]) -> bool:
+        """Return True if the request asks to be profiled."""
+        supplied = environ.get("HTTP_" + PROFILE_HEADER.upper().replace("-", "_"))
+        if supplied is None and PROFILE_QUERY in environ.get("QUERY_STRING", ""):
+            supplied = parse_qs(environ["QUERY_STRING"]).get(PROFILE_QUERY, [None])[0]
+        return self.authorized(supplied)
+
+    def profile(self, wsgi_app: Callable, environ, start_response) -> Iterable[bytes]:
+        """Run wsgi_app under the profiler and save the result when done."""
+        if not self._active.acquire(blocking=False):
+            logger.info("Profiling skipped: another request is being profiled")
+            return wsgi_app(environ, start_response)
+        name = self._profile_name(environ)
+
+        def start_with_id(status, headers, exc_info=None):
+            headers = list(headers) + [("X-Profile-Id", name)]
+            return start_response(status, headers, exc_info)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            body = wsgi_app(environ, start_with_id)
+            profile.disable()
+        except BaseException:
+            profile.disable()
+            self._finish(profile, name, started)
+            raise
+        return _ProfiledBody(
+            body, profile, lambda: self._finish(profile, name, started)
+        )
+
+    def _finish(self, profile: cProfile.Profile, name: str, started: float):
+        try:
+            elapsed = time.perf_counter() - started
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            stats = pstats.Stats(profile)
+            stats.dump_stats(f"{path}.prof")
+            with open(f"{path}.collapsed", "w") as f:
+                f.write("\n".join(collapsed_stacks(stats)) + "\n")
+            logger.info(f"Saved profile {name} ({elapsed * 1000:.0f} ms)")
+            self._prune()
+        except OSError as e:
+            logger.error(f"Could not save profile {name}: {e}")
+        finally:
+            self._active.release()
+
+    @staticmethod
+    def _profile_name(environ: Dict[str, Any]) -> str:
+        slug = _SLUG.sub("-", environ.get("PATH_INFO", "")).strip("-")[:60] or "root"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return f"{stamp}-{environ.get('REQUEST_METHOD', 'GET').lower()}-{slug}"
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Return the stored profiles, newest first."""
+        profiles: Dict[str, Dict[str, Any]] = {}
+        if not os.path.isdir(self.directory):
+            return []
+        for entry in os.scandir(self.directory):
+            stem, ext = os.path.splitext(entry.name)
+            if ext not in PROFILE_EXTENSIONS:
+                continue
+            stat = entry.stat()
+            profile = profiles.setdefault(
+                stem,
+                {"name": stem, "created": stat.st_mtime, "files": {}},
+            )
+            profile["files"][ext.lstrip(".")] = stat.st_size
+            profile["created"] = min(profile["created"], stat.st_mtime)
+        result = sorted(profiles.values(), key=lambda p: p["name"], reverse=True)
+        for profile in result:
+            profile["created"] = datetime.fromtimestamp(profile["created"]).isoformat()
+        return result
+
+    def file_path(self, filename: str) -> Optional[str]:
+        """Return the path of a stored profile file, or None if unknown."""
+        if not _NAME.match(filename) or not filename.endswith(PROFILE_EXTENSIONS):
+            return None
+        path = os.path.join(self.directory, filename)
+        return path if os.path.isfile(path) else None
+
+    def _prune(self):
+        keep = self.max_profiles
+        for profile in self.list_profiles()[keep:]:
+            for ext in PROFILE_EXTENSIONS:
+                try:
+                    os.unlink(os.path.join(self.directory, profile["name"] + ext))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """WSGI middleware that hands requested profiles to the current profiler.
+
+    ``get_profiler`` is called per request and returns None while profiling
+    is disabled, so configuration changes apply without a restart.
+    """
+
+    def __init__(
+        self, wsgi_app: Callable, get_profiler: Callable[[], Optional[RequestProfiler]]
+    ):
+        self.wsgi_app = wsgi_app
+        self.get_profiler = get_profiler
+
+    def __call__(self, environ, start_response):
+        profiler = self.get_profiler()
+        if profiler is None or not profiler.requested(environ):
+            return self.wsgi_app(environ, start_response)
+        return profiler.profile(self.wsgi_app, environ, start_response)
+
+
+class _ProfiledBody:
+    """Response iterable that keeps profiling while the body is sent."""
+
+    def __init__(self, body: Iterable[bytes], profile: cProfile.Profile, on_close):
+        self._body = body
+        self._iterator = iter(body)
+        self._profile = profile
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        self._profile.enable()
+        try:
+            return next(self._iterator)
+        finally:
+            self._profile.disable()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self._body, "close", None)
+            if close is not None:
+                self._profile.enable()
+                try:
+                    close()
+                finally:
+                    self._profile.disable()
+        finally:
+            self._on_close()
@@ -0,0 +1,185 @@
+"""
+Time-bucketed cache for channel programs.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import tracing
+from .timeutils import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[datetime, datetime], List[Dict]]
+
+
+def merge_runs(bucket_starts: List[int], bucket_seconds: int) -> List[Tuple[int, int]]:
+    """Merge sorted bucket start times into contiguous [start, end) intervals."""
+    runs: List[Tuple[int, int]] = []
+    for bucket in bucket_starts:
+        if runs and runs[-1][1] == bucket:
+            runs[-1] = (runs[-1][0], bucket + bucket_seconds)
+        else:
+            runs.append((bucket, bucket + bucket_seconds))
+    return runs
+
+
+class _ChannelPrograms:
+    """Cached buckets and programs for one channel."""
+
+    __slots__ = ("buckets", "programs")
+
+    def __init__(self):
+        # bucket start (epoch seconds) -> time it was fetched (monotonic)
+        self.buckets: Dict[int, float] = {}
+        # program key -> (start epoch, end epoch, program)
+        self.programs: Dict[Any, Tuple[float, float, Dict]] = {}
+
+
+class ProgramWindowCache:
+    """Cache channel programs in fixed time buckets.
+
+    Requested windows are widened to whole buckets. Only buckets that are
+    missing or older than ``ttl`` are fetched, with adjacent missing buckets
+    merged into a single upstream call, and the cached programs are cut back
+    to the exact requested window. Two requests a few seconds apart therefore
+    share the same upstream data.
+    """
+
+    def __init__(
+        self, bucket_seconds: int = 3600, ttl: float = 300, max_channels: int = 2000
+    ):
+        self.bucket_seconds = max(int(bucket_seconds), 60)
+        self.ttl = max(float(ttl or 0), 0.0)
+        self.max_channels = max(int(max_channels), 1)
+        self._channels: "OrderedDict[str, _ChannelPrograms]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"bucket_hits": 0, "bucket_misses": 0, "upstream_fetches": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(
+        self, channel_id: str, start: datetime, end: datetime, fetch: Fetcher
+    ) -> List[Dict]:
+        """Return programs of channel_id overlapping [start, end).
+
+        ``fetch(run_start, run_end)`` is called for every run of missing
+        buckets and must raise on upstream failure.
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        size = self.bucket_seconds
+        first = int(math.floor(start_ts / size)) * size
+        last = int(math.ceil(end_ts / size)) * size
+        wanted = list(range(first, max(last, first + size), size))
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._channels.get(channel_id)
+            if entry is None:
+                entry = self._channels[channel_id] = _ChannelPrograms()
+                if len(self._channels) > self.max_channels:
+                    self._channels.popitem(last=False)
+            else:
+                self._channels.move_to_end(channel_id)
+            missing = [
+                bucket
+                for bucket in wanted
+                if now - entry.buckets.get(bucket, -math.inf) >= self.ttl
+            ]
+            self._stats["bucket_hits"] += len(wanted) - len(missing)
+            self._stats["bucket_misses"] += len(missing)
+        tracing.record("cache", 0.0, "programs miss" if missing else "programs hit")
+
+        for run_start, run_end in merge_runs(missing, size):
+            programs = fetch(
+                datetime.fromtimestamp(run_start, timezone.utc),
+                datetime.fromtimestamp(run_end, timezone.utc),
+            )
+            self._store(entry, run_start, run_end, programs)
+
+        with self._lock:
+            selected = [
+                item
+                for item in entry.programs.values()
+                if item[0] < end_ts and item[1] > start_ts
+            ]
+        selected.sort(key=lambda item: item[0])
+        # Hand out copies: callers are free to modify the program dicts
+        return [dict(item[2]) for item in selected]
+
+    def _store(
+        self,
+        entry: _ChannelPrograms,
+        run_start: int,
+        run_end: int,
+        programs: List[Dict],
+    ):
+        parsed = []
+        for program in programs:
+            program_start = parse_timestamp(program.get("start_time"))
+            program_end = parse_timestamp(program.get("end_time"))
+            if program_start is None or program_end is None:
+                logger.debug(f"Skipping program without parseable times: {program}")
+                continue
+            key = program.get("id") or (program.get("start_time"), program.get("title"))
+            parsed.append(
+                (key, program_start.timestamp(), program_end.timestamp(), program)
+            )
+
+        fetched_at = time.monotonic()
+        with self._lock:
+            self._stats["upstream_fetches"] += 1
+            # The fresh fetch is authoritative for programs starting in the run
+            for key in [
+                key
+                for key, item in entry.programs.items()
+                if run_start <= item[0] < run_end
+            ]:
+                del entry.programs[key]
+            for key, program_start, program_end, program in parsed:
+                entry.programs[key] = (program_start, program_end, program)
+            for bucket in range(run_start, run_end, self.bucket_seconds):
+                entry.buckets[bucket] = fetched_at
+
+    def covered_intervals(self, channel_id: str) -> List[Tuple[datetime, datetime]]:
+        """Return the merged time intervals cached for a channel."""
+        with self._lock:
+            entry = self._channels.get(channel_id)
+            buckets = sorted(entry.buckets) if entry else []
+        return [
+            (
+                datetime.fromtimestamp(run_start, timezone.utc),
+                datetime.fromtimestamp(run_end, timezone.utc),
+            )
+            for run_start, run_end in merge_runs(buckets, self.bucket_seconds)
+        ]
+
+    def invalidate(self, channel_id: Optional[str] = None):
+        """Drop cached programs for one channel, or for all channels."""
+        with self._lock:
+            if channel_id is None:
+                self._channels.clear()
+            else:
+                self._channels.pop(channel_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return bucket hit/miss counters and sizing information."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["channels"] = len(self._channels)
+            stats["programs"] = sum(len(e.programs) for e in self._channels.values())
+        lookups = stats["bucket_hits"] + stats["bucket_misses"]
+        stats["hit_ratio"] = (
+            round(stats["bucket_hits"] / lookups, 4) if lookups else 0.0
+        )
+        stats["bucket_seconds"] = self.bucket_seconds
+        stats["ttl"] = self.ttl
+        return stats
@@ -0,0 +1,192 @@
+"""
+Single-flight coalescing of identical concurrent upstream requests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import tracing
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for it and receive its result, or its exception. Nothing
+    is cached once the call has finished.
+
+    With ``lock_dir`` set, gunicorn workers coalesce too: the running call
+    holds an flock on a per-key file in that directory, and a worker that
+    finds the lock taken waits for it (at most ``wait_timeout`` seconds)
+    and then uses the JSON result the holder wrote next to the lock.
+    Results that are not JSON serializable are not shared; the waiting
+    worker then makes the call itself.
+    """
+
+    # Result files older than this are removed (they are read within ms)
+    PRUNE_AGE = 600.0
+
+    def __init__(
+        self,
+        name: str = "flight",
+        enabled: bool = True,
+        lock_dir: Optional[str] = None,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.lock_dir = lock_dir if enabled and lock_dir and fcntl else None
+        self.wait_timeout = max(float(wait_timeout), 0.0)
+        self.poll_interval = max(float(poll_interval), 0.001)
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._stats = {"calls": 0, "coalesced": 0, "coalesced_workers": 0}
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), sharing the call with concurrent callers for key."""
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            running = self._calls.get(key)
+            if running is None:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                call = running
+                self._stats["coalesced"] += 1
+        if running is not None:
+            with tracing.span(self.name, "coalesced"):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self._run(key, fn)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.value
+
+    def _run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, coalescing with other workers when a lock_dir is set."""
+        if self.lock_dir is None:
+            return fn()
+
+        path = os.path.join(
+            self.lock_dir, hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        )
+        with open(f"{path}.lock", "a+") as lock_file:
+            waited_since = time.time()
+            if not self._acquire(lock_file):
+                value = self._read_result(path, waited_since)
+                if value is not _MISSING:
+                    with self._lock:
+                        self._stats["coalesced_workers"] += 1
+                    return value
+            try:
+                value = fn()
+                self._write_result(path, value)
+                return value
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                self._prune()
+
+    def _acquire(self, lock_file) -> bool:
+        """Take the lock; return False if another worker held it first.
+
+        After a timeout the lock is not held and False is returned as well.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        contended = False
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return not contended
+            except BlockingIOError:
+                contended = True
+                if time.monotonic() >= deadline:
+                    logger.warning(f"{self.name}: gave up waiting for another worker")
+                    return False
+                # Polling rather than a blocking flock keeps gevent workers responsive
+                time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _read_result(path: str, written_after: float) -> Any:
+        try:
+            with open(f"{path}.json", "r") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if result.get("written_at", 0) < written_after:
+            return _MISSING
+        return result.get("value")
+
+    def _write_result(self, path: str, value: Any):
+        try:
+            data = json.dumps({"written_at": time.time(), "value": value})
+        except (TypeError, ValueError):
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, f"{path}.json")
+        except OSError as e:
+            logger.debug(f"{self.name}: could not share result: {e}")
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < self.PRUNE_AGE:
+                return
+            self._last_prune = now
+        try:
+            for entry in os.scandir(self.lock_dir):
+                if now - entry.stat().st_mtime > self.PRUNE_AGE:
+                    os.unlink(entry.path)
+        except OSError as e:
+            logger.debug(f"{self.name}: could not prune {self.lock_dir}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls ran and how many were coalesced into them."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        stats["enabled"] = self.enabled
+        stats["cross_worker"] = self.lock_dir is not None
+        return stats
@@ -70,9 +70,13 @@ class BaseTemplate {
         this.updateCurrentTime();
         setInterval(() => this.updateCurrentTime(), 60000);
 
-        // Check backend status periodically
-        this.checkBackendStatus();
-        setInterval(() => this.checkBackendStatus(), 60000);
+        // Backend status is pushed by the shared status stream
+        if (window.statusStream) {
+            window.statusStream.on('health', (data) => this.showBackendStatus(data.webepg_health));
+        } else {
+            this.checkBackendStatus();
+            setInterval(() => this.checkBackendStatus(), 60000);
+        }
 
         // Set up auto-refresh
         this.setupAutoRefresh();
@@ -103,21 +107,7 @@ class BaseTemplate {
         try {
             const response = await fetch('/api/monitoring/status');
             const data = await response.json();
-
-            const statusDot = document.getElementById('webepg-status');
-            const indicator = document.getElementById('status-indicator');
-
-            if (!statusDot || !indicator) return;
-
-            if (data.webepg_health) {
-                statusDot.className = 'status-dot online';
-                statusDot.title = 'WebEPG ist online';
-                indicator.className = 'status-indicator online';
-            } else {
-                statusDot.className = 'status-dot offline';
-                statusDot.title = 'WebEPG ist offline';
-                indicator.className = 'status-indicator offline';
-            }
+            this.showBackendStatus(data.webepg_health);
         } catch (_error) {
             const statusDot = document.getElementById('webepg-status');
             if (statusDot) {
@@ -127,6 +117,23 @@ class BaseTemplate {
         }
     }
 
+    showBackendStatus(healthy) {
+        const statusDot = document.getElementById('webepg-status');
+        const indicator = document.getElementById('status-indicator');
+
+        if (!statusDot || !indicator) return;
+
+        if (healthy) {
+            statusDot.className = 'status-dot online';
+            statusDot.title = 'WebEPG ist online';
+            indicator.className = 'status-indicator online';
+        } else {
+            statusDot.className = 'status-dot offline';
+            statusDot.title = 'WebEPG ist offline';
+            indicator.className = 'status-indicator offline';
+        }
+    }
+
     refreshCurrentTab() {
         const currentTab = this.data.activeTab || 'epg';
 
@@ -218,8 +225,10 @@ class BaseTemplate {
         const currentTab = this.data.activeTab || 'epg';
         const refreshInterval = this.data.refreshInterval || 300;
 
-        // Only auto-refresh EPG and Monitoring tabs
-        if ((currentTab === 'epg' || currentTab === 'monitoring') && refreshInterval > 0) {
+        // Only auto-refresh EPG and Monitoring tabs; the monitoring tab is kept
+        // current by the status stream when it is available
+        const autoRefresh = currentTab === 'epg' || (currentTab === 'monitoring' && !window.statusStream);
+        if (autoRefresh && refreshInterval > 0) {
             console.log(`Setting up auto-refresh for ${currentTab} every ${refreshInterval} seconds`);
 
             this.refreshTimer = setInterval(() => {
@@ -278,6 +287,9 @@ class BaseTemplate {
             clearInterval(this.refreshTimer);
             this.refreshTimer = null;
         }
+        if (window.statusStream) {
+            window.statusStream.close();
+        }
     }
 }
 
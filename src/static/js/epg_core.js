@@ -1,4 +1,8 @@
 // epg_core.js - Enhanced with provider filtering and smart time badges
+
+// Channels per /api/epg/programs request (MAX_BATCH_CHANNELS in src/app.py)
+const PROGRAM_BATCH_SIZE = 100;
+
 class EPGCore {
     constructor() {
         this.config = {
@@ -16,6 +20,7 @@ class EPGCore {
         this.currentDate = new Date();
         this.hasMoreChannels = true;
         this.currentPage = 0;
+        this.nextCursor = null; // Opaque cursor for the next channel page
 
         // NEW: Provider filtering
         this.activeProvider = null; // null = All EPG, string = provider ID
@@ -76,6 +81,7 @@ class EPGCore {
     }
 
     // NEW: Get channels based on active provider
+    // page 0 starts from the beginning; later pages continue from this.nextCursor
     async fetchChannels(page = 0) {
         // If a provider is selected, use its channels
         if (this.activeProvider && this.providerChannels.length > 0) {
@@ -95,16 +101,21 @@ class EPGCore {
 
         // Original behavior for "All EPG"
         try {
-            const cacheKey = `channels_${page}`;
+            const cursor = page === 0 ? null : this.nextCursor;
+            const cacheKey = `channels_${cursor || 'first'}`;
             const cached = this.cache.get(cacheKey);
 
             if (cached) {
+                this.nextCursor = cached.nextCursor;
                 return cached;
             }
 
-            const response = await fetch(
-                `/api/epg/channels?page=${page}&limit=${this.config.itemsPerPage}`
-            );
+            const params = new URLSearchParams({ limit: this.config.itemsPerPage });
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+
+            const response = await fetch(`/api/epg/channels?${params}`);
 
             if (!response.ok) {
                 throw new Error(`HTTP ${response.status}: ${response.statusText}`);
@@ -118,9 +129,11 @@ class EPGCore {
 
             const result = {
                 channels: data.channels,
-                hasMore: data.has_more || data.channels.length === this.config.itemsPerPage
+                hasMore: Boolean(data.has_more && data.next_cursor),
+                nextCursor: data.next_cursor || null
             };
 
+            this.nextCursor = result.nextCursor;
             this.cache.set(cacheKey, result);
             return result;
 
@@ -161,36 +174,7 @@ class EPGCore {
             }
 
             // Process and enrich each program
-            programs.forEach(program => {
-                program.channel_id = channelId;
-                program.image_url = program.icon_url;
-                program.stream_url = program.stream;
-                program.duration = program.duration || this.calculateDuration(
-                    program.start_time,
-                    program.end_time
-                );
-
-                program.start_time_local = this.formatDateTime(program.start_time, 'time');
-                program.end_time_local = this.formatDateTime(program.end_time, 'time');
-                program.date_local = this.formatDateTime(program.start_time, 'date');
-
-                program.episode_formatted = this.parseXmltvNsEpisode(program.episode_num);
-
-                // Calculate progress if program is currently airing
-                const now = new Date();
-                const start = new Date(program.start_time);
-                const end = new Date(program.end_time);
-
-                program.is_live = start <= now && end >= now;
-
-                if (program.is_live) {
-                    program.progress = this.calculateProgress(program.start_time, program.end_time);
-                    program.time_remaining = this.calculateTimeRemaining(program.end_time);
-                }
-
-                // Add smart time badge
-                program.time_badge = this.getSmartTimeBadge(program.start_time, program.end_time);
-            });
+            programs.forEach(program => this.enrichProgram(program, channelId));
 
             this.cache.set(cacheKey, programs);
             return programs;
@@ -201,6 +185,106 @@ class EPGCore {
         }
     }
 
+    // Add display fields (local times, live progress, badges) to a program
+    enrichProgram(program, channelId) {
+        program.channel_id = channelId;
+        program.image_url = program.icon_url;
+        program.stream_url = program.stream;
+        program.duration = program.duration || this.calculateDuration(
+            program.start_time,
+            program.end_time
+        );
+
+        // The server precomputes local times; only fill in what is missing
+        program.start_time_local = program.start_time_local || this.formatDateTime(program.start_time, 'time');
+        program.end_time_local = program.end_time_local || this.formatDateTime(program.end_time, 'time');
+        program.date_local = program.date_local || this.formatDateTime(program.start_time, 'date');
+
+        program.episode_formatted = this.parseXmltvNsEpisode(program.episode_num);
+
+        // Calculate progress if program is currently airing
+        const now = new Date();
+        const start = new Date(program.start_time);
+        const end = new Date(program.end_time);
+
+        program.is_live = start <= now && end >= now;
+
+        if (program.is_live) {
+            program.progress = this.calculateProgress(program.start_time, program.end_time);
+            program.time_remaining = this.calculateTimeRemaining(program.end_time);
+        }
+
+        // Add smart time badge
+        program.time_badge = this.getSmartTimeBadge(program.start_time, program.end_time);
+        return program;
+    }
+
+    // Fetch programs for many channels and one time window in a single request.
+    // Returns a Map of channelId -> programs; failed channels map to [].
+    async fetchProgramsForChannels(channelIds, startDate, endDate) {
+        const result = new Map();
+        const dateKey = startDate.toISOString().split('T')[0];
+        const missing = [];
+
+        channelIds.forEach(channelId => {
+            const cached = this.cache.get(`programs_${channelId}_${dateKey}`);
+            if (cached) {
+                result.set(channelId, cached);
+            } else {
+                missing.push(channelId);
+            }
+        });
+
+        // The batch endpoint accepts at most PROGRAM_BATCH_SIZE channels per request
+        const batches = [];
+        for (let i = 0; i < missing.length; i += PROGRAM_BATCH_SIZE) {
+            batches.push(missing.slice(i, i + PROGRAM_BATCH_SIZE));
+        }
+        await Promise.all(batches.map(batch =>
+            this.fetchProgramsBatch(batch, startDate, endDate, dateKey, result)
+        ));
+
+        return result;
+    }
+
+    // Fetch one batch of channels from /api/epg/programs into result
+    async fetchProgramsBatch(channelIds, startDate, endDate, dateKey, result) {
+        try {
+            const params = new URLSearchParams({
+                channels: channelIds.join(','),
+                start: startDate.toISOString(),
+                end: endDate.toISOString()
+            });
+            const response = await fetch(`/api/epg/programs?${params}`);
+
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+
+            const data = await response.json();
+            const programsByChannel = (data.success && data.programs) || {};
+            const errors = data.errors || {};
+
+            channelIds.forEach(channelId => {
+                const key = String(channelId);
+                if (errors[key]) {
+                    console.warn(`Error fetching programs for channel ${channelId}:`, errors[key]);
+                    result.set(channelId, []);
+                    return;
+                }
+
+                const programs = programsByChannel[key] || [];
+                programs.forEach(program => this.enrichProgram(program, channelId));
+                this.cache.set(`programs_${channelId}_${dateKey}`, programs);
+                result.set(channelId, programs);
+            });
+
+        } catch (error) {
+            console.warn('Error fetching programs batch:', error);
+            channelIds.forEach(channelId => result.set(channelId, []));
+        }
+    }
+
     // NEW: Reset EPG state when switching providers
     resetEPGState() {
         this.channels = [];
@@ -209,6 +293,7 @@ class EPGCore {
         this.loadedDateRanges.clear();
         this.cache.clear();
         this.currentPage = 0;
+        this.nextCursor = null;
         this.hasMoreChannels = true;
     }
 
@@ -224,6 +309,7 @@ class EPGCore {
             this.dailyPrograms.clear();
             this.loadedDateRanges.clear();
             this.currentPage = 0;
+            this.nextCursor = null;
             this.hasMoreChannels = true;
 
             // Get channels based on active provider
@@ -301,21 +387,24 @@ class EPGCore {
         return this.channels.find(c => c.id === id || c.id === channelId);
     }
 
-    processChannelsWithPrograms(channels, startDate, endDate) {
+    async processChannelsWithPrograms(channels, startDate, endDate) {
         this.currentEvents.clear();
         this.dailyPrograms.clear();
 
         const now = new Date();
 
-        const programPromises = channels.map(async (channel) => {
+        // For provider channels, use channel.Id; for EPG channels, use channel.id
+        const channelIds = channels.map(channel => channel.Id || channel.id);
+        const programsByChannel = await this.fetchProgramsForChannels(
+            channelIds,
+            startDate,
+            endDate
+        );
+
+        channels.forEach(channel => {
             try {
-                // For provider channels, use channel.Id; for EPG channels, use channel.id
                 const channelId = channel.Id || channel.id;
-                const programs = await this.fetchProgramsForChannel(
-                    channelId,
-                    startDate,
-                    endDate
-                );
+                const programs = programsByChannel.get(channelId) || [];
 
                 channel.programs = programs;
 
@@ -339,8 +428,6 @@ class EPGCore {
                 channel.programs = [];
             }
         });
-
-        return Promise.all(programPromises);
     }
 
     // ... rest of the class remains the same (isSameDay, getSmartTimeBadge, etc.)
@@ -18,7 +18,7 @@ class EPGMappingManager {
         this.dom = new EPGMappingDOM();
         this.api = new EPGMappingAPI();
         this.fuzzy = new EPGMappingFuzzy();
-        this.suggestions = new EPGMappingSuggestions(this.state, this.fuzzy);
+        this.suggestions = new EPGMappingSuggestions(this.state, this.fuzzy, this.api);
         this.ui = new EPGMappingUI(this.state, this.dom, this.suggestions);
         this.dragDrop = new EPGMappingDragDrop(this.state, this.ui, this);
 
@@ -204,7 +204,7 @@ class EPGMappingManager {
 
                 // Generate suggestions after EPG channels are loaded
                 if (this.state.epgChannels.length > 0) {
-                    this.generateSuggestions();
+                    await this.generateSuggestions();
                 }
 
                 // Render channels
@@ -272,7 +272,7 @@ class EPGMappingManager {
 
             // Generate suggestions if streaming channels are already loaded
             if (this.state.streamingChannels.length > 0) {
-                this.generateSuggestions();
+                await this.generateSuggestions();
                 this.ui.renderStreamingChannels(); // Re-render to show suggestions
             }
 
@@ -325,8 +325,8 @@ class EPGMappingManager {
     }
 
     // Generate suggestions for all channels
-    generateSuggestions() {
-        this.suggestions.generateSuggestions();
+    async generateSuggestions() {
+        await this.suggestions.generateSuggestions();
 
         // Update stats with tentative count
         this.state.updateStats(this.suggestions.getTentativeCount());
@@ -354,7 +354,7 @@ class EPGMappingManager {
         if (existingAlias) {
             // If already mapped, just remove from suggestions
             this.suggestions.suggestions.delete(streamingId);
-            this.generateSuggestions();
+            await this.generateSuggestions();
             this.ui.renderStreamingChannels();
             return;
         }
@@ -366,7 +366,7 @@ class EPGMappingManager {
         this.suggestions.acceptSuggestion(streamingId);
 
         // Update suggestions and UI
-        this.generateSuggestions();
+        await this.generateSuggestions();
         this.ui.renderStreamingChannels();
     }
 
@@ -60,6 +60,16 @@ class EPGMappingAPI {
         return this.handleResponse(response);
     }
 
+    // Ranked EPG matches for many streaming channels, computed server-side
+    async fetchSuggestions(channels, limit = 3, minScore = 70) {
+        const response = await fetch(`${this.baseUrl}/mapping/suggestions`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ channels, limit, min_score: minScore })
+        });
+        return this.handleResponse(response);
+    }
+
     async deleteAlias(aliasId) {
         const response = await fetch(`${this.baseUrl}/aliases/${aliasId}`, {
             method: 'DELETE'
@@ -4,24 +4,66 @@
  */
 
 class EPGMappingSuggestions {
-    constructor(stateManager, fuzzyManager) {
+    constructor(stateManager, fuzzyManager, apiManager) {
         this.state = stateManager;
         this.fuzzy = fuzzyManager;
+        this.api = apiManager;
         this.suggestions = new Map(); // streamingId -> suggestion data
     }
 
-    // Generate suggestions for all unmapped streaming channels
-    generateSuggestions() {
-        this.suggestions.clear();
+    // Generate suggestions for all unmapped streaming channels.
+    // Matching runs on the server; the in-browser FuzzySet is only a fallback.
+    async generateSuggestions() {
+        const unmapped = [];
 
-        // Only generate suggestions for unmapped channels
         this.state.streamingChannels.forEach(streamingChannel => {
             const streamingId = streamingChannel.Id || streamingChannel.channel_id || streamingChannel.id || streamingChannel.name;
 
             // Skip if already mapped
             if (this.state.isChannelMapped(streamingId)) return;
 
-            const bestSuggestion = this.fuzzy.findBestMatch(streamingChannel, this.state.epgChannels);
+            unmapped.push({ streamingId, streamingChannel });
+        });
+
+        let serverSuggestions = null;
+        if (this.api && unmapped.length > 0) {
+            try {
+                const data = await this.api.fetchSuggestions(
+                    unmapped.map(({ streamingId, streamingChannel }) => ({
+                        id: String(streamingId),
+                        name: streamingChannel.Name || streamingChannel.name || ''
+                    })),
+                    1,
+                    this.fuzzy.minMatchScore
+                );
+                serverSuggestions = data.suggestions || {};
+            } catch (error) {
+                console.warn('Server-side suggestions failed, using local fuzzy matching:', error);
+            }
+        }
+
+        this.suggestions.clear();
+
+        unmapped.forEach(({ streamingId, streamingChannel }) => {
+            let bestSuggestion = null;
+
+            if (serverSuggestions) {
+                const match = (serverSuggestions[String(streamingId)] || [])[0];
+                if (match) {
+                    bestSuggestion = {
+                        epgId: match.epg_id,
+                        displayName: match.display_name,
+                        score: match.score,
+                        epgChannel: this.state.channelLookup.epg.get(match.epg_id) || {
+                            id: match.epg_id,
+                            name: match.name,
+                            display_name: match.display_name
+                        }
+                    };
+                }
+            } else {
+                bestSuggestion = this.fuzzy.findBestMatch(streamingChannel, this.state.epgChannels);
+            }
 
             if (bestSuggestion && bestSuggestion.score >= this.fuzzy.minMatchScore) {
                 this.suggestions.set(streamingId, {
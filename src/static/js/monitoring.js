@@ -117,8 +117,48 @@ class MonitoringManager {
         // Update uptime every second
         setInterval(() => this.updateUptime(), 1000);
 
-        // Auto-refresh statistics every 5 minutes
-        setInterval(() => this.refreshStatistics(), 5 * 60 * 1000);
+        // Statistics and imports are pushed by the shared status stream
+        if (window.statusStream) {
+            window.statusStream
+                .on('statistics', (statistics) => this.updateStatistics({ statistics }))
+                .on('import_status', (importStatus) => this.updateImportStatistics(importStatus))
+                .on('health', (data) => this.showWebEPGHealth(data.webepg_health))
+                .on('circuit_breakers', (breakers) => this.updateCircuitBreakers(breakers));
+        } else {
+            // Auto-refresh statistics every 5 minutes
+            setInterval(() => this.refreshStatistics(), 5 * 60 * 1000);
+        }
+    }
+
+    updateCircuitBreakers(breakers) {
+        const container = document.getElementById('circuit-breakers');
+        if (!container) return;
+
+        container.innerHTML = (breakers || []).map(breaker => {
+            const healthy = breaker.state === 'closed' || breaker.state === 'disabled';
+            return `
+                <div class="health-card" data-breaker="${breaker.name}">
+                    <div class="health-card-header">
+                        <h3>${breaker.name}</h3>
+                        <span class="health-status ${healthy ? 'online' : 'offline'}">${breaker.state}</span>
+                    </div>
+                    <div class="health-card-body">
+                        <div class="health-info">
+                            <span class="health-label">Seit</span>
+                            <span class="health-value">${this.formatDateTime(breaker.since)}</span>
+                        </div>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+
+    showWebEPGHealth(healthy) {
+        const statusElement = document.getElementById('webepg-health-status');
+        if (!statusElement) return;
+
+        statusElement.textContent = healthy ? 'Online' : 'Offline';
+        statusElement.className = `health-status ${healthy ? 'online' : 'offline'}`;
     }
 
     // Formatting utilities
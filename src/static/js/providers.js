@@ -19,10 +19,33 @@ class ProviderManager {
         await this.loadProviders();
         await this.loadImportLogs();
         this.updateStatistics();
+        this.subscribeToImportProgress();
 
         this.initialized = true;
     }
 
+    subscribeToImportProgress() {
+        if (!window.statusStream) return;
+
+        window.statusStream
+            .on('import_status', (importStatus) => {
+                this.importLogs = importStatus?.recent_imports || this.importLogs;
+                this.renderProviders();
+                this.updateStatistics();
+            })
+            .on('provider_progress', ({ providers }) => {
+                Object.values(providers || {}).forEach(log => {
+                    const index = this.importLogs.findIndex(existing => existing.id === log.id);
+                    if (index >= 0) {
+                        this.importLogs[index] = log;
+                    } else {
+                        this.importLogs.push(log);
+                    }
+                });
+                this.renderProviders();
+            });
+    }
+
     setupEventListeners() {
         // Add provider buttons
         const addBtn = document.getElementById('add-provider-btn');
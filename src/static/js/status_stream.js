@@ -0,0 +1,122 @@
+/**
+ * Ultimate UI - Monitoring Status Stream
+ * One shared Server-Sent Events connection per tab for health, import status,
+ * per-provider import progress and statistics. Falls back to polling
+ * /api/monitoring/status when the stream is unavailable or disabled by the
+ * server (see the status-stream meta tag).
+ */
+
+class StatusStream {
+    constructor(url = '/api/monitoring/stream', pollUrl = '/api/monitoring/status', pollInterval = 60000) {
+        this.url = url;
+        this.pollUrl = pollUrl;
+        this.pollInterval = pollInterval;
+        this.handlers = {};
+        this.lastPayloads = {};
+        this.source = null;
+        this.pollTimer = null;
+        this.started = false;
+    }
+
+    /**
+     * Subscribe to 'health', 'import_status', 'provider_progress', 'statistics'
+     * or 'circuit_breakers'.
+     * A late subscriber immediately receives the last known payload.
+     */
+    on(event, handler) {
+        (this.handlers[event] = this.handlers[event] || []).push(handler);
+        if (event in this.lastPayloads) {
+            handler(this.lastPayloads[event]);
+        }
+        this.start();
+        return this;
+    }
+
+    start() {
+        if (this.started) return;
+        this.started = true;
+
+        const meta = document.querySelector('meta[name="status-stream"]');
+        if (typeof EventSource === 'undefined' || (meta && meta.content === 'off')) {
+            this.startPolling();
+            return;
+        }
+
+        this.source = new EventSource(this.url);
+        this.source.addEventListener('snapshot', (e) => this.applySnapshot(JSON.parse(e.data)));
+        ['health', 'import_status', 'provider_progress', 'statistics', 'circuit_breakers'].forEach(event => {
+            this.source.addEventListener(event, (e) => this.emit(event, JSON.parse(e.data)));
+        });
+        this.source.onerror = () => {
+            // EventSource retries by itself (with Last-Event-ID); it only gives up
+            // on an HTTP error such as 503 when all stream slots are taken
+            if (this.source.readyState === EventSource.CLOSED) {
+                console.warn('Status stream unavailable, falling back to polling');
+                this.source = null;
+                this.startPolling();
+            }
+        };
+    }
+
+    applySnapshot(data) {
+        this.emit('health', { webepg_health: data.webepg_health });
+        this.emit('import_status', data.import_status || {});
+        this.emit('provider_progress', { providers: data.providers || {} });
+        this.emit('statistics', data.statistics || {});
+        this.emit('circuit_breakers', data.circuit_breakers || []);
+    }
+
+    emit(event, payload) {
+        this.lastPayloads[event] = payload;
+        (this.handlers[event] || []).forEach(handler => {
+            try {
+                handler(payload);
+            } catch (error) {
+                console.error(`Status stream handler for ${event} failed:`, error);
+            }
+        });
+    }
+
+    startPolling() {
+        if (this.pollTimer) return;
+        const poll = async () => {
+            try {
+                const response = await fetch(this.pollUrl);
+                const data = await response.json();
+                if (data.success) {
+                    this.applySnapshot({ ...data, providers: this.latestImports(data.import_status) });
+                }
+            } catch (error) {
+                this.emit('health', { webepg_health: false });
+                console.error('Error polling monitoring status:', error);
+            }
+        };
+        poll();
+        this.pollTimer = setInterval(poll, this.pollInterval);
+    }
+
+    latestImports(importStatus) {
+        const latest = {};
+        (importStatus?.recent_imports || []).forEach(item => {
+            if (item.provider_id === undefined || item.provider_id === null) return;
+            const key = String(item.provider_id);
+            if (!latest[key] || String(item.started_at || '') > String(latest[key].started_at || '')) {
+                latest[key] = item;
+            }
+        });
+        return latest;
+    }
+
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+        if (this.pollTimer) {
+            clearInterval(this.pollTimer);
+            this.pollTimer = null;
+        }
+    }
+}
+
+window.statusStream = new StatusStream();
@@ -0,0 +1,214 @@
+"""
+EPG statistics kept up to date from data the UI has already fetched.
+"""
+
+import logging
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .timeutils import DEFAULT_TIMEZONE, get_timezone, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Channel fields that name the EPG provider a channel comes from
+PROVIDER_FIELDS = ("provider_id", "provider")
+
+
+def _provider_of(channel: Dict) -> Optional[str]:
+    for field in PROVIDER_FIELDS:
+        value = channel.get(field)
+        if isinstance(value, dict):
+            value = value.get("id")
+        if value is not None:
+            return str(value)
+    return None
+
+
+class StatisticsEngine:
+    """Incremental channel, program and alias counts.
+
+    The engine is fed by the API client whenever it fetches the channel
+    list, a program window or the alias mapping, so it never makes
+    upstream requests of its own. Program windows replace what was known
+    for that channel and time span, and per-channel, per-day counters are
+    adjusted by the difference. ``snapshot()`` is recomputed only after an
+    update (or when the day changes) and carries the time the data last
+    changed as ``as_of``, so refetching unchanged data leaves it as it is.
+    """
+
+    def __init__(self, timezone: str = DEFAULT_TIMEZONE):
+        self.timezone = timezone
+        self._lock = threading.Lock()
+        self._channels: Dict[str, Optional[str]] = {}
+        self._channel_ids: Tuple = ()
+        # channel id -> program key -> (start epoch, local day, end epoch)
+        self._programs: Dict[str, Dict[Any, Tuple[float, date, float]]] = {}
+        # channel id -> local day -> number of programs starting that day
+        self._day_counts: Dict[str, Counter] = {}
+        self._aliases: Counter = Counter()
+        self._updated_at: Optional[datetime] = None
+        self._version = 0
+        self._cached: Optional[Tuple[int, date, Dict[str, Any]]] = None
+
+    @property
+    def has_data(self) -> bool:
+        return self._updated_at is not None
+
+    def _touch(self):
+        self._version += 1
+        self._updated_at = datetime.now(get_timezone(self.timezone))
+
+    def update_channels(self, channels: Iterable[Dict]):
+        """Record the current channel list; unchanged lists are a no-op."""
+        mapping = {
+            str(channel["id"]): _provider_of(channel)
+            for channel in channels
+            if isinstance(channel, dict) and channel.get("id") is not None
+        }
+        ids = tuple(sorted(mapping.items(), key=lambda item: item[0]))
+        with self._lock:
+            if ids == self._channel_ids and self.has_data:
+                return
+            self._channel_ids = ids
+            self._channels = mapping
+            self._touch()
+
+    def record_programs(
+        self, channel_id: Any, start: Any, end: Any, programs: Iterable[Dict]
+    ):
+        """Replace what is known about channel_id for programs starting in [start, end)."""
+        window_start = parse_timestamp(start)
+        window_end = parse_timestamp(end)
+        if window_start is None or window_end is None:
+            return
+        start_ts = window_start.timestamp()
+        end_ts = window_end.timestamp()
+        tz = get_timezone(self.timezone)
+
+        parsed = []
+        for program in programs:
+            if not isinstance(program, dict):
+                continue
+            program_start = parse_timestamp(program.get("start_time"))
+            if program_start is None:
+                continue
+            program_end = parse_timestamp(program.get("end_time")) or program_start
+            key = program.get("id") or (program.get("start_time"), program.get("title"))
+            parsed.append(
+                (
+                    key,
+                    program_start.timestamp(),
+                    program_start.astimezone(tz).date(),
+                    program_end.timestamp(),
+                )
+            )
+
+        channel_id = str(channel_id)
+        with self._lock:
+            known = self._programs.setdefault(channel_id, {})
+            before = dict(known)
+            counts = self._day_counts.setdefault(channel_id, Counter())
+            # Drop programs the window replaces, and those that ended before
+            # yesterday so the engine does not grow without bound
+            cutoff = datetime.now(tz).date() - timedelta(days=1)
+            for key in [
+                k
+                for k, item in known.items()
+                if start_ts <= item[0] < end_ts or item[1] < cutoff
+            ]:
+                counts[known.pop(key)[1]] -= 1
+            for key, program_start, day, program_end in parsed:
+                previous = known.get(key)
+                if previous is not None:
+                    counts[previous[1]] -= 1
+                known[key] = (program_start, day, program_end)
+                counts[day] += 1
+            for day in [day for day, count in counts.items() if count <= 0]:
+                del counts[day]
+            if known != before or not self.has_data:
+                self._touch()
+
+    def update_aliases(self, records: Iterable[Dict]):
+        """Replace the alias counts with those of the given alias records."""
+        aliases = Counter(
+            str(record["channel_id"])
+            for record in records
+            if record.get("channel_id") is not None
+        )
+        with self._lock:
+            if aliases != self._aliases:
+                self._aliases = aliases
+                self._touch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics, recomputed only when something changed."""
+        today = datetime.now(get_timezone(self.timezone)).date()
+        with self._lock:
+            cached = self._cached
+            if cached is not None and cached[0] == self._version and cached[1] == today:
+                stats = dict(cached[2])
+            else:
+                stats = self._compute(today)
+                self._cached = (self._version, today, stats)
+                stats = dict(stats)
+            if self._updated_at is not None:
+                stats["as_of"] = self._updated_at.isoformat()
+        return stats
+
+    def _compute(self, today: date) -> Dict[str, Any]:
+        providers: Dict[str, Dict[str, int]] = {}
+        for channel_id, provider in self._channels.items():
+            if provider is None:
+                continue
+            entry = providers.setdefault(provider, {"channels": 0, "programs_today": 0})
+            entry["channels"] += 1
+            entry["programs_today"] += self._day_counts.get(channel_id, {}).get(
+                today, 0
+            )
+
+        programs_today = 0
+        channels_today = 0
+        for counts in self._day_counts.values():
+            count = counts.get(today, 0)
+            programs_today += count
+            channels_today += 1 if count else 0
+
+        starts: List[float] = []
+        ends: List[float] = []
+        days = set()
+        for known in self._programs.values():
+            for program_start, day, program_end in known.values():
+                starts.append(program_start)
+                ends.append(program_end)
+                days.add(day)
+
+        total_channels = len(self._channels)
+        tz = get_timezone(self.timezone)
+        with_aliases = sum(
+            1 for channel_id in self._aliases if channel_id in self._channels
+        )
+        return {
+            "total_channels": total_channels,
+            "total_programs": len(starts),
+            "programs_today": programs_today,
+            "channels_with_programs_today": channels_today,
+            "total_providers": len(providers),
+            "providers": providers,
+            "total_aliases": sum(self._aliases.values()),
+            "channels_with_aliases": with_aliases,
+            "alias_coverage": (
+                round(100.0 * with_aliases / total_channels, 1)
+                if total_channels
+                else 0.0
+            ),
+            "earliest_program": (
+                datetime.fromtimestamp(min(starts), tz).isoformat() if starts else None
+            ),
+            "latest_program": (
+                datetime.fromtimestamp(max(ends), tz).isoformat() if ends else None
+            ),
+            "days_covered": len(days),
+            "source": "ui",
+        }
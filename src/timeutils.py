@@ -0,0 +1,116 @@
+"""
+Timestamp parsing and timezone conversion shared by templates and API routes.
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import pytz
+
+DEFAULT_TIMEZONE = "Europe/Berlin"
+
+GERMAN_WEEKDAYS = (
+    "Montag",
+    "Dienstag",
+    "Mittwoch",
+    "Donnerstag",
+    "Freitag",
+    "Samstag",
+    "Sonntag",
+)
+GERMAN_MONTHS = (
+    "Januar",
+    "Februar",
+    "März",
+    "April",
+    "Mai",
+    "Juni",
+    "Juli",
+    "August",
+    "September",
+    "Oktober",
+    "November",
+    "Dezember",
+)
+
+
+@lru_cache(maxsize=65536)
+def _parse_iso(value: str) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp into an aware UTC datetime (naive means UTC).
+
+    Results for strings are memoized, as program batches repeat the same
+    start and end times across channels.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, str) and value:
+        return _parse_iso(value)
+    return None
+
+
+@lru_cache(maxsize=32)
+def get_timezone(name: Optional[str]):
+    """Return the pytz timezone for name, falling back to UTC if unknown."""
+    try:
+        return pytz.timezone(name or DEFAULT_TIMEZONE)
+    except pytz.UnknownTimeZoneError:
+        return pytz.utc
+
+
+def to_local(value: Any, tz_name: Optional[str]) -> Optional[datetime]:
+    """Parse value and convert it to the given timezone."""
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        return None
+    return parsed.astimezone(get_timezone(tz_name))
+
+
+def format_local_date(value: datetime) -> str:
+    """Format a date like "Montag, 1. Januar 2024"."""
+    return (
+        f"{GERMAN_WEEKDAYS[value.weekday()]}, {value.day}. "
+        f"{GERMAN_MONTHS[value.month - 1]} {value.year}"
+    )
+
+
+def localize_programs(programs: List[Dict], tz_name: Optional[str]) -> List[Dict]:
+    """Add start_time_local, end_time_local and date_local to each program.
+
+    Conversions are shared across the batch, so identical timestamps are
+    only converted and formatted once.
+    """
+    tz = get_timezone(tz_name)
+    times: Dict[datetime, str] = {}
+    dates: Dict[datetime, str] = {}
+
+    def local_time(parsed: datetime) -> str:
+        text = times.get(parsed)
+        if text is None:
+            text = times[parsed] = parsed.astimezone(tz).strftime("%H:%M")
+        return text
+
+    for program in programs:
+        start = parse_timestamp(program.get("start_time"))
+        end = parse_timestamp(program.get("end_time"))
+        if start is not None:
+            program["start_time_local"] = local_time(start)
+            date_text = dates.get(start)
+            if date_text is None:
+                date_text = dates[start] = format_local_date(start.astimezone(tz))
+            program["date_local"] = date_text
+        if end is not None:
+            program["end_time_local"] = local_time(end)
+    return programs
@@ -0,0 +1,120 @@
+"""
+Per-request timing of upstream calls, caches, rendering and serialization.
+"""
+
+import contextvars
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_TOKEN = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+# Server-Timing entries beyond this many distinct ones are folded into "other"
+MAX_ENTRIES = 30
+
+_current: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "request_trace", default=None
+)
+
+
+class RequestTrace:
+    """Timings collected while one request is handled.
+
+    Timings with the same name and description are added up, so a batch
+    of 50 program requests shows up as one entry with a call count. The
+    trace id comes from the incoming ``traceparent`` header, if valid, and
+    is passed on to upstream calls.
+    """
+
+    def __init__(self, traceparent: Optional[str] = None):
+        match = _TRACEPARENT.match((traceparent or "").strip().lower())
+        if match and match.group(1) != "0" * 32:
+            self.trace_id = match.group(1)
+            self.flags = match.group(3)
+        else:
+            self.trace_id = secrets.token_hex(16)
+            self.flags = "01"
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        # (name, description) -> [total seconds, count]
+        self._timings: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, name: str, seconds: float, description: str = ""):
+        key = (name, description)
+        with self._lock:
+            timing = self._timings.setdefault(key, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += 1
+
+    def traceparent(self) -> str:
+        """Header value for an outgoing call, with a fresh span id."""
+        return f"00-{self.trace_id}-{secrets.token_hex(8)}-{self.flags}"
+
+    def server_timing(self) -> str:
+        """Render the timings as a Server-Timing header value."""
+        with self._lock:
+            timings = sorted(self._timings.items(), key=lambda item: -item[1][0])
+        entries = []
+        other = [0.0, 0]
+        for index, ((name, description), (seconds, count)) in enumerate(timings):
+            if index >= MAX_ENTRIES:
+                other[0] += seconds
+                other[1] += count
+                continue
+            if count > 1:
+                description = f"{description} x{count}".strip()
+            entries.append(_entry(name, seconds, description))
+        if other[1]:
+            entries.append(_entry("other", other[0], f"x{other[1]}"))
+        entries.append(
+            _entry(
+                "total", time.perf_counter() - self.started, f"trace {self.trace_id}"
+            )
+        )
+        return ", ".join(entries)
+
+
+def _entry(name: str, seconds: float, description: str) -> str:
+    entry = f"{_TOKEN.sub('-', name) or 'span'};dur={seconds * 1000:.1f}"
+    if description:
+        escaped = description.replace("\\", "\\\\").replace('"', '\\"')
+        entry += f';desc="{escaped}"'
+    return entry
+
+
+def start_trace(traceparent: Optional[str] = None) -> contextvars.Token:
+    """Make a new trace current; pass the result to end_trace()."""
+    return _current.set(RequestTrace(traceparent))
+
+
+def end_trace(token: contextvars.Token):
+    _current.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+def record(name: str, seconds: float, description: str = ""):
+    """Add a timing to the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.record(name, seconds, description)
+
+
+@contextmanager
+def span(name: str, description: str = "") -> Iterator[None]:
+    """Time the enclosed block into the current trace, if any."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(name, time.perf_counter() - started, description)
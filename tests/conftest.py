@@ -1,5 +1,8 @@
+import atexit
 import os
+import shutil
 import sys
+import tempfile
 from contextlib import contextmanager
 from unittest.mock import Mock, patch
 
@@ -9,6 +12,14 @@ from flask import template_rendered
 # Add src to path (if needed for other imports)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
 
+# src.app builds its Config when first imported, before any patch applies:
+# point it at a copy so POST /config does not rewrite config/config.yaml
+_CONFIG_DIR = tempfile.mkdtemp(prefix="ultimate-ui-tests-")
+atexit.register(shutil.rmtree, _CONFIG_DIR, ignore_errors=True)
+os.environ["ULTIMATE_UI_CONFIG"] = shutil.copy(
+    os.path.join(os.path.dirname(__file__), "../config/config.yaml"), _CONFIG_DIR
+)
+
 # Global mocks storage
 _GLOBAL_MOCKS = {
     "config": None,
@@ -84,6 +95,7 @@ def mock_config_for_app_import():
             mock_webepg = Mock()
             mock_webepg.get_channels = Mock(return_value=[])
             mock_webepg.get_channel_programs = Mock(return_value=[])
+            mock_webepg.fetch_channel_programs = Mock(return_value=[])
             mock_webepg.create_channel_alias = Mock(
                 return_value={"id": "alias1", "status": "created"}
             )
@@ -108,6 +120,13 @@ def mock_config_for_app_import():
             mock_webepg.trigger_import = Mock(
                 return_value={"status": "started", "import_id": "123"}
             )
+            mock_webepg.get_circuit_state = Mock(
+                return_value={
+                    "name": "webepg",
+                    "state": "closed",
+                    "since": "2024-01-01T00:00:00+00:00",
+                }
+            )
             MockGetWebEPG.return_value = mock_webepg
             _GLOBAL_MOCKS["webepg"] = mock_webepg
             _GLOBAL_MOCKS["get_webepg_client"] = MockGetWebEPG
@@ -126,6 +145,15 @@ def mock_config_for_app_import():
                         {"id": "ultimate_channel2", "name": "Ultimate Channel 2"},
                     ]
                 )
+                mock_ultimate.get_all_channels = Mock(return_value={})
+                mock_ultimate.get_cache_stats = Mock(return_value={})
+                mock_ultimate.get_circuit_state = Mock(
+                    return_value={
+                        "name": "ultimate_backend",
+                        "state": "closed",
+                        "since": "2024-01-01T00:00:00+00:00",
+                    }
+                )
                 MockGetUltimate.return_value = mock_ultimate
                 _GLOBAL_MOCKS["ultimate"] = mock_ultimate
                 _GLOBAL_MOCKS["get_ultimate_backend_client"] = MockGetUltimate
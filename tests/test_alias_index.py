@@ -0,0 +1,118 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.alias_index import AliasIndex, alias_records
+
+ALIASES = {
+    "aliases": [
+        {"id": 1, "alias": "ARD HD", "channel_id": 10, "alias_type": "custom"},
+        {"id": 2, "alias": "das_erste", "channel_id": 10, "alias_type": "auto"},
+        {"id": 3, "alias": "ZDF", "channel_id": 20, "alias_type": "custom"},
+    ]
+}
+
+
+class TestAliasRecords:
+    """Test alias_records function."""
+
+    def test_plain_mapping(self):
+        """Test an alias -> channel id mapping."""
+        records = alias_records({"ard": 10, "zdf": {"channel_id": 20, "id": 3}})
+        assert records == [
+            {"alias": "ard", "channel_id": "10"},
+            {"alias": "zdf", "channel_id": "20", "id": 3},
+        ]
+
+    def test_wrapped_list_skips_incomplete_records(self):
+        """Test that records without alias or channel are dropped."""
+        records = alias_records(
+            {"mapping": [{"alias": "ard", "channel_identifier": "ard.de"}, {"id": 1}]}
+        )
+        assert records == [
+            {"alias": "ard", "channel_identifier": "ard.de", "channel_id": "ard.de"}
+        ]
+
+    def test_unknown_payload(self):
+        assert alias_records(None) == []
+
+
+class TestAliasIndex:
+    """Test AliasIndex class."""
+
+    @pytest.fixture
+    def loader(self):
+        return Mock(return_value=ALIASES)
+
+    def test_resolve(self, loader):
+        """Test exact and case-insensitive lookups."""
+        index = AliasIndex(loader)
+
+        assert index.resolve("ZDF")["channel_id"] == "20"
+        assert index.resolve("ard hd")["alias"] == "ARD HD"
+        assert index.resolve("missing") is None
+        assert index.resolve_many(["ZDF", "nope"])["nope"] is None
+        loader.assert_called_once()
+
+    def test_aliases_for_channel(self, loader):
+        index = AliasIndex(loader)
+        aliases = {record["alias"] for record in index.aliases_for(10)}
+        assert aliases == {"ARD HD", "das_erste"}
+
+    def test_add_and_remove_patch_the_index(self, loader):
+        """Test that writes are applied without reloading."""
+        index = AliasIndex(loader)
+        index.ensure_loaded()
+
+        index.add({"id": 4, "alias": "zdf_hd", "channel_id": 20})
+        assert index.resolve("zdf_hd")["channel_id"] == "20"
+
+        assert index.remove_id(1) is True
+        assert index.resolve("ARD HD") is None
+        assert index.remove_id(99) is False
+        loader.assert_called_once()
+
+    def test_add_moves_alias_to_new_channel(self, loader):
+        index = AliasIndex(loader)
+        index.ensure_loaded()
+
+        index.add({"id": 3, "alias": "ZDF", "channel_id": 30})
+
+        assert index.aliases_for(20) == []
+        assert index.resolve("ZDF")["channel_id"] == "30"
+
+    def test_add_before_load_is_ignored(self, loader):
+        """Test that an unloaded index picks the alias up from the loader."""
+        index = AliasIndex(loader)
+        index.add({"id": 4, "alias": "zdf_hd", "channel_id": 20})
+        assert index.loaded is False
+
+    def test_reloads_after_ttl(self, loader, monkeypatch):
+        index = AliasIndex(loader, ttl=60)
+        clock = [1000.0]
+        monkeypatch.setattr("src.alias_index.time.monotonic", lambda: clock[0])
+
+        index.resolve("ZDF")
+        clock[0] += 30
+        index.resolve("ZDF")
+        assert loader.call_count == 1
+
+        clock[0] += 31
+        index.resolve("ZDF")
+        assert loader.call_count == 2
+
+    def test_invalidate_forces_reload(self, loader):
+        index = AliasIndex(loader)
+        index.ensure_loaded()
+        index.invalidate()
+        index.ensure_loaded()
+        assert loader.call_count == 2
+
+    def test_statistics(self, loader):
+        stats = AliasIndex(loader).statistics()
+        assert stats == {
+            "total_aliases": 3,
+            "channels_with_aliases": 2,
+            "average_aliases_per_channel": 1.5,
+            "aliases_by_type": {"custom": 2, "auto": 1},
+        }
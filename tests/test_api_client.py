@@ -4,7 +4,7 @@ import pytest
 import requests
 import requests_mock
 
-from api_client import UltimateBackendClient, WebEPGClient
+from src.api_client import UltimateBackendClient, WebEPGClient
 
 
 class TestWebEPGClient:
@@ -61,6 +61,43 @@ class TestWebEPGClient:
 
         assert result == []
 
+    def test_get_channels_cached(self, mock_adapter, sample_channels):
+        """Test that the channel list is served from cache within the TTL."""
+        client = WebEPGClient(base_url="http://test-webepg:8080", cache_ttl=60)
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels",
+            json=sample_channels,
+            status_code=200,
+        )
+
+        client.get_channels()
+        result = client.get_channels()
+
+        assert len(result) == 2
+        assert mock_adapter.call_count == 1
+        stats = client.get_cache_stats()["channels"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_get_channels_revalidates_with_etag(
+        self, client, mock_adapter, sample_channels
+    ):
+        """Test that a 304 from webepg is answered from the stored body."""
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels",
+            [
+                {"json": sample_channels, "headers": {"ETag": '"v1"'}},
+                {"status_code": 304},
+            ],
+        )
+
+        client.get_channels()
+        result = client.get_channels()
+
+        assert result == sample_channels
+        assert mock_adapter.last_request.headers["If-None-Match"] == '"v1"'
+        assert client.get_cache_stats()["revalidation"]["not_modified"] == 1
+
     def test_get_channel_success(self, client, mock_adapter, sample_channels):
         """Test getting specific channel successfully."""
         channel = sample_channels[0]
@@ -112,6 +149,43 @@ class TestWebEPGClient:
 
         assert result == []
 
+    def test_fetch_channel_programs_raises(self, client, mock_adapter):
+        """Test that the strict variant raises instead of returning []."""
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels/channel1/programs", status_code=500
+        )
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.fetch_channel_programs("channel1", "2024-01-01", "2024-01-02")
+
+    def test_fetch_channel_programs_cached(self, mock_adapter):
+        """Test that overlapping program windows reuse cached buckets."""
+        client = WebEPGClient(base_url="http://test-webepg:8080", program_cache_ttl=300)
+        programs = [
+            {
+                "id": "p1",
+                "title": "News",
+                "start_time": "2024-01-01T10:00:00Z",
+                "end_time": "2024-01-01T11:00:00Z",
+            }
+        ]
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels/channel1/programs",
+            json=programs,
+            status_code=200,
+        )
+
+        first = client.fetch_channel_programs(
+            "channel1", "2024-01-01T09:30:00Z", "2024-01-01T11:55:00Z"
+        )
+        second = client.fetch_channel_programs(
+            "channel1", "2024-01-01T09:30:05Z", "2024-01-01T11:55:05Z"
+        )
+
+        assert mock_adapter.call_count == 1
+        assert first == second
+        assert first[0]["title"] == "News"
+
     def test_get_providers_success(self, client, mock_adapter):
         """Test getting providers successfully."""
         providers = [{"id": "provider1", "name": "Test Provider"}]
@@ -230,6 +304,83 @@ class TestWebEPGClient:
         assert "total_channels" in result
         assert result["total_channels"] == 2
 
+    def test_get_statistics_fallback_uses_fetched_data(
+        self, client, mock_adapter, sample_channels, sample_programs
+    ):
+        """Test that the fallback counts loaded programs without new requests."""
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels",
+            json=sample_channels,
+            status_code=200,
+        )
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels/channel1/programs",
+            json=sample_programs,
+            status_code=200,
+        )
+        mock_adapter.get("http://test-webepg:8080/api/v1/statistics", status_code=503)
+        client.get_channels()
+        client.get_channel_programs(
+            "channel1", "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z"
+        )
+        requests_before = mock_adapter.call_count
+
+        result = client.get_statistics()
+
+        assert mock_adapter.call_count == requests_before + 1
+        assert result["total_programs"] == len(sample_programs)
+        assert result["earliest_program"] is not None
+        assert "as_of" in result
+
+    def test_upstream_metrics(self, mock_adapter):
+        """Test that upstream latency and errors are recorded per endpoint."""
+        from src.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry()
+        client = WebEPGClient(base_url="http://test-webepg:8080", metrics=metrics)
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/channels/ard/programs", json=[]
+        )
+        mock_adapter.get(
+            "http://test-webepg:8080/api/v1/import/status",
+            exc=requests.exceptions.Timeout,
+        )
+
+        client.fetch_channel_programs(
+            "ard", "2024-01-01T00:00:00Z", "2024-01-01T06:00:00Z"
+        )
+        client.get_import_status()
+
+        text = metrics.render()
+        assert (
+            'upstream_request_duration_seconds_count{endpoint="/api/v1/channels/{id}'
+            '/programs",method="GET",upstream="webepg"} 1'
+        ) in text
+        assert (
+            'upstream_errors_total{endpoint="/api/v1/import/status",reason="timeout",'
+            'upstream="webepg"} 1'
+        ) in text
+
+    def test_upstream_calls_are_traced(self, client, mock_adapter):
+        """Test traceparent propagation and Server-Timing entries."""
+        from src import tracing
+
+        mock_adapter.get("http://test-webepg:8080/api/v1/channels", json=[])
+
+        token = tracing.start_trace(
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        )
+        try:
+            client.get_channels()
+            header = tracing.current_trace().server_timing()
+        finally:
+            tracing.end_trace(token)
+
+        sent = mock_adapter.last_request.headers["traceparent"]
+        assert sent.startswith("00-4bf92f3577b34da6a3ce929d0e0e4736-")
+        assert "webepg;dur=" in header
+        assert 'desc="GET /api/v1/channels miss"' in header
+
 
 class TestUltimateBackendClient:
     """Test UltimateBackendClient class."""
@@ -308,3 +459,57 @@ class TestUltimateBackendClient:
         assert "provider2" in result
         assert len(result["provider1"]["channels"]) == 2
         assert len(result["provider2"]["channels"]) == 1
+
+    def test_get_all_channels_records_failed_providers(
+        self, client, mock_adapter, sample_providers, sample_channels
+    ):
+        """Test that a failing provider is reported without losing the others."""
+        mock_adapter.get(
+            "http://test-ultimate:3000/api/providers",
+            json=sample_providers,
+            status_code=200,
+        )
+        mock_adapter.get(
+            "http://test-ultimate:3000/api/providers/provider1/channels",
+            json=sample_channels,
+            status_code=200,
+        )
+        mock_adapter.get(
+            "http://test-ultimate:3000/api/providers/provider2/channels",
+            exc=requests.exceptions.ConnectTimeout,
+        )
+
+        result = client.get_all_channels()
+
+        assert len(result["provider1"]["channels"]) == 2
+        assert "error" not in result["provider1"]
+        assert result["provider2"]["channels"] == []
+        assert result["provider2"]["error"]
+
+    def test_get_all_channels_runs_concurrently(self, sample_providers):
+        """Test that provider lineups are fetched in parallel."""
+        import threading
+        import time
+        from unittest.mock import patch
+
+        client = UltimateBackendClient(
+            base_url="http://test-ultimate:3000", max_concurrency=4
+        )
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fetch(provider_id, timeout=None):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return []
+
+        with patch.object(client, "get_providers", return_value=sample_providers):
+            with patch.object(client, "fetch_provider_channels", side_effect=fetch):
+                result = client.get_all_channels()
+
+        assert set(result) == {"provider1", "provider2"}
+        assert active["peak"] == 2
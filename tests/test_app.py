@@ -3,6 +3,8 @@ import os
 import sys
 from datetime import datetime
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
@@ -34,6 +36,29 @@ class TestAppRoutes:
         response = client.get("/epg")
         assert response.status_code == 200
 
+    def test_epg_display_loads_programs_per_channel(
+        self, app, client, mock_get_webepg_client, sample_channels, sample_programs
+    ):
+        """Test that the initial EPG render attaches programs to each channel."""
+        from tests.conftest import captured_templates
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = sample_channels
+        mock_client.get_channel_programs.return_value = sample_programs
+
+        with captured_templates(app) as templates:
+            response = client.get("/epg")
+
+        assert response.status_code == 200
+        channels = templates[0][1]["channels"]
+        assert len(channels) == 2
+        assert all(len(channel["programs"]) == 2 for channel in channels)
+        assert not any(channel["programs_loading"] for channel in channels)
+        assert mock_client.get_channel_programs.call_count == 2
+        # The cached channel list itself must not be modified
+        assert "programs" not in sample_channels[0]
+
     def test_epg_display_error_handling(self, client, mock_get_webepg_client):
         """Test EPG display error handling."""
         mock_client = mock_get_webepg_client.return_value
@@ -167,6 +192,69 @@ class TestAppRoutes:
         assert response_data["page"] == 0
         assert response_data["limit"] == 20
 
+    def test_api_get_channels_cursor(self, client, mock_get_webepg_client):
+        """Test following next_cursor through the channel list."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = [
+            {"id": i, "name": f"Channel {i}"} for i in range(1, 6)
+        ]
+
+        first = json.loads(client.get("/api/epg/channels?limit=3").data)
+        assert [c["id"] for c in first["channels"]] == [1, 2, 3]
+        assert first["next_cursor"]
+
+        second = json.loads(
+            client.get(f"/api/epg/channels?limit=3&cursor={first['next_cursor']}").data
+        )
+        assert [c["id"] for c in second["channels"]] == [4, 5]
+        assert second["has_more"] is False
+        assert second["next_cursor"] is None
+
+    def test_api_get_channels_etag(self, client, mock_get_webepg_client):
+        """Test that an unchanged channel page is answered with 304."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = [{"id": 1, "name": "Channel 1"}]
+
+        first = client.get("/api/epg/channels?limit=3")
+        etag = first.headers["ETag"]
+
+        second = client.get(
+            "/api/epg/channels?limit=3", headers={"If-None-Match": etag}
+        )
+        assert second.status_code == 304
+        assert second.data == b""
+
+        other_page = client.get(
+            "/api/epg/channels?limit=5", headers={"If-None-Match": etag}
+        )
+        assert other_page.status_code == 200
+
+    def test_api_mapping_providers_etag(
+        self, client, mock_get_ultimate_backend_client, sample_providers
+    ):
+        """Test content-hash ETags on mapping endpoints."""
+        mock_client = mock_get_ultimate_backend_client.return_value
+        mock_client.get_providers.return_value = sample_providers
+
+        first = client.get("/api/mapping/providers")
+        second = client.get(
+            "/api/mapping/providers", headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+
+    def test_api_get_channels_invalid_cursor(self, client, mock_get_webepg_client):
+        """Test that an invalid cursor is rejected."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = []
+
+        response = client.get("/api/epg/channels?cursor=garbage")
+        assert response.status_code == 400
+
     def test_api_get_channel_programs(
         self, client, mock_get_webepg_client, sample_programs
     ):
@@ -188,6 +276,8 @@ class TestAppRoutes:
         assert "channel_id" in response_data
         assert isinstance(response_data["programs"], list)
         assert len(response_data["programs"]) == 2
+        assert response_data["programs"][0]["start_time_local"]
+        assert response_data["programs"][0]["date_local"]
 
     def test_api_get_channel_programs_with_defaults(
         self, client, mock_get_webepg_client, sample_programs
@@ -204,6 +294,84 @@ class TestAppRoutes:
         assert response_data["success"] is True
         assert "programs" in response_data
 
+    def test_api_get_programs_batch(
+        self, client, mock_get_webepg_client, sample_programs
+    ):
+        """Test fetching programs for several channels in one request."""
+        mock_client = mock_get_webepg_client.return_value
+
+        def fetch(channel_id, start, end):
+            if channel_id == "broken":
+                raise Exception("Upstream error")
+            return sample_programs
+
+        mock_client.fetch_channel_programs.side_effect = fetch
+
+        response = client.get(
+            "/api/epg/programs?channels=channel1,channel2,broken"
+            "&start=2024-01-01T00:00:00Z&end=2024-01-02T00:00:00Z"
+        )
+
+        assert response.status_code == 200
+        response_data = json.loads(response.data)
+        assert response_data["success"] is True
+        assert set(response_data["programs"]) == {"channel1", "channel2"}
+        assert len(response_data["programs"]["channel1"]) == 2
+        assert "broken" in response_data["errors"]
+        assert mock_client.fetch_channel_programs.call_count == 3
+
+    def test_program_batches_fit_batch_endpoint(
+        self, client, mock_get_webepg_client, sample_programs
+    ):
+        """Test that the EPG page splits long channel lists into valid batches."""
+        import shutil
+        import subprocess
+        from pathlib import Path
+
+        if shutil.which("node") is None:
+            pytest.skip("node is not installed")
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.fetch_channel_programs.side_effect = None
+        mock_client.fetch_channel_programs.return_value = sample_programs
+
+        # Run EPGCore.fetchProgramsForChannels with a fetch that records URLs
+        script = Path(__file__).parent.parent / "src/static/js/epg_core.js"
+        driver = (
+            script.read_text()
+            + """
+            const urls = [];
+            globalThis.fetch = async (url) => {
+                urls.push(url);
+                const ids = new URL(url, 'http://x').searchParams.get('channels');
+                const programs = {};
+                ids.split(',').forEach(id => { programs[id] = []; });
+                return { ok: true, json: async () => ({ success: true, programs }) };
+            };
+            const ids = Array.from({ length: 250 }, (_, i) => i + 1);
+            new EPGCore()
+                .fetchProgramsForChannels(ids, new Date(), new Date())
+                .then(result => console.log(JSON.stringify({ urls, size: result.size })));
+            """
+        )
+        result = subprocess.run(
+            ["node", "-e", driver], capture_output=True, text=True, check=True
+        )
+        output = json.loads(result.stdout)
+
+        assert output["size"] == 250
+        assert len(output["urls"]) == 3
+        for url in output["urls"]:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert json.loads(response.data)["success"] is True
+        assert mock_client.fetch_channel_programs.call_count == 250
+
+    def test_api_get_programs_batch_requires_channels(self, client):
+        """Test that the batch endpoint rejects an empty channel list."""
+        response = client.get("/api/epg/programs")
+        assert response.status_code == 400
+
     def test_api_create_alias_success(self, client, mock_get_webepg_client):
         """Test API endpoint for creating alias successfully."""
         mock_client = mock_get_webepg_client.return_value
@@ -254,6 +422,61 @@ class TestAppRoutes:
         response_data = json.loads(response.data)
         assert response_data["success"] is True
 
+    def test_api_get_all_provider_channels(
+        self, client, mock_get_ultimate_backend_client, sample_providers
+    ):
+        """Test API endpoint for loading every provider's channels at once."""
+        mock_client = mock_get_ultimate_backend_client.return_value
+        mock_client.get_all_channels.return_value = {
+            "provider1": {"provider_info": sample_providers[0], "channels": [{}]},
+            "provider2": {
+                "provider_info": sample_providers[1],
+                "channels": [],
+                "error": "Timed out",
+            },
+        }
+        response = client.get("/api/mapping/channels")
+        assert response.status_code == 200
+        response_data = json.loads(response.data)
+        assert response_data["success"] is True
+        assert response_data["failed"] == ["provider2"]
+
+    def test_api_mapping_suggestions(self, client, mock_get_webepg_client):
+        """Test server-side fuzzy suggestions for streaming channels."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = [
+            {"id": "ard.de", "display_name": "Das Erste"},
+            {"id": "zdf.de", "display_name": "ZDF"},
+        ]
+
+        response = client.post(
+            "/api/mapping/suggestions",
+            data=json.dumps(
+                {
+                    "channels": [
+                        {"id": "s1", "name": "ZDF HD"},
+                        {"id": "s2", "name": "Nothing Alike"},
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        response_data = json.loads(response.data)
+        assert response_data["suggestions"]["s1"][0]["epg_id"] == "zdf.de"
+        assert response_data["suggestions"]["s2"] == []
+
+    def test_api_mapping_suggestions_requires_channels(self, client):
+        """Test that a request without channels is rejected."""
+        response = client.post(
+            "/api/mapping/suggestions",
+            data=json.dumps({}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+
     def test_api_create_alias_missing_fields(self, client):
         """Test API endpoint for creating alias with missing fields."""
         data = {"channel_identifier": "channel1"}
@@ -277,6 +500,448 @@ class TestAppRoutes:
         response_data = json.loads(response.data)
         assert response_data["success"] is True
 
+    def test_monitoring_status_served_from_snapshot(
+        self, client, mock_get_webepg_client, monkeypatch
+    ):
+        """Test that viewers share one collection and can revalidate it."""
+        monkeypatch.setattr("src.app._monitoring_aggregator", None)
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_import_status.reset_mock()
+        mock_client.get_import_status.return_value = {"last_import": "today"}
+        mock_client.get_statistics.return_value = {"total_channels": 3}
+        mock_client.get_health.return_value = True
+
+        try:
+            first = client.get("/api/monitoring/status")
+            second = client.get(
+                "/api/monitoring/status",
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+            client.get("/monitoring")
+        finally:
+            from src.app import get_monitoring_aggregator
+
+            get_monitoring_aggregator().stop()
+
+        data = json.loads(first.data)
+        assert data["import_status"]["recent_imports"] == []
+        assert data["statistics"]["total_channels"] == 3
+        assert second.status_code == 304
+        assert mock_client.get_import_status.call_count == 1
+
+    def test_monitoring_stream(self, client, mock_get_webepg_client, monkeypatch):
+        """Test that the SSE stream starts with a snapshot and frees its slot."""
+        import threading
+
+        monkeypatch.setattr("src.app._monitoring_aggregator", None)
+        monkeypatch.setattr("src.app._stream_slots", threading.BoundedSemaphore(1))
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_import_status.return_value = {"recent_imports": []}
+        mock_client.get_statistics.return_value = {}
+        mock_client.get_health.return_value = True
+
+        response = client.get("/api/monitoring/stream", buffered=False)
+        try:
+            assert response.mimetype == "text/event-stream"
+            assert "Content-Encoding" not in response.headers
+            chunks = iter(response.response)
+            assert next(chunks).startswith(b"retry:")
+            assert b"event: snapshot" in next(chunks)
+
+            busy = client.get("/api/monitoring/stream")
+            assert busy.status_code == 503
+        finally:
+            response.close()
+            from src.app import get_monitoring_aggregator
+
+            get_monitoring_aggregator().stop()
+
+        from src.app import get_stream_slots
+
+        assert get_stream_slots().acquire(blocking=False)
+
+    def test_monitoring_stream_disabled_under_gthread(self, client, monkeypatch):
+        """Test that pages poll instead of parking a thread per stream."""
+        monkeypatch.setattr("src.app._stream_slots", None)
+
+        busy = client.get("/api/monitoring/stream")
+        assert busy.status_code == 503
+        page = client.get("/epg")
+        assert b'<meta name="status-stream" content="off">' in page.data
+
+        monkeypatch.setattr("src.app._cooperative_io", lambda: True)
+        page = client.get("/epg")
+        assert b'<meta name="status-stream" content="on">' in page.data
+
+    def test_api_get_stats(
+        self, client, mock_get_webepg_client, mock_get_ultimate_backend_client
+    ):
+        """Test API endpoint for internal performance counters."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_cache_stats.return_value = {
+            "channels": {"hits": 3, "misses": 1}
+        }
+        mock_ultimate = mock_get_ultimate_backend_client.return_value
+        mock_ultimate.get_cache_stats.return_value = {
+            "coalescing": {"calls": 2, "coalesced": 5}
+        }
+        response = client.get("/api/stats")
+        assert response.status_code == 200
+        response_data = json.loads(response.data)
+        assert response_data["success"] is True
+        assert response_data["cache"]["channels"]["hits"] == 3
+        assert response_data["ultimate_backend"]["coalescing"]["coalesced"] == 5
+
+    def test_api_aliases_streamed_passthrough(self, client, mock_get_webepg_client):
+        """Test that alias lists are streamed through without re-encoding."""
+        import gzip
+
+        import requests_mock
+
+        from src.api_client import WebEPGClient
+
+        body = gzip.compress(b'[{"alias": "ard_hd", "channel_id": 1}]')
+        real_client = WebEPGClient(base_url="http://test-webepg:8080")
+        with requests_mock.Mocker() as m:
+            m.get(
+                "http://test-webepg:8080/api/v1/aliases",
+                content=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "gzip",
+                    "ETag": '"abc"',
+                    "X-Internal": "secret",
+                },
+            )
+            upstream = real_client.open_stream("/api/v1/aliases")
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.open_stream.return_value = upstream
+
+        response = client.get(
+            "/api/aliases",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": '"old"'},
+        )
+
+        assert response.status_code == 200
+        assert response.data == body
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["ETag"] == '"abc"'
+        assert "X-Internal" not in response.headers
+        _, kwargs = mock_client.open_stream.call_args
+        assert kwargs["headers"]["Accept-Encoding"] == "gzip"
+        assert kwargs["headers"]["If-None-Match"] == '"old"'
+
+    def test_api_alias_mapping_passthrough_keeps_status(
+        self, client, mock_get_webepg_client
+    ):
+        """Test that upstream error statuses are passed through."""
+        from unittest.mock import Mock
+
+        upstream = Mock()
+        upstream.status_code = 404
+        upstream.headers = {"Content-Type": "application/json"}
+        upstream.raw.stream.return_value = iter([b'{"error": "not found"}'])
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.open_stream.return_value = upstream
+
+        response = client.get("/api/aliases/mapping")
+
+        assert response.status_code == 404
+        assert json.loads(response.data) == {"error": "not found"}
+        upstream.close.assert_called_once()
+
+    def test_metrics_endpoint(self, client, monkeypatch):
+        """Test that route and template metrics are exposed in text format."""
+        from src.app import _define_request_metrics
+        from src.metrics import MetricsRegistry
+
+        monkeypatch.setattr(
+            "src.app.metrics", _define_request_metrics(MetricsRegistry())
+        )
+
+        client.get("/health")
+        client.get("/epg")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        text = response.data.decode()
+        assert (
+            'http_requests_total{method="GET",route="/health",status="200"} 1' in text
+        )
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/epg"} 1' in text
+        )
+        assert (
+            'template_render_duration_seconds_count{template="epg_display.html"}'
+            in text
+        )
+        assert 'http_requests_in_flight{route="/health"} 0' in text
+
+    def test_server_timing_header(self, client):
+        """Test that responses break their time down in Server-Timing."""
+        response = client.get(
+            "/epg",
+            headers={
+                "traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+            },
+        )
+        header = response.headers["Server-Timing"]
+        assert "render;dur=" in header
+        assert 'desc="epg_display.html"' in header
+        assert 'desc="trace 4bf92f3577b34da6a3ce929d0e0e4736"' in header
+
+        response = client.get("/health")
+        assert response.headers["Server-Timing"].startswith("json;dur=")
+
+    def test_profiled_request_and_admin_endpoints(self, client, monkeypatch, tmp_path):
+        """Test profiling a page and listing / downloading the profile."""
+        from src.app import app
+        from src.profiling import RequestProfiler
+
+        profiler = RequestProfiler(str(tmp_path), "secret")
+        monkeypatch.setattr(app.wsgi_app, "get_profiler", lambda: profiler)
+        monkeypatch.setattr("src.app.get_profiler", lambda: profiler)
+
+        # Buffered, so the body is closed and the profile saved
+        response = client.get(
+            "/epg", headers={"X-Profile-Token": "secret"}, buffered=True
+        )
+        name = response.headers["X-Profile-Id"]
+
+        response = client.get("/api/admin/profiles?token=wrong")
+        assert response.status_code == 403
+        response = client.get(
+            "/api/admin/profiles", headers={"X-Profile-Token": "secret"}
+        )
+        assert json.loads(response.data)["profiles"][0]["name"] == name
+        response = client.get(f"/api/admin/profiles/{name}.collapsed?token=secret")
+        assert response.status_code == 200
+        assert b"render_template" in response.data
+
+    def test_profiles_disabled(self, client):
+        """Test that the admin endpoints are hidden while profiling is off."""
+        response = client.get("/api/admin/profiles?token=secret")
+        assert response.status_code == 404
+
+    def test_api_passthrough_circuit_open(self, client, mock_get_webepg_client):
+        """Test that an open circuit answers 503 with Retry-After."""
+        from src.circuit_breaker import CircuitOpenError
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.open_stream.side_effect = CircuitOpenError("webepg", 12.4)
+
+        response = client.get("/api/aliases")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "12"
+        assert json.loads(response.data)["circuit_open"] == "webepg"
+        mock_client.open_stream.side_effect = None
+
+    def test_api_resolve_aliases(self, client, mock_get_webepg_client, monkeypatch):
+        """Test single and batch alias resolution from the alias index."""
+        monkeypatch.setattr("src.app._alias_index", None)
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.fetch_alias_mapping.return_value = {"ard_hd": 1, "zdf": 2}
+
+        response = client.get("/api/aliases/resolve?alias=ard_hd")
+        assert json.loads(response.data)["resolved"]["ard_hd"]["channel_id"] == "1"
+
+        response = client.post(
+            "/api/aliases/resolve",
+            data=json.dumps({"aliases": ["zdf", "unknown"]}),
+            content_type="application/json",
+        )
+        resolved = json.loads(response.data)["resolved"]
+        assert resolved["zdf"]["channel_id"] == "2"
+        assert resolved["unknown"] is None
+        assert mock_client.fetch_alias_mapping.call_count == 1
+
+        response = client.get("/api/aliases/resolve?alias=ard_hd&alias=zdf")
+        again = client.get(
+            "/api/aliases/resolve?alias=ard_hd&alias=zdf",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert again.status_code == 304
+
+        response = client.post(
+            "/api/aliases/resolve",
+            data=json.dumps({"aliases": "zdf"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+
+    def test_api_channel_aliases_from_index(
+        self, client, mock_get_webepg_client, monkeypatch
+    ):
+        """Test that channel aliases and statistics come from the alias index."""
+        monkeypatch.setattr("src.app._alias_index", None)
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.fetch_alias_mapping.return_value = [
+            {"id": 1, "alias": "ard_hd", "channel_id": 1, "alias_type": "ultimate"},
+            {"id": 2, "alias": "ard", "channel_id": 1, "alias_type": "xmltv"},
+            {"id": 3, "alias": "zdf", "channel_id": 2, "alias_type": "xmltv"},
+        ]
+
+        response = client.get("/api/channels/1/aliases")
+        aliases = sorted(json.loads(response.data), key=lambda a: a["id"])
+        assert aliases == [
+            {"id": 1, "alias": "ard_hd", "channel_id": 1, "alias_type": "ultimate"},
+            {"id": 2, "alias": "ard", "channel_id": 1, "alias_type": "xmltv"},
+        ]
+
+        response = client.get("/api/aliases/statistics")
+        assert json.loads(response.data)["channels_with_aliases"] == 2
+        again = client.get(
+            "/api/aliases/statistics",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert again.status_code == 304
+
+        mock_client.open_stream.assert_not_called()
+        assert mock_client.fetch_alias_mapping.call_count == 1
+
+    def test_api_channel_aliases_proxied_on_index_miss(
+        self, client, mock_get_webepg_client, monkeypatch
+    ):
+        """Test that names and ids unknown to the alias index go to WebEPG."""
+        from unittest.mock import Mock
+
+        monkeypatch.setattr("src.app._alias_index", None)
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.fetch_alias_mapping.return_value = [
+            {"id": 1, "alias": "ard_hd", "channel_id": 1},
+        ]
+
+        def open_stream(path, params=None, headers=None):
+            upstream = Mock()
+            upstream.status_code = 200
+            upstream.headers = {"Content-Type": "application/json"}
+            upstream.raw.stream.return_value = iter([b'[{"id": 1, "alias": "x"}]'])
+            return upstream
+
+        monkeypatch.setattr(mock_client, "open_stream", Mock(side_effect=open_stream))
+
+        for identifier in ("ard.de", "9"):
+            response = client.get(f"/api/channels/{identifier}/aliases")
+            assert json.loads(response.data) == [{"id": 1, "alias": "x"}]
+            path = mock_client.open_stream.call_args[0][0]
+            assert path == f"/api/v1/channels/{identifier}/aliases"
+
+        # A bare alias -> channel mapping lacks the alias details
+        monkeypatch.setattr("src.app._alias_index", None)
+        mock_client.fetch_alias_mapping.return_value = {"ard_hd": 1}
+        client.get("/api/channels/1/aliases")
+        assert mock_client.open_stream.call_count == 3
+
+    def test_alias_writes_patch_alias_index(
+        self, client, mock_get_webepg_client, monkeypatch
+    ):
+        """Test that created and deleted aliases are reflected immediately."""
+        from src.app import get_alias_index
+
+        monkeypatch.setattr("src.app._alias_index", None)
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.fetch_alias_mapping.return_value = {"aliases": []}
+        mock_client.base_url = "http://test-webepg:8080"
+        mock_client.create_channel_alias.return_value = {
+            "id": 7,
+            "alias": "ard_hd",
+            "channel_id": 1,
+        }
+        get_alias_index().ensure_loaded()
+
+        client.post(
+            "/api/mapping/create-alias",
+            data=json.dumps({"channel_identifier": "ard.de", "alias": "ard_hd"}),
+            content_type="application/json",
+        )
+        response = client.get("/api/aliases/statistics")
+        assert json.loads(response.data)["total_aliases"] == 1
+
+        response = client.delete("/api/aliases/7")
+        assert response.status_code == 204
+        assert get_alias_index().resolve("ard_hd") is None
+        assert mock_client.fetch_alias_mapping.call_count == 1
+
+    def test_api_response_compressed(self, client, mock_get_webepg_client):
+        """Test that large JSON API responses are gzip-compressed."""
+        import gzip
+
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = [
+            {"id": i, "name": f"Channel {i}"} for i in range(200)
+        ]
+
+        response = client.get("/api/channels", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(response.data))) == 200
+
+    def test_compressed_response_revalidates(self, client, mock_get_webepg_client):
+        """Test that the weak ETag of a compressed page is answered with 304."""
+        mock_client = mock_get_webepg_client.return_value
+        mock_client.get_channels.side_effect = None
+        mock_client.get_channels.return_value = [
+            {"id": i, "name": f"Channel {i}"} for i in range(200)
+        ]
+        headers = {"Accept-Encoding": "gzip"}
+
+        first = client.get("/api/epg/channels?limit=100", headers=headers)
+        assert first.headers["Content-Encoding"] == "gzip"
+        etag = first.headers["ETag"]
+        assert etag.startswith("W/")
+
+        second = client.get(
+            "/api/epg/channels?limit=100", headers={**headers, "If-None-Match": etag}
+        )
+        assert second.status_code == 304
+        # Answered before the page was serialized
+        assert "json;" not in second.headers["Server-Timing"]
+
+    def test_static_precompressed_variant(self, client, tmp_path, monkeypatch):
+        """Test that serve_static prefers a precompressed file."""
+        import gzip
+
+        (tmp_path / "app.js").write_text("console.log('x');")
+        (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('x');"))
+        monkeypatch.setattr("src.app.STATIC_DIR", str(tmp_path))
+
+        response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/static/app.js")
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "javascript" in response.headers["Content-Type"]
+        assert gzip.decompress(response.data) == b"console.log('x');"
+        assert plain.data == b"console.log('x');"
+        assert "Content-Encoding" not in plain.headers
+
+    def test_static_fingerprinted_asset_is_immutable(
+        self, client, tmp_path, monkeypatch
+    ):
+        """Test that hashed assets get long-lived immutable cache headers."""
+        from src.assets import AssetManifest, build_manifest
+
+        (tmp_path / "app.js").write_text("console.log('x');")
+        hashed = build_manifest(str(tmp_path))["app.js"]
+        monkeypatch.setattr("src.app.STATIC_DIR", str(tmp_path))
+        monkeypatch.setattr("src.app.asset_manifest", AssetManifest(str(tmp_path)))
+
+        response = client.get(f"/static/{hashed}")
+        plain = client.get("/static/app.js")
+
+        assert response.cache_control.immutable is True
+        assert response.cache_control.max_age == 365 * 24 * 3600
+        assert not plain.cache_control.immutable
+
+        from src.app import app, asset_url
+
+        with app.test_request_context():
+            assert asset_url("app.js") == f"/static/{hashed}"
+
     def test_static_file_serving(self, client):
         """Test static file serving."""
         response = client.get("/static/css/style.css")
@@ -351,3 +1016,4 @@ class TestContextProcessor:
             assert "current_year" in context
             assert "current_time" in context
             assert "config_path" in context
+            assert "status_stream_enabled" in context
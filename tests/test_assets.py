@@ -0,0 +1,72 @@
+import json
+import os
+
+from src.assets import AssetManifest, build_manifest, hashed_name
+
+
+def test_hashed_name():
+    """Test that the digest goes before the extension."""
+    assert hashed_name("css/base.css", "abc") == "css/base.abc.css"
+
+
+class TestAssetManifest:
+    """Test building and resolving the asset manifest."""
+
+    def test_build_and_resolve(self, tmp_path):
+        """Test that assets resolve to their hashed copies."""
+        (tmp_path / "css").mkdir()
+        (tmp_path / "css" / "base.css").write_text("body{}")
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        manifest = build_manifest(str(tmp_path))
+
+        hashed = manifest["css/base.css"]
+        assert hashed.startswith("css/base.") and hashed.endswith(".css")
+        assert (tmp_path / hashed).read_text() == "body{}"
+        assert "notes.txt" not in manifest
+
+        assets = AssetManifest(str(tmp_path))
+        assert assets.resolve("css/base.css") == hashed
+        assert assets.resolve("js/unknown.js") == "js/unknown.js"
+        assert assets.is_fingerprinted(hashed)
+        assert not assets.is_fingerprinted("css/base.css")
+
+    def test_rebuild_removes_outdated_copies(self, tmp_path):
+        """Test that a changed asset replaces its old hashed copy."""
+        (tmp_path / "app.js").write_text("one")
+        old = build_manifest(str(tmp_path))["app.js"]
+
+        (tmp_path / "app.js").write_text("two")
+        new = build_manifest(str(tmp_path))["app.js"]
+
+        assert new != old
+        assert not (tmp_path / old).exists()
+        assert (tmp_path / new).exists()
+
+    def test_rebuild_removes_outdated_compressed_variants(self, tmp_path):
+        """Test that .gz/.br copies of an outdated hashed file go with it."""
+        (tmp_path / "app.js").write_text("one")
+        old = build_manifest(str(tmp_path))["app.js"]
+        (tmp_path / f"{old}.gz").write_bytes(b"gz")
+        (tmp_path / f"{old}.br").write_bytes(b"br")
+        (tmp_path / "app.js.gz").write_bytes(b"gz")
+
+        (tmp_path / "app.js").write_text("two")
+        new = build_manifest(str(tmp_path))["app.js"]
+        (tmp_path / f"{new}.gz").write_bytes(b"gz")
+        build_manifest(str(tmp_path))
+
+        assert not (tmp_path / f"{old}.gz").exists()
+        assert not (tmp_path / f"{old}.br").exists()
+        assert (tmp_path / f"{new}.gz").exists()
+        assert (tmp_path / "app.js.gz").exists()
+
+    def test_manifest_is_reloaded(self, tmp_path):
+        """Test that a rewritten manifest is picked up."""
+        assets = AssetManifest(str(tmp_path))
+        assert assets.resolve("app.js") == "app.js"
+
+        (tmp_path / "manifest.json").write_text(json.dumps({"app.js": "app.1.js"}))
+        os.utime(tmp_path / "manifest.json", (1, 1))
+
+        assert assets.resolve("app.js") == "app.1.js"
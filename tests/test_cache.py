@@ -0,0 +1,81 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test TTLCache class."""
+
+    def test_fresh_entry_is_served_from_cache(self):
+        """Test that a fresh entry does not call the loader again."""
+        cache = TTLCache(ttl=60)
+        loader = Mock(return_value=[1, 2, 3])
+
+        assert cache.get_or_load("key", loader) == [1, 2, 3]
+        assert cache.get_or_load("key", loader) == [1, 2, 3]
+
+        assert loader.call_count == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_disabled_cache_always_loads(self):
+        """Test that a TTL of 0 disables caching."""
+        cache = TTLCache(ttl=0)
+        loader = Mock(return_value="value")
+
+        cache.get_or_load("key", loader)
+        cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        """Test stale-while-revalidate behaviour."""
+        cache = TTLCache(ttl=0.01, stale_ttl=60)
+        loader = Mock(side_effect=["old", "new"])
+
+        assert cache.get_or_load("key", loader) == "old"
+        time.sleep(0.02)
+
+        assert cache.get_or_load("key", loader) == "old"
+
+        for _ in range(100):
+            if cache.peek("key") == "new":
+                break
+            time.sleep(0.01)
+        assert cache.peek("key") == "new"
+        assert cache.stats()["stale_hits"] == 1
+        assert cache.stats()["refreshes"] == 1
+
+    def test_stale_entry_is_served_on_load_error(self):
+        """Test that an expired entry is served when the reload fails."""
+        cache = TTLCache(ttl=0.01)
+        loader = Mock(side_effect=["cached", RuntimeError("upstream down")])
+
+        cache.get_or_load("key", loader)
+        time.sleep(0.02)
+
+        assert cache.get_or_load("key", loader) == "cached"
+        assert cache.stats()["stale_on_error"] == 1
+
+    def test_load_error_without_entry_is_raised(self):
+        """Test that errors propagate when nothing is cached."""
+        cache = TTLCache(ttl=60)
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("key", Mock(side_effect=RuntimeError("boom")))
+
+    def test_invalidate(self):
+        """Test invalidating cached entries."""
+        cache = TTLCache(ttl=60)
+        loader = Mock(return_value="value")
+
+        cache.get_or_load("key", loader)
+        cache.invalidate()
+        cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
@@ -0,0 +1,89 @@
+import pytest
+
+from src.channel_index import ChannelIndex, decode_cursor, encode_cursor
+
+
+def make_channels(count):
+    return [{"id": i, "name": f"Channel {i}"} for i in range(count, 0, -1)]
+
+
+class TestChannelIndex:
+    """Test ChannelIndex class."""
+
+    def test_first_page_is_sorted(self):
+        """Test that channels are returned in stable id order."""
+        index = ChannelIndex(lambda: make_channels(5))
+
+        result = index.page(limit=3)
+
+        assert [c["id"] for c in result["channels"]] == [1, 2, 3]
+        assert result["has_more"] is True
+        assert result["total"] == 5
+        assert result["next_cursor"]
+
+    def test_cursor_walks_all_channels(self):
+        """Test that following cursors yields every channel exactly once."""
+        index = ChannelIndex(lambda: make_channels(7))
+
+        seen = []
+        cursor = None
+        while True:
+            result = index.page(cursor=cursor, limit=3)
+            seen.extend(c["id"] for c in result["channels"])
+            cursor = result["next_cursor"]
+            if not result["has_more"]:
+                break
+
+        assert seen == list(range(1, 8))
+        assert cursor is None
+
+    def test_cursor_survives_snapshot_refresh(self):
+        """Test that a cursor resumes after its last channel in a new snapshot."""
+        channels = {"list": make_channels(6)}
+        index = ChannelIndex(lambda: channels["list"])
+
+        first = index.page(limit=3)
+        # Channel 2 disappears and a new channel 10 appears.
+        channels["list"] = [c for c in make_channels(6) if c["id"] != 2] + [
+            {"id": 10, "name": "New"}
+        ]
+        second = index.page(cursor=first["next_cursor"], limit=3)
+
+        assert [c["id"] for c in second["channels"]] == [4, 5, 6]
+        assert second["version"] != first["version"]
+
+    def test_unchanged_content_keeps_version(self):
+        """Test that refetching identical data keeps the snapshot version."""
+        index = ChannelIndex(lambda: make_channels(3))
+
+        assert index.page()["version"] == index.page()["version"]
+
+    def test_offset_paging(self):
+        """Test legacy offset paging."""
+        index = ChannelIndex(lambda: make_channels(5))
+
+        result = index.page(limit=2, offset=4)
+
+        assert [c["id"] for c in result["channels"]] == [5]
+        assert result["has_more"] is False
+
+    def test_mixed_id_types(self):
+        """Test ordering of numeric and string ids."""
+        index = ChannelIndex(
+            lambda: [{"id": "b"}, {"id": "10"}, {"id": 2}, {"id": "a"}]
+        )
+
+        ids = [c["id"] for c in index.page(limit=10)["channels"]]
+
+        assert ids == [2, "10", "a", "b"]
+
+    def test_cursor_round_trip(self):
+        """Test cursor encoding and decoding."""
+        cursor = encode_cursor("abc", (1, 0, "channel1"))
+
+        assert decode_cursor(cursor) == ("abc", (1, 0, "channel1"))
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor raises ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
@@ -0,0 +1,131 @@
+import pytest
+import requests
+import requests_mock
+
+from src.circuit_breaker import CircuitBreaker, CircuitBreakerSession, CircuitOpenError
+
+URL = "http://upstream/api/items"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker class."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_opens_after_threshold(self, clock):
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker("test", failure_threshold=2, clock=clock)
+
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_request()
+        assert exc_info.value.name == "test"
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self, clock):
+        """Test that only consecutive failures count."""
+        breaker = CircuitBreaker("test", failure_threshold=2, clock=clock)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_admits_single_probe(self, clock):
+        """Test that one probe is let through after the recovery timeout."""
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, recovery_timeout=10, clock=clock
+        )
+        breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_request()
+
+    def test_failed_probe_doubles_wait(self, clock):
+        """Test that a failed probe reopens the circuit for longer."""
+        breaker = CircuitBreaker(
+            "test",
+            failure_threshold=1,
+            recovery_timeout=10,
+            max_recovery_timeout=15,
+            clock=clock,
+        )
+        breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["retry_in"] == 15
+
+        clock.now = 24
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        clock.now = 25
+        breaker.before_request()
+
+    def test_zero_threshold_disables(self, clock):
+        """Test that a threshold of 0 never opens the circuit."""
+        breaker = CircuitBreaker("test", failure_threshold=0, clock=clock)
+
+        for _ in range(10):
+            breaker.record_failure()
+            breaker.before_request()
+
+        assert breaker.summary()["state"] == "disabled"
+
+
+class TestCircuitBreakerSession:
+    """Test CircuitBreakerSession class."""
+
+    def test_unavailable_statuses_open_circuit(self):
+        """Test that 503 responses count as failures and other errors do not."""
+        session = CircuitBreakerSession(CircuitBreaker("test", failure_threshold=2))
+        with requests_mock.Mocker() as m:
+            m.get(
+                URL, [{"status_code": 404}, {"status_code": 503}, {"status_code": 503}]
+            )
+
+            session.get(URL)
+            session.get(URL)
+            session.get(URL)
+
+            with pytest.raises(CircuitOpenError):
+                session.get(URL)
+            assert m.call_count == 3
+
+    def test_connection_errors_open_circuit(self):
+        """Test that the rejection is itself a connection error."""
+        session = CircuitBreakerSession(CircuitBreaker("test", failure_threshold=1))
+        with requests_mock.Mocker() as m:
+            m.get(URL, exc=requests.exceptions.ConnectionError)
+
+            with pytest.raises(requests.exceptions.ConnectionError):
+                session.get(URL)
+            with pytest.raises(requests.exceptions.ConnectionError):
+                session.get(URL)
+
+            assert m.call_count == 1
+        assert session.circuit_breaker.stats()["opened"] == 1
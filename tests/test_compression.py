@@ -0,0 +1,97 @@
+import gzip
+import os
+
+from flask import Response
+from werkzeug.datastructures import Accept
+
+from src.compression import (
+    CompressionStats,
+    choose_encoding,
+    compress_response,
+    precompress_directory,
+    precompressed_variant,
+)
+
+
+def accept(*encodings):
+    return Accept([(encoding, 1) for encoding in encodings])
+
+
+def test_choose_encoding():
+    """Test negotiation of the content encoding."""
+    assert choose_encoding(accept("gzip", "br")) == "br"
+    assert choose_encoding(accept("gzip")) == "gzip"
+    assert choose_encoding(accept()) is None
+
+
+class TestCompressResponse:
+    """Test compress_response."""
+
+    def test_large_body_is_compressed(self):
+        """Test that bodies above the threshold are compressed."""
+        body = b'{"items": [' + b'"x",' * 1000 + b'"x"]}'
+        response = Response(body, mimetype="application/json")
+        response.set_etag("abc")
+        stats = CompressionStats()
+
+        compress_response(response, accept("gzip"), stats, min_size=100)
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.get_data()) == body
+        assert response.get_etag() == ("abc", True)
+        assert "Accept-Encoding" in response.vary
+        assert stats.stats()["compressed"] == 1
+        assert stats.stats()["ratio"] < 0.5
+
+    def test_small_body_is_skipped(self):
+        """Test that tiny payloads are sent uncompressed."""
+        response = Response(b"{}", mimetype="application/json")
+        stats = CompressionStats()
+
+        compress_response(response, accept("gzip"), stats, min_size=100)
+
+        assert "Content-Encoding" not in response.headers
+        assert stats.stats()["skipped_small"] == 1
+
+    def test_streamed_response_is_untouched(self):
+        """Test that streamed responses are left alone."""
+        response = Response(iter([b"x" * 5000]), mimetype="application/json")
+
+        compress_response(response, accept("gzip"), CompressionStats(), min_size=1)
+
+        assert "Content-Encoding" not in response.headers
+
+
+class TestPrecompress:
+    """Test precompression of static assets."""
+
+    def test_precompress_directory(self, tmp_path):
+        """Test that compressible files get a .gz next to them."""
+        (tmp_path / "app.js").write_text("console.log('x');\n" * 200)
+        (tmp_path / "tiny.css").write_text("a{}")
+        (tmp_path / "image.png").write_bytes(b"\x89PNG" * 1000)
+
+        summary = precompress_directory(str(tmp_path), encodings=["gzip"])
+
+        assert summary["files"] == 1
+        assert (tmp_path / "app.js.gz").exists()
+        assert not (tmp_path / "tiny.css.gz").exists()
+        assert not (tmp_path / "image.png.gz").exists()
+
+        again = precompress_directory(str(tmp_path), encodings=["gzip"])
+        assert again["written"] == 0
+
+    def test_stale_variant_is_ignored(self, tmp_path):
+        """Test that an outdated .gz is not served."""
+        (tmp_path / "app.js").write_text("new")
+        (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"old"))
+        os.utime(tmp_path / "app.js.gz", (0, 0))
+
+        assert precompressed_variant(str(tmp_path), "app.js", accept("gzip")) is None
+
+        os.utime(tmp_path / "app.js.gz", None)
+        assert precompressed_variant(str(tmp_path), "app.js", accept("gzip")) == (
+            "gzip",
+            "app.js.gz",
+        )
+        assert precompressed_variant(str(tmp_path), "app.js", accept()) is None
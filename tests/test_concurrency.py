@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.concurrency import fan_out
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+class TestFanOut:
+    """Test fan_out function."""
+
+    def test_collects_results(self, executor):
+        """Test that every key gets its result."""
+        outcome = fan_out(lambda key: key * 2, [1, 2, 3], executor, timeout=5)
+
+        assert outcome.results == {1: 2, 2: 4, 3: 6}
+        assert outcome.complete
+
+    def test_runs_concurrently(self, executor):
+        """Test that calls overlap instead of running one after another."""
+        started = time.monotonic()
+        fan_out(lambda key: time.sleep(0.1), range(4), executor, timeout=5)
+
+        assert time.monotonic() - started < 0.35
+
+    def test_errors_are_reported_per_key(self, executor):
+        """Test that one failing call does not affect the others."""
+
+        def call(key):
+            if key == "bad":
+                raise RuntimeError("upstream error")
+            return key
+
+        outcome = fan_out(call, ["good", "bad"], executor, timeout=5)
+
+        assert outcome.results == {"good": "good"}
+        assert isinstance(outcome.errors["bad"], RuntimeError)
+        assert not outcome.complete
+
+    def test_deadline(self, executor):
+        """Test that slow calls are reported as timed out."""
+        release = threading.Event()
+
+        def call(key):
+            if key == "slow":
+                release.wait(5)
+            return key
+
+        started = time.monotonic()
+        outcome = fan_out(call, ["fast", "slow"], executor, timeout=0.1)
+        release.set()
+
+        assert time.monotonic() - started < 1
+        assert outcome.results == {"fast": "fast"}
+        assert outcome.timed_out == {"slow"}
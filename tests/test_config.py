@@ -19,6 +19,10 @@ class TestConfig:
         assert config.get("ultimate_backend.url") == "http://localhost:3000"
         assert config.get("ui.theme") == "dark"
         assert config.get("player.default_size") == "medium"
+        assert config.get("cache.enabled") is True
+        assert config.get("cache.ttl") == 60
+        assert config.get("compression.enabled") is True
+        assert config.get("compression.min_size") == 1024
 
     def test_load_yaml(self):
         """Test loading configuration from YAML file."""
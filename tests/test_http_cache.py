@@ -0,0 +1,139 @@
+import pytest
+import requests
+import requests_mock
+
+from src.circuit_breaker import CircuitBreaker, CircuitBreakerSession
+from src.http_cache import ValidatorCache
+
+URL = "http://upstream/api/items"
+
+
+class TestValidatorCache:
+    """Test ValidatorCache class."""
+
+    @pytest.fixture
+    def session(self):
+        return requests.Session()
+
+    def test_not_modified_returns_stored_body(self, session):
+        """Test that a 304 returns the body of the earlier response."""
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(
+                URL,
+                [
+                    {
+                        "json": [{"id": 1}],
+                        "headers": {"ETag": '"a"', "Last-Modified": "yesterday"},
+                    },
+                    {"status_code": 304},
+                ],
+            )
+
+            cache.get_json(session, URL)
+            result = cache.get_json(session, URL)
+
+            assert result == [{"id": 1}]
+            assert m.last_request.headers["If-None-Match"] == '"a"'
+            assert m.last_request.headers["If-Modified-Since"] == "yesterday"
+        assert cache.stats()["not_modified"] == 1
+
+    def test_returned_bodies_are_copies(self, session):
+        """Test that modifying a result leaves the stored body intact."""
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(
+                URL,
+                [
+                    {"json": [{"id": 1}], "headers": {"ETag": '"a"'}},
+                    {"status_code": 304},
+                ],
+            )
+
+            cache.get_json(session, URL)[0]["id"] = 2
+
+            assert cache.get_json(session, URL) == [{"id": 1}]
+
+    def test_responses_without_validators_are_not_stored(self, session):
+        """Test that plain responses send no conditional headers later."""
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(URL, json=[])
+
+            cache.get_json(session, URL)
+            cache.get_json(session, URL)
+
+            assert "If-None-Match" not in m.last_request.headers
+        assert cache.stats()["entries"] == 0
+
+    def test_params_are_part_of_the_key(self, session):
+        """Test that different queries keep separate validators."""
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(URL, json=[], headers={"ETag": '"a"'})
+
+            cache.get_json(session, URL, params={"start": "1"})
+            cache.get_json(session, URL, params={"start": "2"})
+
+            assert "If-None-Match" not in m.last_request.headers
+
+    def test_http_errors_raise(self, session):
+        """Test that error statuses raise."""
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(URL, status_code=500)
+
+            with pytest.raises(requests.exceptions.HTTPError):
+                cache.get_json(session, URL)
+
+    def test_stored_body_served_while_circuit_open(self):
+        """Test that an open circuit falls back to the last stored body."""
+        session = CircuitBreakerSession(CircuitBreaker("test", failure_threshold=1))
+        cache = ValidatorCache()
+        with requests_mock.Mocker() as m:
+            m.get(
+                URL,
+                [
+                    {"json": [{"id": 1}], "headers": {"ETag": '"a"'}},
+                    {"status_code": 503},
+                ],
+            )
+
+            cache.get_json(session, URL)
+            with pytest.raises(requests.exceptions.HTTPError):
+                cache.get_json(session, URL)
+
+            assert cache.get_json(session, URL) == [{"id": 1}]
+            assert m.call_count == 2
+        assert cache.stats()["stale_on_open"] == 1
+
+    def test_concurrent_requests_are_coalesced(self, session):
+        """Test that identical concurrent GETs share one upstream request."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        cache = ValidatorCache(flight=flight)
+        release = threading.Event()
+
+        def slow_body(request, context):
+            release.wait(5)
+            return [{"id": 1}]
+
+        with requests_mock.Mocker() as m:
+            m.get(URL, json=slow_body)
+
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futures = [pool.submit(cache.get_json, session, URL) for _ in range(3)]
+                for _ in range(500):
+                    if flight.stats()["coalesced"] == 2:
+                        break
+                    release.wait(0.01)
+                release.set()
+                results = [future.result(timeout=5) for future in futures]
+
+            assert m.call_count == 1
+        assert results == [[{"id": 1}]] * 3
+        assert results[0][0] is not results[1][0]
@@ -0,0 +1,148 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_session import PooledAdapter, mount_adapter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        server = self.server
+        server.requests.append((self.command, self.headers.get("Connection")))
+        if server.delay:
+            time.sleep(server.delay)
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.statuses = []
+    httpd.delay = 0
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _session(**kwargs):
+    adapter = PooledAdapter(backoff_factor=0, backoff_jitter=0, **kwargs)
+    return mount_adapter(requests.Session(), adapter), adapter
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+class TestPooledAdapter:
+    """Test PooledAdapter class."""
+
+    def test_connections_are_reused(self, server):
+        """Test that sequential requests share one kept-alive connection."""
+        session, adapter = _session()
+
+        for _ in range(3):
+            session.get(_url(server), timeout=5)
+
+        (pool,) = adapter.stats()["pools"]
+        assert pool["connections_created"] == 1
+        assert pool["requests"] == 3
+        assert pool["idle"] == 1
+
+    def test_keep_alive_disabled(self, server):
+        """Test that disabling keep-alive asks the upstream to close."""
+        session, adapter = _session(keep_alive=False)
+
+        session.get(_url(server), timeout=5)
+        session.get(_url(server), timeout=5)
+
+        assert [connection for _, connection in server.requests] == ["close"] * 2
+        assert adapter.stats()["keep_alive"] is False
+
+    def test_concurrent_requests_fill_pool(self, server):
+        """Test that concurrent callers get connections of their own."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        session, adapter = _session(pool_maxsize=4)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: session.get(_url(server), timeout=5), range(8)))
+
+        (stats,) = adapter.stats()["pools"]
+        assert stats["maxsize"] == 4
+        assert stats["connections_created"] <= 4
+        assert stats["requests"] == 8
+
+    def test_idempotent_requests_retry_unavailable(self, server):
+        """Test that GETs are retried on 503 and the retries are counted."""
+        session, adapter = _session(retries=2)
+        server.statuses = [503, 503]
+
+        response = session.get(_url(server), timeout=5)
+
+        assert response.status_code == 200
+        assert len(server.requests) == 3
+        assert adapter.stats()["retried"] == 2
+
+    def test_retries_exhausted_return_last_response(self, server):
+        """Test that the last upstream status is returned once retries run out."""
+        session, _ = _session(retries=1)
+        server.statuses = [503, 503, 503]
+
+        response = session.get(_url(server), timeout=5)
+
+        assert response.status_code == 503
+        assert len(server.requests) == 2
+
+    def test_posts_are_not_retried(self, server):
+        """Test that non-idempotent requests are sent only once."""
+        session, adapter = _session(retries=2)
+        server.statuses = [503]
+
+        response = session.post(_url(server), json={}, timeout=5)
+
+        assert response.status_code == 503
+        assert len(server.requests) == 1
+        assert adapter.stats()["retried"] == 0
+
+    def test_connection_errors_are_retried(self):
+        """Test that refused connections are retried before failing."""
+        session, adapter = _session(retries=2)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get("http://127.0.0.1:9/api", timeout=1)
+
+        assert adapter.stats()["retried"] == 2
+
+    def test_read_timeouts_are_not_retried(self, server):
+        """Test that a request the upstream is still working on is not resent."""
+        session, adapter = _session(retries=2)
+        server.delay = 0.5
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            session.get(_url(server), timeout=0.1)
+
+        assert len(server.requests) == 1
+        assert adapter.stats()["retried"] == 0
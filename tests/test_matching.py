@@ -0,0 +1,135 @@
+import pytest
+
+from src.matching import ChannelMatcher, MatchIndex, ngrams, normalize_name
+
+EPG_CHANNELS = [
+    {"id": "ard.de", "display_name": "Das Erste", "name": "ard.de"},
+    {"id": "zdf.de", "display_name": "ZDF", "name": "zdf.de"},
+    {"id": "prosieben.de", "display_name": "ProSieben"},
+    {"id": "prosiebenmaxx.de", "display_name": "ProSieben MAXX"},
+    {"id": "rtl2.de", "display_name": "RTL II"},
+]
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Das Erste HD", "das erste"),
+        ("ProSieben HD (DE)", "prosieben"),
+        ("ORF III Österreich", "orf 3"),
+        ("ard.de", "ard"),
+        ("Sky Sport 1 UHD", "sky sport 1"),
+        ("DE", "de"),
+        (None, ""),
+    ],
+)
+def test_normalize_name(name, expected):
+    """Test name normalisation."""
+    assert normalize_name(name) == expected
+
+
+def test_ngrams():
+    """Test padded trigram extraction."""
+    assert ngrams("ab") == {" ab", "ab "}
+    assert ngrams("") == set()
+
+
+class TestMatchIndex:
+    """Test MatchIndex class."""
+
+    def test_exact_normalised_match_scores_100(self):
+        """Test that names equal after normalisation are a perfect match."""
+        index = MatchIndex(EPG_CHANNELS)
+
+        results = index.suggest("Das Erste HD")
+
+        assert results[0] == {
+            "epg_id": "ard.de",
+            "display_name": "Das Erste",
+            "name": "ard.de",
+            "score": 100,
+        }
+
+    def test_ranking_and_limit(self):
+        """Test that results are ranked and limited."""
+        index = MatchIndex(EPG_CHANNELS)
+
+        results = index.suggest("Pro Sieben Maxx HD", limit=2, min_score=0)
+
+        assert [r["epg_id"] for r in results] == ["prosiebenmaxx.de", "prosieben.de"]
+
+    def test_min_score_filters(self):
+        """Test that weak matches are dropped."""
+        index = MatchIndex(EPG_CHANNELS)
+
+        assert index.suggest("Completely Different") == []
+
+    def test_roman_numerals(self):
+        """Test that roman numerals match digits."""
+        index = MatchIndex(EPG_CHANNELS)
+
+        assert index.suggest("RTL 2")[0]["epg_id"] == "rtl2.de"
+
+
+class TestChannelMatcher:
+    """Test ChannelMatcher class."""
+
+    def test_index_is_cached_per_version(self):
+        """Test that the index is only rebuilt for a new snapshot version."""
+        matcher = ChannelMatcher(processes=0)
+
+        first = matcher.index_for(EPG_CHANNELS, "v1")
+        assert matcher.index_for(EPG_CHANNELS, "v1") is first
+        assert matcher.index_for(EPG_CHANNELS, "v2") is not first
+
+    def test_process_pool_matches_inline(self):
+        """Test that pooled scoring returns the same results as inline."""
+        names = {str(i): name for i, name in enumerate(["ZDF HD", "Das Erste", "x"])}
+        pooled = ChannelMatcher(processes=2, pool_threshold=1)
+        try:
+            result = pooled.suggest(EPG_CHANNELS, "v1", names)
+        finally:
+            pooled.close()
+
+        inline = ChannelMatcher(processes=0).suggest(EPG_CHANNELS, "v1", names)
+        assert result == inline
+        assert result["0"][0]["epg_id"] == "zdf.de"
+        assert result["2"] == []
+
+    def test_concurrent_requests_share_one_pool(self, monkeypatch):
+        """Test that concurrent batches create a single, non-forked pool."""
+        import threading
+
+        import src.matching
+
+        created = []
+
+        class CountingPool(src.matching.ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                created.append(kwargs["mp_context"].get_start_method())
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(src.matching, "ProcessPoolExecutor", CountingPool)
+        matcher = ChannelMatcher(processes=2, pool_threshold=1)
+        names = {"0": "ZDF HD", "1": "Das Erste"}
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    matcher.suggest(EPG_CHANNELS, "v1", names)
+                )
+            )
+            for _ in range(4)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            matcher.close()
+
+        assert len(results) == 4
+        assert all(result["0"][0]["epg_id"] == "zdf.de" for result in results)
+        assert len(created) == 1
+        assert created[0] != "fork"
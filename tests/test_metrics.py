@@ -0,0 +1,109 @@
+import json
+import os
+
+from src.metrics import MetricsRegistry, clear_directory
+
+
+def _registry(**kwargs):
+    registry = MetricsRegistry(**kwargs)
+    registry.counter("requests_total", "Requests")
+    registry.gauge("in_flight", "Requests in flight")
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    return registry
+
+
+class TestMetricsRegistry:
+    """Test MetricsRegistry class."""
+
+    def test_counters_and_gauges(self):
+        """Test that counters and gauges are rendered per label set."""
+        registry = _registry()
+
+        registry.inc("requests_total", {"route": "/a", "status": 200})
+        registry.inc("requests_total", {"route": "/a", "status": 200})
+        registry.add("in_flight", {"route": "/a"}, 1)
+        registry.add("in_flight", {"route": "/a"}, -1)
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a",status="200"} 2' in text
+        assert 'in_flight{route="/a"} 0' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket, sum and count lines of a histogram."""
+        registry = _registry()
+
+        for value in (0.05, 0.5, 5):
+            registry.observe("latency_seconds", value, {"route": "/a"})
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 5.55' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes and backslashes in label values are escaped."""
+        registry = _registry()
+
+        registry.inc("requests_total", {"route": 'a"b\\c'})
+
+        assert 'requests_total{route="a\\"b\\\\c"} 1' in registry.render()
+
+
+class TestMetricsAcrossWorkers:
+    """Test merging of per-worker metrics files."""
+
+    def _write_worker(self, directory, pid, value):
+        state = {
+            "pid": pid,
+            "values": [
+                ["requests_total", [["route", "/a"]], value],
+                ["in_flight", [["route", "/a"]], 3],
+            ],
+            "histograms": [["latency_seconds", [["route", "/a"]], [1, 0, 0, 0.05]]],
+        }
+        with open(os.path.join(directory, f"{pid}-test.json"), "w") as f:
+            json.dump(state, f)
+
+    def test_workers_are_summed(self, tmp_path):
+        """Test that values of other live workers are added up."""
+        registry = _registry(directory=str(tmp_path))
+        self._write_worker(str(tmp_path), os.getppid(), 5)
+
+        registry.inc("requests_total", {"route": "/a"})
+        registry.observe("latency_seconds", 0.05, {"route": "/a"})
+
+        text = registry.render()
+        assert 'requests_total{route="/a"} 6' in text
+        assert 'in_flight{route="/a"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 2' in text
+
+    def test_exited_workers_keep_counters_but_not_gauges(self, tmp_path):
+        """Test that a dead worker's gauges are dropped and counters kept."""
+        registry = _registry(directory=str(tmp_path))
+        self._write_worker(str(tmp_path), 2**22 + 12345, 5)
+
+        text = registry.render()
+        assert 'requests_total{route="/a"} 5' in text
+        assert "in_flight{" not in text
+
+    def test_flush_writes_own_file(self, tmp_path):
+        """Test that updates reach the directory after the flush interval."""
+        registry = _registry(directory=str(tmp_path), flush_interval=0)
+
+        registry.inc("requests_total", {"route": "/a"})
+
+        (name,) = os.listdir(tmp_path)
+        assert name.startswith(f"{os.getpid()}-")
+        assert name.endswith(".json")
+
+    def test_clear_directory(self, tmp_path):
+        """Test that files of a previous run are removed."""
+        self._write_worker(str(tmp_path), 1, 1)
+        (tmp_path / "keep.txt").write_text("x")
+
+        clear_directory(str(tmp_path))
+
+        assert os.listdir(tmp_path) == ["keep.txt"]
@@ -0,0 +1,163 @@
+from unittest.mock import Mock
+
+from src.monitoring import (
+    MonitoringAggregator,
+    data_digest,
+    diff_events,
+    format_event,
+    imports_running,
+    latest_imports,
+)
+
+
+class TestMonitoringAggregator:
+    """Test MonitoringAggregator class."""
+
+    def test_first_snapshot_is_collected_synchronously(self):
+        collector = Mock(return_value={"webepg_health": True})
+        aggregator = MonitoringAggregator(collector, interval=3600)
+        try:
+            snapshot = aggregator.snapshot()
+            assert snapshot.data == {"webepg_health": True}
+            assert snapshot.version == 1
+
+            assert aggregator.snapshot() is snapshot
+            collector.assert_called_once()
+        finally:
+            aggregator.stop()
+
+    def test_version_only_changes_with_data(self):
+        """Test that unchanged data keeps the version and digest."""
+        collector = Mock(
+            side_effect=[
+                {"webepg_health": True},
+                {"webepg_health": True},
+                {"webepg_health": False},
+            ]
+        )
+        aggregator = MonitoringAggregator(collector)
+
+        first = aggregator.refresh()
+        second = aggregator.refresh()
+        assert second is first
+        assert second.collected_at >= first.changed_at
+
+        third = aggregator.refresh()
+        assert third.version == 2
+        assert third.digest != first.digest
+
+    def test_failed_refresh_keeps_last_snapshot(self):
+        collector = Mock(side_effect=[{"webepg_health": True}, RuntimeError("down")])
+        aggregator = MonitoringAggregator(collector)
+        aggregator.refresh()
+
+        try:
+            aggregator.refresh()
+        except RuntimeError:
+            pass
+
+        assert aggregator.snapshot().data == {"webepg_health": True}
+
+    def test_to_dict(self):
+        aggregator = MonitoringAggregator(Mock(return_value={"statistics": {}}))
+        payload = aggregator.refresh().to_dict()
+        assert payload["statistics"] == {}
+        assert payload["version"] == data_digest({"statistics": {}})
+        assert "timestamp" in payload
+
+
+class TestStreamEvents:
+    """Test Server-Sent Event helpers."""
+
+    def test_format_event(self):
+        assert format_event("health", {"webepg_health": True}, "abc") == (
+            'id: abc\nevent: health\ndata: {"webepg_health": true}\n\n'
+        )
+
+    def test_latest_imports_per_provider(self):
+        status = {
+            "recent_imports": [
+                {"provider_id": 1, "started_at": "2024-01-01T10:00:00Z"},
+                {"provider_id": 1, "started_at": "2024-01-02T10:00:00Z"},
+                {"provider_id": 2, "started_at": "2024-01-01T11:00:00Z"},
+            ]
+        }
+        latest = latest_imports(status)
+        assert latest["1"]["started_at"] == "2024-01-02T10:00:00Z"
+        assert set(latest) == {"1", "2"}
+
+    def test_diff_events_only_reports_changes(self):
+        """Test that only changed parts and providers produce events."""
+        previous = {
+            "webepg_health": True,
+            "statistics": {"total_channels": 1},
+            "import_status": {
+                "recent_imports": [
+                    {"provider_id": 1, "status": "success", "started_at": "a"},
+                    {"provider_id": 2, "status": "running", "started_at": "a"},
+                ]
+            },
+        }
+        current = {
+            "webepg_health": True,
+            "statistics": {"total_channels": 1},
+            "import_status": {
+                "recent_imports": [
+                    {"provider_id": 1, "status": "success", "started_at": "a"},
+                    {"provider_id": 2, "status": "success", "started_at": "a"},
+                ]
+            },
+        }
+
+        events = dict(diff_events(previous, current))
+
+        assert set(events) == {"import_status", "provider_progress"}
+        assert list(events["provider_progress"]["providers"]) == ["2"]
+        assert imports_running(previous) is True
+        assert imports_running(current) is False
+
+    def test_stream_sends_snapshot_then_changes(self):
+        collector = Mock(
+            side_effect=[{"webepg_health": True}, {"webepg_health": False}]
+        )
+        aggregator = MonitoringAggregator(collector, interval=3600)
+        try:
+            events = aggregator.stream(heartbeat=0.01)
+            assert next(events).startswith("retry:")
+            assert "event: snapshot" in next(events)
+            assert next(events) == ": heartbeat\n\n"
+
+            aggregator.refresh()
+            change = next(events)
+            assert "event: health" in change
+            assert f"id: {aggregator.snapshot().digest}" in change
+        finally:
+            aggregator.stop()
+
+    def test_stream_skips_snapshot_for_current_client(self):
+        """Test that a reconnect with the current Last-Event-ID gets no resend."""
+        aggregator = MonitoringAggregator(Mock(return_value={"webepg_health": True}))
+        digest = aggregator.refresh().digest
+        try:
+            events = aggregator.stream(last_event_id=digest, heartbeat=0.01)
+            next(events)
+            assert next(events) == ": heartbeat\n\n"
+        finally:
+            aggregator.stop()
+
+    def test_stream_ends_when_stopped(self):
+        aggregator = MonitoringAggregator(Mock(return_value={"webepg_health": True}))
+        events = aggregator.stream(heartbeat=0.01)
+        next(events)
+        next(events)
+        aggregator.stop()
+        assert list(events) in ([], [": heartbeat\n\n"])
+
+    def test_stream_ends_after_max_seconds(self):
+        aggregator = MonitoringAggregator(Mock(return_value={"webepg_health": True}))
+        try:
+            events = list(aggregator.stream(heartbeat=0.01, max_seconds=0.05))
+            assert events[0].startswith("retry:")
+            assert "event: snapshot" in events[1]
+        finally:
+            aggregator.stop()
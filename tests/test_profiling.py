@@ -0,0 +1,126 @@
+import cProfile
+import os
+import pstats
+
+import pytest
+
+from src.profiling import ProfilingMiddleware, RequestProfiler, collapsed_stacks
+
+TOKEN = "secret"
+
+
+def _inner():
+    return sum(range(20000))
+
+
+def _outer():
+    return _inner()
+
+
+def _wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(_outer()).encode()]
+
+
+def _call(app, path="/epg", query="", headers=None):
+    environ = {"PATH_INFO": path, "QUERY_STRING": query, "REQUEST_METHOD": "GET"}
+    environ.update(headers or {})
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        started["status"] = status
+        started["headers"] = dict(response_headers)
+
+    body = app(environ, start_response)
+    data = b"".join(body)
+    getattr(body, "close", lambda: None)()
+    return started["headers"], data
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(str(tmp_path), TOKEN, max_profiles=2)
+
+
+class TestRequestProfiler:
+    """Test RequestProfiler class."""
+
+    def test_profiles_requests_with_token(self, profiler, tmp_path):
+        """Test that a request with the token header writes both files."""
+        app = ProfilingMiddleware(_wsgi_app, lambda: profiler)
+
+        headers, data = _call(app, headers={"HTTP_X_PROFILE_TOKEN": TOKEN})
+
+        assert data == str(sum(range(20000))).encode()
+        name = headers["X-Profile-Id"]
+        assert sorted(os.listdir(tmp_path)) == [f"{name}.collapsed", f"{name}.prof"]
+        assert pstats.Stats(str(tmp_path / f"{name}.prof")).total_calls > 0
+        assert profiler.list_profiles()[0]["files"].keys() == {"prof", "collapsed"}
+
+    def test_query_flag(self, profiler):
+        """Test that the token can be passed as a query parameter."""
+        app = ProfilingMiddleware(_wsgi_app, lambda: profiler)
+
+        headers, _ = _call(app, query=f"channels=1&_profile={TOKEN}")
+
+        assert "X-Profile-Id" in headers
+
+    @pytest.mark.parametrize(
+        "headers", [{}, {"HTTP_X_PROFILE_TOKEN": "wrong"}, {"HTTP_X_PROFILE_TOKEN": ""}]
+    )
+    def test_requests_without_token_are_not_profiled(self, profiler, tmp_path, headers):
+        """Test that only the configured token triggers profiling."""
+        app = ProfilingMiddleware(_wsgi_app, lambda: profiler)
+
+        response_headers, _ = _call(app, headers=headers)
+
+        assert "X-Profile-Id" not in response_headers
+        assert os.listdir(tmp_path) == []
+
+    def test_disabled_profiler(self, tmp_path):
+        """Test that nothing is profiled while no profiler is configured."""
+        app = ProfilingMiddleware(_wsgi_app, lambda: None)
+
+        headers, _ = _call(app, headers={"HTTP_X_PROFILE_TOKEN": TOKEN})
+
+        assert "X-Profile-Id" not in headers
+
+    def test_old_profiles_are_pruned(self, profiler):
+        """Test that only the newest max_profiles are kept."""
+        app = ProfilingMiddleware(_wsgi_app, lambda: profiler)
+
+        names = [
+            _call(app, path=f"/page{i}", headers={"HTTP_X_PROFILE_TOKEN": TOKEN})[0][
+                "X-Profile-Id"
+            ]
+            for i in range(3)
+        ]
+
+        assert [p["name"] for p in profiler.list_profiles()] == names[:0:-1]
+
+    def test_file_path_rejects_other_files(self, profiler, tmp_path):
+        """Test that only stored profile files can be downloaded."""
+        (tmp_path / "notes.txt").write_text("x")
+        (tmp_path / "a.prof").write_text("x")
+
+        assert profiler.file_path("a.prof") == str(tmp_path / "a.prof")
+        assert profiler.file_path("notes.txt") is None
+        assert profiler.file_path("../a.prof") is None
+        assert profiler.file_path("missing.prof") is None
+
+
+def test_collapsed_stacks_follow_call_paths():
+    """Test that nested calls become semicolon-separated stacks."""
+    profile = cProfile.Profile()
+    profile.enable()
+    _outer()
+    profile.disable()
+
+    lines = collapsed_stacks(pstats.Stats(profile))
+
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    (inner,) = [stack for stack in stacks if stack.endswith("builtins.sum>")]
+    frames = inner.split(";")
+    assert frames[0].startswith("_outer (test_profiling.py:")
+    assert frames[1].startswith("_inner (test_profiling.py:")
+    assert int(stacks[inner]) > 0
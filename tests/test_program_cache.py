@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from src.program_cache import ProgramWindowCache, merge_runs
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_fetcher(calls):
+    """Return a fetcher that records calls and yields one program per hour."""
+
+    def fetch(start, end):
+        calls.append((start, end))
+        programs = []
+        current = start
+        while current < end:
+            programs.append(
+                {
+                    "id": f"p{int(current.timestamp())}",
+                    "title": f"Show {current.hour}",
+                    "start_time": current.isoformat(),
+                    "end_time": (current + timedelta(hours=1)).isoformat(),
+                }
+            )
+            current += timedelta(hours=1)
+        return programs
+
+    return fetch
+
+
+class TestProgramWindowCache:
+    """Test ProgramWindowCache class."""
+
+    def test_nearby_windows_share_buckets(self):
+        """Test that windows a few seconds apart hit the same buckets."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        calls = []
+        fetch = make_fetcher(calls)
+
+        cache.get("ch1", BASE, BASE + timedelta(hours=2, minutes=30), fetch)
+        cache.get(
+            "ch1",
+            BASE + timedelta(seconds=5),
+            BASE + timedelta(hours=2, minutes=30, seconds=5),
+            fetch,
+        )
+
+        assert calls == [(BASE, BASE + timedelta(hours=3))]
+        assert cache.stats()["bucket_hits"] == 3
+
+    def test_only_missing_buckets_are_fetched(self):
+        """Test that an overlapping window only fetches the uncovered part."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        calls = []
+        fetch = make_fetcher(calls)
+
+        cache.get("ch1", BASE, BASE + timedelta(hours=2), fetch)
+        programs = cache.get(
+            "ch1", BASE + timedelta(hours=1), BASE + timedelta(hours=4), fetch
+        )
+
+        assert calls[1] == (BASE + timedelta(hours=2), BASE + timedelta(hours=4))
+        assert [p["title"] for p in programs] == ["Show 1", "Show 2", "Show 3"]
+
+    def test_result_is_cut_to_window(self):
+        """Test that cached programs outside the window are not returned."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        fetch = make_fetcher([])
+
+        cache.get("ch1", BASE, BASE + timedelta(hours=6), fetch)
+        programs = cache.get(
+            "ch1",
+            BASE + timedelta(hours=2, minutes=30),
+            BASE + timedelta(hours=3, minutes=30),
+            fetch,
+        )
+
+        assert [p["title"] for p in programs] == ["Show 2", "Show 3"]
+
+    def test_expired_buckets_are_refetched(self):
+        """Test that buckets older than the ttl are fetched again."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        calls = []
+        fetch = make_fetcher(calls)
+
+        with patch("src.program_cache.time.monotonic", return_value=1000.0):
+            cache.get("ch1", BASE, BASE + timedelta(hours=1), fetch)
+        with patch("src.program_cache.time.monotonic", return_value=1400.0):
+            cache.get("ch1", BASE, BASE + timedelta(hours=1), fetch)
+
+        assert len(calls) == 2
+
+    def test_returns_copies(self):
+        """Test that modifying returned programs leaves the cache intact."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        fetch = make_fetcher([])
+
+        cache.get("ch1", BASE, BASE + timedelta(hours=1), fetch)[0]["title"] = "x"
+
+        programs = cache.get("ch1", BASE, BASE + timedelta(hours=1), fetch)
+        assert programs[0]["title"] == "Show 0"
+
+    def test_covered_intervals_and_invalidate(self):
+        """Test covered interval reporting and invalidation."""
+        cache = ProgramWindowCache(bucket_seconds=3600, ttl=300)
+        fetch = make_fetcher([])
+
+        cache.get("ch1", BASE, BASE + timedelta(hours=2), fetch)
+        cache.get("ch1", BASE + timedelta(hours=5), BASE + timedelta(hours=6), fetch)
+
+        assert cache.covered_intervals("ch1") == [
+            (BASE, BASE + timedelta(hours=2)),
+            (BASE + timedelta(hours=5), BASE + timedelta(hours=6)),
+        ]
+
+        cache.invalidate("ch1")
+        assert cache.covered_intervals("ch1") == []
+
+
+def test_merge_runs():
+    """Test merging of adjacent buckets into runs."""
+    assert merge_runs([0, 10, 20, 40, 60, 70], 10) == [(0, 30), (40, 50), (60, 80)]
@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+def _blocking_call(release, result="value"):
+    calls = []
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return result
+
+    return call, calls
+
+
+def _wait_for_waiters(flight, count):
+    for _ in range(500):
+        if flight.stats()["coalesced"] >= count:
+            return
+        threading.Event().wait(0.01)
+
+
+class TestSingleFlight:
+    """Test SingleFlight class."""
+
+    def test_concurrent_calls_share_one_result(self):
+        """Test that identical concurrent calls run only once."""
+        flight = SingleFlight()
+        release = threading.Event()
+        call, calls = _blocking_call(release)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, "key", call) for _ in range(4)]
+            _wait_for_waiters(flight, 3)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        assert results == ["value"] * 4
+        assert len(calls) == 1
+        stats = flight.stats()
+        assert stats["calls"] == 1
+        assert stats["coalesced"] == 3
+        assert stats["in_flight"] == 0
+
+    def test_different_keys_run_separately(self):
+        """Test that only identical keys are coalesced."""
+        flight = SingleFlight()
+
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+        assert flight.stats()["calls"] == 2
+
+    def test_finished_calls_are_not_cached(self):
+        """Test that a later call for the same key runs again."""
+        flight = SingleFlight()
+        counter = iter(range(10))
+
+        assert flight.do("key", lambda: next(counter)) == 0
+        assert flight.do("key", lambda: next(counter)) == 1
+
+    def test_errors_reach_all_waiters(self):
+        """Test that waiting callers receive the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def call():
+            release.wait(5)
+            raise ConnectionError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(flight.do, "key", call) for _ in range(2)]
+            _wait_for_waiters(flight, 1)
+            release.set()
+            for future in futures:
+                with pytest.raises(ConnectionError):
+                    future.result(timeout=5)
+
+    def test_disabled_runs_every_call(self):
+        """Test that a disabled flight does not coalesce."""
+        flight = SingleFlight(enabled=False)
+        release = threading.Event()
+        release.set()
+        call, calls = _blocking_call(release)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda _: flight.do("key", call), range(3)))
+
+        assert len(calls) == 3
+
+
+class TestSingleFlightAcrossWorkers:
+    """Test coalescing through a shared lock directory."""
+
+    def test_waiting_worker_reuses_result(self, tmp_path):
+        """Test that a worker blocked on the lock uses the holder's result."""
+        leader = SingleFlight(lock_dir=str(tmp_path), poll_interval=0.01)
+        follower = SingleFlight(lock_dir=str(tmp_path), poll_interval=0.01)
+        started = threading.Event()
+        release = threading.Event()
+
+        def leader_call():
+            started.set()
+            release.wait(5)
+            return {"channels": [1, 2]}
+
+        follower_calls = []
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(leader.do, "key", leader_call)
+            started.wait(5)
+            second = pool.submit(
+                follower.do, "key", lambda: follower_calls.append(1) or {}
+            )
+            threading.Event().wait(0.05)
+            release.set()
+
+            assert first.result(timeout=5) == {"channels": [1, 2]}
+            assert second.result(timeout=5) == {"channels": [1, 2]}
+
+        assert follower_calls == []
+        assert follower.stats()["coalesced_workers"] == 1
+
+    def test_uncontended_call_ignores_old_result(self, tmp_path):
+        """Test that a result left by an earlier call is not reused."""
+        flight = SingleFlight(lock_dir=str(tmp_path))
+
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+        assert flight.stats()["coalesced_workers"] == 0
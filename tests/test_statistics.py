@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+
+from src.statistics import StatisticsEngine
+
+
+def _iso(dt):
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+class TestStatisticsEngine:
+    """Test StatisticsEngine class."""
+
+    def _today(self, hour):
+        now = datetime.now(timezone.utc)
+        return now.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+    def test_channels_providers_and_aliases(self):
+        engine = StatisticsEngine(timezone="UTC")
+        engine.update_channels(
+            [
+                {"id": 1, "provider_id": "p1"},
+                {"id": 2, "provider_id": "p1"},
+                {"id": 3, "provider": {"id": "p2"}},
+                {"id": 4},
+            ]
+        )
+        engine.update_aliases(
+            [{"alias": "a", "channel_id": "1"}, {"alias": "b", "channel_id": "1"}]
+        )
+
+        stats = engine.snapshot()
+
+        assert stats["total_channels"] == 4
+        assert stats["total_providers"] == 2
+        assert stats["providers"]["p1"]["channels"] == 2
+        assert stats["total_aliases"] == 2
+        assert stats["alias_coverage"] == 25.0
+        assert "as_of" in stats
+
+    def test_program_windows_replace_previous_counts(self):
+        """Test that refetching a window adjusts instead of adding up."""
+        engine = StatisticsEngine(timezone="UTC")
+        engine.update_channels([{"id": "c1", "provider_id": "p1"}])
+        start = self._today(0)
+        end = start + timedelta(days=1)
+        programs = [
+            {"id": i, "start_time": _iso(start + timedelta(hours=i))} for i in range(3)
+        ]
+
+        engine.record_programs("c1", _iso(start), _iso(end), programs)
+        engine.record_programs("c1", _iso(start), _iso(end), programs[:2])
+
+        stats = engine.snapshot()
+        assert stats["programs_today"] == 2
+        assert stats["channels_with_programs_today"] == 1
+        assert stats["providers"]["p1"]["programs_today"] == 2
+        assert stats["days_covered"] == 1
+
+    def test_window_outside_keeps_other_programs(self):
+        engine = StatisticsEngine(timezone="UTC")
+        start = self._today(0)
+        engine.record_programs(
+            "c1",
+            _iso(start),
+            _iso(start + timedelta(hours=1)),
+            [{"id": "a", "start_time": _iso(start)}],
+        )
+        engine.record_programs(
+            "c1",
+            _iso(start + timedelta(hours=1)),
+            _iso(start + timedelta(hours=2)),
+            [{"id": "b", "start_time": _iso(start + timedelta(hours=1))}],
+        )
+        assert engine.snapshot()["total_programs"] == 2
+
+    def test_snapshot_is_cached_until_update(self):
+        engine = StatisticsEngine(timezone="UTC")
+        engine.update_channels([{"id": 1}])
+        first = engine.snapshot()
+        engine.update_channels([{"id": 1}])
+        assert engine.snapshot()["total_channels"] == first["total_channels"]
+
+        engine.update_channels([{"id": 1}, {"id": 2}])
+        assert engine.snapshot()["total_channels"] == 2
+
+    def test_refetching_unchanged_data_keeps_as_of(self):
+        """Test that as_of only moves when the statistics change."""
+        engine = StatisticsEngine(timezone="UTC")
+        start = self._today(0)
+        end = start + timedelta(days=1)
+        programs = [{"id": 1, "start_time": _iso(start)}]
+        engine.update_channels([{"id": "c1"}])
+        engine.record_programs("c1", _iso(start), _iso(end), programs)
+        first = engine.snapshot()
+
+        engine.update_channels([{"id": "c1"}])
+        engine.record_programs("c1", _iso(start), _iso(end), [dict(programs[0])])
+        assert engine.snapshot() == first
+
+        engine.record_programs("c1", _iso(start), _iso(end), [])
+        assert engine.snapshot()["total_programs"] == 0
+
+    def test_empty_engine(self):
+        engine = StatisticsEngine()
+        stats = engine.snapshot()
+        assert engine.has_data is False
+        assert stats["total_channels"] == 0
+        assert stats["earliest_program"] is None
+        assert "as_of" not in stats
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+from src.timeutils import (
+    format_local_date,
+    get_timezone,
+    localize_programs,
+    parse_timestamp,
+    to_local,
+)
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp():
+    """Test timestamp parsing."""
+    assert parse_timestamp("2024-01-01T00:00:00Z") == BASE
+    assert parse_timestamp("2024-01-01T01:00:00+01:00") == BASE
+    assert parse_timestamp("2024-01-01T00:00:00") == BASE
+    assert parse_timestamp(datetime(2024, 1, 1)) == BASE
+    assert parse_timestamp("garbage") is None
+    assert parse_timestamp(None) is None
+
+
+def test_get_timezone_is_cached():
+    """Test that timezone objects are reused and unknown names fall back."""
+    assert get_timezone("Europe/Berlin") is get_timezone("Europe/Berlin")
+    assert get_timezone("Not/AZone").zone == "UTC"
+
+
+def test_to_local():
+    """Test conversion into the configured timezone."""
+    assert to_local("2024-07-01T18:00:00Z", "Europe/Berlin").hour == 20
+    assert to_local("garbage", "Europe/Berlin") is None
+
+
+def test_format_local_date():
+    """Test German long date formatting."""
+    assert format_local_date(datetime(2024, 3, 4)) == "Montag, 4. März 2024"
+
+
+def test_localize_programs():
+    """Test that local display fields are added to a program batch."""
+    programs = [
+        {"start_time": "2024-01-01T22:30:00Z", "end_time": "2024-01-01T23:15:00Z"},
+        {"start_time": "2024-01-01T23:15:00Z", "end_time": None},
+    ]
+
+    localize_programs(programs, "Europe/Berlin")
+
+    assert programs[0]["start_time_local"] == "23:30"
+    assert programs[0]["end_time_local"] == "00:15"
+    assert programs[0]["date_local"] == "Montag, 1. Januar 2024"
+    assert programs[1]["date_local"] == "Dienstag, 2. Januar 2024"
+    assert "end_time_local" not in programs[1]
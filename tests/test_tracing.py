@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src import tracing
+from src.concurrency import fan_out
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+class TestRequestTrace:
+    """Test RequestTrace class."""
+
+    def test_continues_incoming_trace(self):
+        """Test that a valid traceparent keeps its trace id."""
+        trace = tracing.RequestTrace(TRACEPARENT)
+
+        outgoing = trace.traceparent().split("-")
+
+        assert outgoing[1] == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert outgoing[2] != "00f067aa0ba902b7"
+        assert outgoing[3] == "01"
+
+    def test_invalid_traceparent_starts_new_trace(self):
+        """Test that malformed or all-zero trace ids are replaced."""
+        for header in (None, "garbage", "00-" + "0" * 32 + "-00f067aa0ba902b7-01"):
+            trace = tracing.RequestTrace(header)
+            assert len(trace.trace_id) == 32
+            assert trace.trace_id != "0" * 32
+
+    def test_server_timing_adds_up_repeated_timings(self):
+        """Test that identical entries are summed and counted."""
+        trace = tracing.RequestTrace(TRACEPARENT)
+        trace.record("webepg", 0.010, "GET /api/v1/channels/{id}/programs miss")
+        trace.record("webepg", 0.020, "GET /api/v1/channels/{id}/programs miss")
+        trace.record("render", 0.005, 'epg "display".html')
+
+        header = trace.server_timing()
+
+        entries = header.split(", ")
+        assert entries[0] == (
+            'webepg;dur=30.0;desc="GET /api/v1/channels/{id}/programs miss x2"'
+        )
+        assert entries[1] == 'render;dur=5.0;desc="epg \\"display\\".html"'
+        assert entries[-1].startswith("total;dur=")
+        assert entries[-1].endswith(f'desc="trace {trace.trace_id}"')
+
+    def test_server_timing_folds_excess_entries(self):
+        """Test that the header stays bounded."""
+        trace = tracing.RequestTrace()
+        for i in range(tracing.MAX_ENTRIES + 5):
+            trace.record("webepg", 0.001, f"call {i}")
+
+        entries = trace.server_timing().split(", ")
+
+        assert len(entries) == tracing.MAX_ENTRIES + 2
+        assert entries[-2] == 'other;dur=5.0;desc="x5"'
+
+
+class TestCurrentTrace:
+    """Test the context-local current trace."""
+
+    def test_without_trace_records_nothing(self):
+        """Test that recording outside a request is a no-op."""
+        assert tracing.current_trace() is None
+        tracing.record("webepg", 1.0)
+        with tracing.span("json"):
+            pass
+
+    def test_span_records_into_current_trace(self):
+        """Test start/end of a trace and timing a block."""
+        token = tracing.start_trace()
+        try:
+            with tracing.span("json"):
+                pass
+            assert tracing.current_trace().server_timing().startswith("json;dur=")
+        finally:
+            tracing.end_trace(token)
+        assert tracing.current_trace() is None
+
+    def test_fan_out_calls_share_the_trace(self):
+        """Test that fan-out threads record into the caller's trace."""
+        token = tracing.start_trace()
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                fan_out(
+                    lambda key: tracing.record("webepg", 0.001, "GET /x"),
+                    range(3),
+                    executor,
+                    timeout=5,
+                )
+            header = tracing.current_trace().server_timing()
+        finally:
+            tracing.end_trace(token)
+
+        assert header.startswith('webepg;dur=3.0;desc="GET /x x3"')